@@ -0,0 +1,71 @@
+"""
+    Benchmark of reference and vectorized add_disjuncts of the grammar learner grammar induction
+    on a synthetic Zipf-distributed corpus with thousands of word clusters
+
+    Usage: python -m benchmarks.bench_add_disjuncts [-w <words>] [-c <clusters>] [-l <links>] [-r <repeat>]
+"""
+import sys
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from src.grammar_learner.grammar_inducer import add_disjuncts, fast_add_disjuncts
+
+
+def corpus(n_words: int, n_clusters: int, n_links: int, seed: int = 0) -> tuple:
+    """ Word categories and word-disjunct counts: ids as interned by SymbolTable """
+    rs = np.random.RandomState(seed)
+    words = np.minimum(rs.zipf(1.5, n_links), n_words) - 1
+    djs = np.minimum(rs.zipf(1.3, n_links), n_links) - 1
+    links = pd.DataFrame({'word': words, 'link': djs, 'count': np.ones(n_links, dtype=int)}) \
+        .groupby(['word', 'link'], as_index=False).sum()
+
+    labels = rs.randint(1, n_clusters + 1, n_words)
+    cats = {'cluster': [None] + ['C' + str(i).zfill(6) for i in range(1, n_clusters + 1)],
+            'words': [[]] + [[] for _ in range(n_clusters)],
+            'parent': [0] * (n_clusters + 1),
+            'children': [set() for _ in range(n_clusters + 1)]}
+
+    for word, label in enumerate(labels.tolist()):
+        cats['words'][label].append(word)
+
+    return cats, links
+
+
+def measure(func, cats: dict, links, repeat: int) -> tuple:
+    """ Return the best time in seconds and the result """
+    best, result = None, None
+
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func(cats, links)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="add_disjuncts benchmark")
+    parser.add_argument("-w", "--words", type=int, default=50000, help="number of words")
+    parser.add_argument("-c", "--clusters", type=int, default=5000, help="number of clusters")
+    parser.add_argument("-l", "--links", type=int, default=1000000, help="number of word-disjunct tokens")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best time is reported")
+    args = parser.parse_args(argv)
+
+    cats, links = corpus(args.words, args.clusters, args.links)
+    print(f"{args.words} words, {args.clusters} clusters, {len(links)} word-disjunct pairs")
+
+    reference, reference_cats = measure(add_disjuncts, cats, links, args.repeat)
+    fast, fast_cats = measure(fast_add_disjuncts, cats, links, args.repeat)
+
+    print("    reference {:8.3f}s".format(reference))
+    print("    fast      {:8.3f}s  speedup {:5.2f}x  identical: {}".format(fast, reference / fast,
+                                                                       reference_cats == fast_cats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,81 @@
+"""
+    Benchmark of k-means engines of the grammar learner category learning: full-batch and mini-batch
+    k-means, k-means++ and warm-started initializations in the search for the number of clusters,
+    wall time and clustering quality on bundled POC and CDS parses
+
+    Usage: python -m benchmarks.bench_kmeans [-c <min clusters>] [-m <max clusters>] [-r <repeat>]
+"""
+import sys
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from src.grammar_learner.read_files import check_mst_files
+from src.grammar_learner.pparser import files2links
+from src.grammar_learner.hyperwords import pmisvd
+from src.grammar_learner.clustering import kmeans_options, kmeans_search, kmeans_seeds
+
+
+CORPORA = (("POC-Turtle", "tests/data/POC-Turtle/MST_fixed_manually/"),
+           ("POC-English-NoAmb", "tests/data/POC-English-NoAmb/MST-fixed-manually/"),
+           ("CDS-LG-English-clean", "tests/test-data/pipeline/TP-TXT-CORPUS/TP_parser-type:sequential/"
+                                    "CDS-LG-English-clean.ull.expected"))
+
+ENGINES = (("kmeans", "kmeans"),
+           ("kmeans warm", ("kmeans", "warm")),
+           ("minibatch", "minibatch"),
+           ("minibatch warm", ("minibatch", "warm")))
+
+
+def corpus_vectors(corpus_path: str, context: int = 2):
+    """ Word vectors as they are clustered by category_learner in the 'embeddings' word space """
+    files = [corpus_path] if corpus_path.endswith(".expected") else check_mst_files(corpus_path, "none")[0]
+    links, response = files2links(input_files=files, context=context, left_wall="LEFT-WALL", period=True)
+    vdf, sv, response = pmisvd(links, "", "", 100, sv_min=0.1)
+    return vdf
+
+
+def search(vdf, clustering, n_min: int, n_max: int, seed: int) -> tuple:
+    """ Fit the cluster number range, return time in seconds, best number of clusters and silhouette """
+    init, n_init, batch_size = kmeans_options(clustering)
+    steps = list(range(n_min, n_max + 1))
+    candidates = list(zip([0] * len(steps), steps, kmeans_seeds(len(steps), seed)))
+
+    start = perf_counter()
+    fits = kmeans_search(vdf, candidates, init, n_init, batch_size=batch_size)
+    elapsed = perf_counter() - start
+
+    best = max(fits, key=lambda x: x[3])
+    return elapsed, best[1], best[3], float(np.mean([x[3] for x in fits]))
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Category learning k-means engine benchmark")
+    parser.add_argument("-c", "--min-clusters", type=int, default=2, help="min number of clusters")
+    parser.add_argument("-m", "--max-clusters", type=int, default=30, help="max number of clusters")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best time is reported")
+    args = parser.parse_args(argv)
+
+    for name, path in CORPORA:
+        vdf = corpus_vectors(path)
+        n_max = min(args.max_clusters, len(vdf) - 1)
+        print(f"{name}: {len(vdf)} words, {len(vdf.columns) - 1} dimensions, {args.min_clusters}-{n_max} clusters")
+
+        reference = None
+
+        for engine_name, clustering in ENGINES:
+            results = [search(vdf, clustering, args.min_clusters, n_max, seed) for seed in range(args.repeat)]
+            elapsed = min(x[0] for x in results)
+            n_clusters, silhouette, mean_silhouette = results[0][1:]
+            reference = elapsed if reference is None else reference
+
+            print("    {:15s} {:8.3f}s  speedup {:5.2f}x  best: {:3d} clusters, silhouette {:6.3f}  "
+                  "mean silhouette {:6.3f}".format(engine_name, elapsed, reference / elapsed, n_clusters,
+                                                  silhouette, mean_silhouette))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+    Benchmark of Decimal based and fast (native float) parse metrics accumulators
+
+    Usage: python -m benchmarks.bench_parsemetrics [-n <sentences>]
+"""
+import sys
+import random
+import argparse
+from time import perf_counter
+
+from src.common.parsemetrics import get_metrics_types
+from src.grammar_tester.parsestat import parse_metrics, parse_quality
+
+
+def make_sentences(count: int, seed: int = 0) -> list:
+    """ Generate list of tuples (tokens, test_links, ref_links) imitating parsed sentences """
+    rnd = random.Random(seed)
+    sentences = []
+
+    for _ in range(count):
+        length = rnd.randint(3, 25)
+        tokens = [("[w{}]" if rnd.random() < 0.1 else "w{}").format(i) for i in range(length)]
+        ref_links = {(i, rnd.randint(i + 1, length)) for i in range(length - 1)}
+        test_links = {(i, rnd.randint(i + 1, length)) for i in range(length - 1)}
+        sentences.append((tokens, test_links, ref_links))
+
+    return sentences
+
+
+def accumulate(sentences: list, fast: bool) -> (float, object, object):
+    """ Accumulate metrics over all sentences the same way LGInprocParser does. Return elapsed time in seconds. """
+    metrics_type, quality_type = get_metrics_types(fast)
+    metrics, quality = metrics_type(), quality_type()
+
+    start = perf_counter()
+
+    for tokens, test_links, ref_links in sentences:
+        metrics += parse_metrics(tokens, fast)
+        quality += parse_quality(test_links, ref_links, fast)
+
+    return perf_counter() - start, metrics, quality
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Parse metrics accumulator benchmark")
+    parser.add_argument("-n", "--sentences", type=int, default=200000, help="number of sentences")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is reported")
+    args = parser.parse_args(argv)
+
+    sentences = make_sentences(args.sentences)
+    results = {}
+
+    for fast in (False, True):
+        elapsed, metrics, quality = min((accumulate(sentences, fast) for _ in range(args.repeat)),
+                                        key=lambda res: res[0])
+        results[fast] = elapsed
+
+        print("{:8s} {:8.3f}s {:12.0f} sentences/s  parseability: {}  F1: {}".format(
+            "fast" if fast else "decimal", elapsed, len(sentences) / elapsed,
+            metrics.parseability_str(metrics).strip(), quality.f1_str(quality).strip()))
+
+    print("Speedup: {:.2f}x".format(results[False] / results[True]))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
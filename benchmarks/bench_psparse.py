@@ -0,0 +1,75 @@
+"""
+    Micro-benchmark of reference and fast postscript parsing functions on test-data postscript files
+
+    Usage: python -m benchmarks.bench_psparse [-d <test data dir>]
+"""
+import os
+import re
+import sys
+import argparse
+from time import perf_counter
+
+from src.common.optconst import BIT_STRIP, BIT_NO_LWALL, BIT_NO_PERIOD
+from src.grammar_tester.psparse import parse_postscript, fast_parse_postscript
+
+
+def load_linkages(data_dir: str) -> list:
+    """ Extract all postscript notated linkages from .post and .raw files found in the directory tree """
+    ps_pattern = re.compile(r"^\[\(.*?\]\n\[.*?\]\n\[0\]$", re.M | re.S)
+    linkages = []
+
+    for root, dirs, files in os.walk(data_dir):
+        for file_name in files:
+            if file_name.endswith(".post") or file_name.endswith(".raw"):
+                with open(os.path.join(root, file_name), "r", encoding="utf-8-sig") as file:
+                    linkages.extend(ps_pattern.findall(file.read()))
+
+    return linkages
+
+
+def measure(func, linkages: list, options: int, repeat: int) -> float:
+    """ Return the best time of parsing all linkages in seconds """
+    best = None
+
+    for _ in range(repeat):
+        start = perf_counter()
+
+        for linkage in linkages:
+            func(linkage, options)
+
+        elapsed = perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+
+    return best
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Postscript parsing benchmark")
+    parser.add_argument("-d", "--data-dir", default="tests/test-data", help="directory with postscript files")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="number of runs, best one is reported")
+    args = parser.parse_args(argv)
+
+    linkages = load_linkages(args.data_dir)
+    options = BIT_STRIP | BIT_NO_LWALL | BIT_NO_PERIOD
+
+    if not linkages:
+        print("No postscript linkages found in '{}'".format(args.data_dir))
+        return 1
+
+    # Both functions should return the same before being compared
+    for linkage in linkages:
+        assert parse_postscript(linkage, options) == fast_parse_postscript(linkage, options), linkage
+
+    results = {}
+
+    for name, func in (("reference", parse_postscript), ("fast", fast_parse_postscript)):
+        results[name] = measure(func, linkages, options, args.repeat)
+        print("{:10s} {:8.3f}s {:12.0f} sentences/s".format(name, results[name], len(linkages) / results[name]))
+
+    print("Linkages: {}, speedup: {:.2f}x".format(len(linkages), results["reference"] / results["fast"]))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,118 @@
+"""
+    Throughput benchmark of sed subprocess and in-process corpus filtering on test-data corpus files
+
+    Usage: python -m benchmarks.bench_sedfilter [-d <test data dir>] [-n <copies>]
+"""
+import os
+import sys
+import tempfile
+import argparse
+from time import perf_counter
+from subprocess import PIPE, Popen
+
+from src.common.optconst import BIT_ULL_IN, BIT_INPUT_TO_LCASE
+from src.common.sedcommands import get_sed_cmd_common_part, read_filtered_lines
+
+
+def find_corpus_files(data_dir: str, suffixes: tuple) -> list:
+    """ Return paths of all UTF-8 corpus files with specified suffixes found in the directory tree """
+    file_paths = []
+
+    for root, dirs, files in os.walk(data_dir):
+        for file_name in sorted(files):
+            if file_name.endswith(suffixes):
+                file_path = os.path.join(root, file_name)
+
+                try:
+                    with open(file_path, "r", encoding="utf-8") as file:
+                        file.read()
+                except UnicodeDecodeError:
+                    continue
+
+                file_paths.append(file_path)
+
+    return file_paths
+
+
+def make_corpus(data_dir: str, suffixes: tuple, copies: int, file_path: str) -> int:
+    """ Concatenate all corpus files with specified suffixes found in the directory tree several times """
+    texts = []
+
+    for corpus_path in find_corpus_files(data_dir, suffixes):
+        with open(corpus_path, "r", encoding="utf-8") as file:
+            text = file.read()
+
+        texts.append(text if text.endswith("\n") else text + "\n")
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        for _ in range(copies):
+            file.writelines(texts)
+
+    return os.path.getsize(file_path)
+
+
+def sed_filter(corpus_path: str, options: int) -> str:
+    with Popen(get_sed_cmd_common_part(options) + [corpus_path], stdout=PIPE,
+               env={**os.environ, "LC_ALL": "C.UTF-8"}) as proc:
+        return proc.communicate()[0].decode("utf-8")
+
+
+def inproc_filter(corpus_path: str, options: int) -> str:
+    return "".join(read_filtered_lines(corpus_path, options))
+
+
+def measure(func, corpus_paths: list, options: int, repeat: int) -> float:
+    """ Return the best time of filtering all corpus files in seconds """
+    best = None
+
+    for _ in range(repeat):
+        start = perf_counter()
+
+        for corpus_path in corpus_paths:
+            func(corpus_path, options)
+
+        elapsed = perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+
+    return best
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Corpus filtering benchmark")
+    parser.add_argument("-d", "--data-dir", default="tests/test-data", help="directory with corpus files")
+    parser.add_argument("-n", "--copies", type=int, default=20, help="number of times corpus files are repeated")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is reported")
+    args = parser.parse_args(argv)
+
+    cases = (("plain text", (".txt",), 0), ("plain text, lower case", (".txt",), BIT_INPUT_TO_LCASE),
+             ("ULL", (".ull",), BIT_ULL_IN), ("ULL, lower case", (".ull",), BIT_ULL_IN | BIT_INPUT_TO_LCASE))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, suffixes, options in cases:
+            corpus_path = os.path.join(tmp_dir, "corpus" + suffixes[0])
+            size = make_corpus(args.data_dir, suffixes, args.copies, corpus_path)
+
+            # The same corpus is filtered as a single large file and as a set of small test-data files
+            for corpus_paths, total_size in (([corpus_path], size),
+                                             (find_corpus_files(args.data_dir, suffixes), size / args.copies)):
+
+                # Both filters should produce the same text before being compared
+                for file_path in corpus_paths:
+                    assert sed_filter(file_path, options) == inproc_filter(file_path, options), file_path
+
+                results = {}
+
+                print(f"{name}: {len(corpus_paths)} file(s), {total_size / 1e6:.1f} MB")
+
+                for func_name, func in (("sed", sed_filter), ("in-process", inproc_filter)):
+                    results[func_name] = measure(func, corpus_paths, options, args.repeat)
+                    print("    {:10s} {:8.3f}s {:8.1f} MB/s".format(func_name, results[func_name],
+                                                                   total_size / 1e6 / results[func_name]))
+
+                print("    speedup: {:.2f}x".format(results["sed"] / results["in-process"]))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,133 @@
+"""
+    Benchmark of sparsesvd and randomized truncated SVD backends of the grammar learner word embeddings:
+    wall time, peak memory and clustering quality on bundled MST parses and on a synthetic word space
+
+    Usage: python -m benchmarks.bench_svd [-d <dimension>] [-k <clusters>] [-w <synthetic words>]
+"""
+import os
+import sys
+import resource
+import argparse
+import multiprocessing
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score, adjusted_rand_score
+
+from src.grammar_learner.read_files import check_mst_files
+from src.grammar_learner.pparser import files2links
+from src.grammar_learner.hyperwords import calc_pmi, positive_explicit, svd_embedding, truncated_svd
+
+
+CORPORA = ("tests/data/POC-Turtle/MST_fixed_manually/", "tests/data/POC-English-NoAmb/MST-fixed-manually/")
+
+
+def corpus_links(corpus_path: str, context: int) -> pd.DataFrame:
+    files, response = check_mst_files(corpus_path, "none")
+    links, response = files2links(input_files=files, context=context, left_wall="LEFT-WALL", period=True)
+    return links
+
+
+def synthetic_links(words: int, seed: int = 0) -> pd.DataFrame:
+    """ Random word-disjunct links with Zipf-distributed disjunct frequencies, 20 links per word on average """
+    rng = np.random.RandomState(seed)
+    n = words * 20
+    word_ids = rng.randint(0, words, n)
+    link_ids = np.minimum(rng.zipf(1.3, n), words * 5) - 1
+    counts = rng.randint(1, 10, n)
+    return pd.DataFrame({"word": word_ids, "link": link_ids, "count": counts}) \
+        .groupby(["word", "link"], as_index=False).sum()
+
+
+def ppmi_matrix(links: pd.DataFrame) -> csr_matrix:
+    """ Positive PMI matrix as it is decomposed by hyperwords.pmisvd """
+    words, word_idx = np.unique(links["word"].values, return_inverse=True)
+    features, feat_idx = np.unique(links["link"].values, return_inverse=True)
+    counts = csr_matrix((links["count"].values.astype(np.float32), (word_idx, feat_idx)),
+                        shape=(len(words), len(features)))
+    return positive_explicit(calc_pmi(counts, 1.0))
+
+
+def _run_svd(queue, m, dim: int, svd, repeat: int) -> None:
+    """ Child process: report the best time and peak resident memory growth of the decomposition """
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = None
+
+    for _ in range(repeat):
+        start = perf_counter()
+        ut, s, vt = truncated_svd(m, dim, svd)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss
+    queue.put((best, peak_rss, ut, s))
+
+
+def measure(m, dim: int, svd, repeat: int) -> tuple:
+    """ Return the best time in seconds, peak memory growth in KB and decomposition in a separate process """
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    proc = context.Process(target=_run_svd, args=(queue, m, dim, svd, repeat))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def cluster(ut, s, n_clusters: int) -> tuple:
+    """ K-means labels and silhouette index of word vectors built the same way as in hyperwords.pmisvd """
+    vectors = np.nan_to_num(svd_embedding(ut, s, 0.5))
+    labels = KMeans(n_clusters=n_clusters, n_init=10, random_state=0).fit(vectors).labels_
+    return labels, float(silhouette_score(vectors, labels))
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Word embedding SVD backend benchmark")
+    parser.add_argument("-d", "--dim", type=int, default=100, help="max vector space dimension")
+    parser.add_argument("-k", "--clusters", type=int, default=10, help="number of k-means clusters")
+    parser.add_argument("-w", "--words", type=int, default=5000, help="synthetic word space size, 0 - skip")
+    parser.add_argument("-o", "--oversamples", type=int, default=10, help="randomized SVD oversamples")
+    parser.add_argument("-i", "--iterations", type=int, default=4, help="randomized SVD power iterations")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is reported")
+    args = parser.parse_args(argv)
+
+    datasets = [(f"{os.path.basename(os.path.dirname(os.path.dirname(corpus)))}, context {context}",
+                 lambda corpus=corpus, context=context: corpus_links(corpus, context))
+                for corpus in CORPORA for context in (1, 2)]
+
+    if args.words > 0:
+        datasets.append((f"synthetic, {args.words} words", lambda: synthetic_links(args.words)))
+
+    backends = (("sparsesvd", "sparsesvd"), ("randomized", ("randomized", args.oversamples, args.iterations)))
+
+    for name, load in datasets:
+        m = ppmi_matrix(load())
+        n_clusters = min(args.clusters, m.shape[0] - 1)
+        results = {}
+
+        print(f"{name}: {m.shape[0]} words x {m.shape[1]} features, {m.nnz} non-zero")
+
+        for backend_name, svd in backends:
+            elapsed, peak_rss, ut, s = measure(m, args.dim, svd, args.repeat)
+            labels, silhouette = cluster(ut, s, n_clusters)
+            results[backend_name] = (elapsed, s, labels)
+            print("    {:10s} {:8.3f}s {:8d} KB  rank {:4d}  silhouette {:6.3f}".format(
+                backend_name, elapsed, peak_rss, len(s), silhouette))
+
+        # sparsesvd may return spurious near-zero values out of order
+        sv_ref, sv = np.sort(results["sparsesvd"][1])[::-1], np.sort(results["randomized"][1])[::-1]
+        rank = min(len(sv_ref), len(sv))
+        sv_error = float(np.max(np.abs(sv_ref[:rank] - sv[:rank])) / sv_ref[0])
+
+        print("    speedup: {:.2f}x, singular values max relative error: {:.2e}, clusters ARI: {:.3f}".format(
+            results["sparsesvd"][0] / results["randomized"][0], sv_error,
+            adjusted_rand_score(results["sparsesvd"][2], results["randomized"][2])))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,8 @@ from .tokencount import *
 from .sentencecount import *
 from .sedcommands import *
 from .optconst import *
+from .ullcorpus import *
+from .corpusscan import *
 
 __all__ = []
 __all__.extend(absclient.__all__)
@@ -18,3 +20,5 @@ __all__.extend(tokencount.__all__)
 __all__.extend(sentencecount.__all__)
 __all__.extend(sedcommands.__all__)
 __all__.extend(optconst.__all__)
+__all__.extend(ullcorpus.__all__)
+__all__.extend(corpusscan.__all__)
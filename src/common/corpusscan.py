@@ -0,0 +1,239 @@
+import os
+import json
+import logging
+import tempfile
+from typing import Dict
+from collections import OrderedDict
+
+from .optconst import *
+from .dirhelper import traverse_dir_tree
+from .sedcommands import read_filtered_lines
+from .tokencount import unbox_tokens
+
+__all__ = [
+    'CORPUS_SCAN_SUFFIX',
+    'CorpusFileScan',
+    'CorpusScan',
+    'scan_corpus_file',
+    'scan_corpus',
+    'get_scan_cache_path',
+    'is_scan_cache_file'
+]
+
+
+CORPUS_SCAN_SUFFIX = ".scan.json"
+
+# Cache file format version. Cache files of any other version are ignored.
+_CACHE_VERSION = 1
+
+# Only these options affect the way corpus file is filtered, the rest of them share the same cache entries
+_FILTER_OPTIONS = BIT_ULL_IN | BIT_INPUT_TO_LCASE
+
+
+class CorpusFileScan:
+    """ Single corpus file pre-scan results """
+
+    def __init__(self, size: int, mtime_ns: int, sentences: int, token_counts: Dict[str, int], total_tokens: int):
+        """
+        :param size:            File size in bytes.
+        :param mtime_ns:        File modification time in nanoseconds.
+        :param sentences:       Number of sentences sent to parser.
+        :param token_counts:    Dictionary of token appearance counts.
+        :param total_tokens:    Total number of token appearances.
+        """
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sentences = sentences
+        self.token_counts = token_counts
+        self.total_tokens = total_tokens
+
+    def to_dict(self) -> dict:
+        return {"size": self.size, "mtime_ns": self.mtime_ns, "sentences": self.sentences,
+                "token_counts": self.token_counts, "total_tokens": self.total_tokens}
+
+    @staticmethod
+    def from_dict(data: dict) -> 'CorpusFileScan':
+        return CorpusFileScan(data["size"], data["mtime_ns"], data["sentences"], data["token_counts"],
+                              data["total_tokens"])
+
+
+class CorpusScan:
+    """ Corpus pre-scan results: per file statistics and corpus totals """
+
+    def __init__(self, files: 'OrderedDict[str, CorpusFileScan]'):
+        """
+        :param files:           Ordered dictionary of corpus file path to CorpusFileScan.
+        """
+        self.files = files
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def sentences(self) -> int:
+        return sum(file_scan.sentences for file_scan in self.files.values())
+
+    @property
+    def size(self) -> int:
+        return sum(file_scan.size for file_scan in self.files.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(file_scan.total_tokens for file_scan in self.files.values())
+
+    @property
+    def token_counts(self) -> Dict[str, int]:
+        """ Return dictionary of token appearance counts across all corpus files """
+        token_counts = {}
+
+        for file_scan in self.files.values():
+            for token, count in file_scan.token_counts.items():
+                token_counts[token] = token_counts.get(token, 0) + count
+
+        return token_counts
+
+
+def scan_corpus_file(corpus_path: str, options: int) -> CorpusFileScan:
+    """
+    Count sentences and tokens of a single corpus file in one read. The corpus is filtered the same way
+        it is filtered before being sent to parser.
+
+    :param corpus_path:     Corpus file path.
+    :param options:         Bit mask representing parsing options.
+    :return:                CorpusFileScan instance.
+    """
+    stat = os.stat(corpus_path)
+
+    sentences, total_tokens, token_counts = 0, 0, {}
+
+    for line in read_filtered_lines(corpus_path, options):
+        sentences += 1
+
+        for token in unbox_tokens(line.split()):
+            token_counts[token] = token_counts.get(token, 0) + 1
+            total_tokens += 1
+
+    return CorpusFileScan(stat.st_size, stat.st_mtime_ns, sentences, token_counts, total_tokens)
+
+
+def get_scan_cache_path(corpus_path: str) -> str:
+    """
+    Return pre-scan cache file path for the corpus. Cache file is a hidden file next to the corpus
+        file or directory.
+
+    :param corpus_path:     Corpus file or directory path.
+    :return:                Cache file path.
+    """
+    dir_path, name = os.path.split(os.path.normpath(os.path.abspath(corpus_path)))
+    return os.path.join(dir_path, "." + name + CORPUS_SCAN_SUFFIX)
+
+
+def is_scan_cache_file(file_path: str) -> bool:
+    """ Return True if the file is a corpus pre-scan cache file, which should not be treated as a corpus file """
+    name = os.path.split(file_path)[1]
+    return name.startswith(".") and name.endswith(CORPUS_SCAN_SUFFIX)
+
+
+def _load_scan_cache(cache_path: str, options: int) -> dict:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+
+        if not isinstance(cache, dict) or cache.get("version", None) != _CACHE_VERSION:
+            return {}
+
+        return cache.get("options", {}).get(str(options & _FILTER_OPTIONS), {})
+
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_scan_cache(cache_path: str, options: int, entries: dict) -> None:
+    """ Atomically replace pre-scan cache file. Cache is an optimization so failure to write is ignored. """
+    logger = logging.getLogger(__name__ + "._save_scan_cache")
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+
+        if not isinstance(cache, dict) or cache.get("version", None) != _CACHE_VERSION:
+            cache = None
+
+    except (OSError, ValueError):
+        cache = None
+
+    if cache is None:
+        cache = {"version": _CACHE_VERSION, "options": {}}
+
+    cache["options"][str(options & _FILTER_OPTIONS)] = entries
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), prefix=os.path.split(cache_path)[1] + ".",
+                                        suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(cache, file, ensure_ascii=False)
+
+            os.replace(tmp_path, cache_path)
+
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    except OSError as err:
+        logger.debug(f"Unable to save corpus pre-scan cache '{cache_path}': {err}")
+
+
+def scan_corpus(corpus_path: str, options: int, use_cache: bool = True) -> CorpusScan:
+    """
+    Count sentences, tokens and file sizes of all corpus files in one read per file. Results are cached
+        in a hidden file next to the corpus. Cached file statistics is reused if file size and modification
+        time are unchanged.
+
+    :param corpus_path:     Path to a single corpus file or to a directory with multiple files.
+    :param options:         Bit mask representing parsing options.
+    :param use_cache:       Pre-scan cache is neither read nor written if False.
+    :return:                CorpusScan instance.
+    """
+    if not (os.path.isfile(corpus_path) or os.path.isdir(corpus_path)):
+        raise FileNotFoundError("Path '" + corpus_path + "' does not exist.")
+
+    corpus_files = []
+
+    if os.path.isdir(corpus_path):
+        traverse_dir_tree(corpus_path, "", [lambda path, _: corpus_files.append(path)], None, True)
+
+    else:
+        corpus_files.append(corpus_path)
+
+    root = corpus_path if os.path.isdir(corpus_path) else os.path.dirname(corpus_path)
+    cache_path = get_scan_cache_path(corpus_path) if use_cache else None
+    cached = _load_scan_cache(cache_path, options) if use_cache else {}
+
+    scan = CorpusScan(OrderedDict())
+    entries = {}
+
+    for file_path in corpus_files:
+        if is_scan_cache_file(file_path):
+            continue
+
+        key = os.path.relpath(file_path, root)
+        stat = os.stat(file_path)
+        entry = cached.get(key, None)
+
+        if entry is not None and entry.get("size", None) == stat.st_size \
+                and entry.get("mtime_ns", None) == stat.st_mtime_ns:
+            file_scan = CorpusFileScan.from_dict(entry)
+            scan.hits += 1
+
+        else:
+            file_scan = scan_corpus_file(file_path, options)
+            scan.misses += 1
+
+        scan.files[file_path] = file_scan
+        entries[key] = file_scan.to_dict()
+
+    if use_cache and (scan.misses or len(entries) != len(cached)):
+        _save_scan_cache(cache_path, options, entries)
+
+    return scan
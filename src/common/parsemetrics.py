@@ -1,6 +1,6 @@
 from decimal import *
 
-__all__ = ["ParseMetrics", "ParseQuality"]
+__all__ = ["ParseMetrics", "ParseQuality", "FastParseMetrics", "FastParseQuality", "get_metrics_types"]
 
 class ParseMetrics():
     """ Parse statistics data """
@@ -26,7 +26,7 @@ class ParseMetrics():
         if not stat.sentences:
             return Decimal("0")
 
-        return stat.completely_parsed_ratio / stat.sentences * Decimal("100")
+        return stat.completely_parsed_ratio / stat.sentences * 100
 
     @staticmethod
     def completely_parsed_str(stat) -> str:
@@ -37,7 +37,7 @@ class ParseMetrics():
         if not stat.sentences:
             return Decimal("0")
 
-        return stat.completely_unparsed_ratio / stat.sentences * Decimal("100")
+        return stat.completely_unparsed_ratio / stat.sentences * 100
 
     @staticmethod
     def completely_unparsed_str(stat) -> str:
@@ -52,7 +52,7 @@ class ParseMetrics():
 
     @staticmethod
     def parseability_str(stat) -> str:
-        return "{0:6.2f}%".format(stat.parseability(stat) * Decimal("100"))
+        return "{0:6.2f}%".format(stat.parseability(stat) * 100)
 
     @staticmethod
     def parse_time_str(stat) -> str:
@@ -131,7 +131,7 @@ class ParseQuality():
     def f1(stat) -> Decimal:
         denominator = stat.recall_val(stat) + stat.precision_val(stat)
 
-        return Decimal("2.00") * stat.recall_val(stat) * stat.precision_val(stat) / denominator \
+        return 2 * stat.recall_val(stat) * stat.precision_val(stat) / denominator \
             if denominator > Decimal("0.0001") else Decimal("0.00")
 
     @staticmethod
@@ -175,7 +175,7 @@ class ParseQuality():
 
     @staticmethod
     def parse_quality_str(stat) -> str:
-        return "{0:6.2f}%".format(stat.parse_quality(stat) * Decimal('100.0'))
+        return "{0:6.2f}%".format(stat.parse_quality(stat) * 100)
 
     @staticmethod
     def text(stat) -> str:
@@ -224,3 +224,71 @@ class ParseQuality():
         self.precision += other.precision
 
         return self
+
+
+class FastParseMetrics(ParseMetrics):
+    """
+    Parse statistics data accumulated in native floats instead of Decimal. Reporting API is the same as the one of
+        ParseMetrics. Totals may differ from ParseMetrics ones in the least significant digits.
+    """
+    def __init__(self, other=None):
+
+        if other is None:
+            self.completely_parsed_ratio = 0.0
+            self.completely_unparsed_ratio = 0.0
+            self.average_parsed_ratio = 0.0
+            self.sentences = 0
+            self.skipped_sentences = 0
+            self.parse_time = 0.0
+        else:
+            super().__init__(other)
+
+    def __iadd__(self, other):
+        # Decimal values returned by parsers not supporting fast metrics are converted
+        self.completely_parsed_ratio += float(other.completely_parsed_ratio)
+        self.completely_unparsed_ratio += float(other.completely_unparsed_ratio)
+        self.average_parsed_ratio += float(other.average_parsed_ratio)
+        self.sentences += other.sentences
+        self.skipped_sentences += other.skipped_sentences
+        self.parse_time += other.parse_time
+        return self
+
+
+class FastParseQuality(ParseQuality):
+    """ Parse quality data accumulated in integer counters and native floats instead of Decimal """
+    def __init__(self):
+        self.total = 0
+        self.missing = 0
+        self.extra = 0
+        self.ignored = 0
+        self.quality = 0.0
+        self.sentences = 0
+        self.skipped_sentences = 0
+
+        self.recall = 0.0
+        self.precision = 0.0
+
+    def __iadd__(self, other):
+        # Decimal values returned by parsers not supporting fast metrics are converted
+        self.total += int(other.total)
+        self.missing += int(other.missing)
+        self.extra += int(other.extra)
+        self.ignored += int(other.ignored)
+        self.quality += float(other.quality)
+        self.sentences += int(other.sentences)
+        self.skipped_sentences += other.skipped_sentences
+
+        self.recall += float(other.recall)
+        self.precision += float(other.precision)
+
+        return self
+
+
+def get_metrics_types(fast: bool = False) -> (type, type):
+    """
+    Return metrics accumulator types
+
+    :param fast:    FastParseMetrics and FastParseQuality are returned if True, ParseMetrics and ParseQuality otherwise.
+    :return:        Tuple (<metrics type>, <quality type>)
+    """
+    return (FastParseMetrics, FastParseQuality) if fast else (ParseMetrics, ParseQuality)
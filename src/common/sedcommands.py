@@ -1,6 +1,26 @@
+import re
+from typing import Iterable, Iterator
 from .optconst import *
 
-__all__ = ['get_sed_regex', 'get_sed_cmd_common_part']
+__all__ = ['get_sed_regex', 'get_sed_cmd_common_part', 'filter_lines', 'read_filtered_lines']
+
+
+# Characters matched by [[:space:]] in GNU sed running in UTF-8 locale
+_SED_SPACE = r"[\t\n\v\f\r \u1680\u2000-\u2006\u2008-\u200a\u2028\u2029\u205f\u3000]"
+
+# ULL link line: <index1> <word1> <index2> <word2> [<weight>]. Line matches sed expression
+#   '^([0-9]+[[:space:]]+.+){2}([[:space:]]+[-+0-9.e]+)?$' if and only if it starts with this pattern,
+#   since the last '.+' absorbs the rest of the line.
+_ULL_LINK_PATTERN = re.compile(r"[0-9]+" + _SED_SPACE + r"+.+?[0-9]" + _SED_SPACE + r"+.")
+
+# Invalid UTF-8 bytes decoded with 'surrogateescape'. sed '.' does not match them, so such line is never a link.
+_INVALID_BYTE_PATTERN = re.compile("[\udc80-\udcff]")
+
+# Lines deleted in any case
+_EMPTY_LINES = frozenset(["\n", "\r\n", "\r"])
+
+# Token enclosed in square brackets. The character set is the one sed ends up with after its escape processing.
+_BOXED_TOKEN_PATTERN = re.compile(r"\[([a-z0-9A-Z.,:\\@\"?!*~()/#$&;^%_`'\u2014©®°•…≤±×΅⁻¹²³€αβπγδμεθ«»=+-]*)\]")
 
 
 def get_sed_regex(options: int) -> str:
@@ -38,6 +58,64 @@ def get_sed_regex(options: int) -> str:
 #         return r'/^$/d;s/.*/\L\0/g' if options & BIT_INPUT_TO_LCASE else r'/^$/d'
 
 
+def _lower(text: str) -> str:
+    # sed converts each character separately, so dotted capital I becomes a single 'i'
+    return text.replace("\u0130", "i").lower() if "\u0130" in text else text.lower()
+
+
+def filter_lines(lines: Iterable[str], options: int) -> Iterator[str]:
+    """
+    In-process equivalent of 'sed -Ee <get_sed_regex(options)>' running in UTF-8 locale. Lines are returned
+        exactly as sed would print them, including missing newline at the end of the last line.
+
+    :param lines:       Iterable of text lines with newline characters (e.g. file opened with newline='\\n').
+    :param options:     Grammar tester options bit mask.
+    :return:            Iterator of filtered lines.
+    """
+    if not options & BIT_ULL_IN:
+        if options & BIT_INPUT_TO_LCASE:
+            for line in lines:
+                if line not in _EMPTY_LINES:
+                    yield _lower(line)
+        else:
+            for line in lines:
+                if line not in _EMPTY_LINES:
+                    yield line
+
+        return
+
+    to_lcase = options & BIT_INPUT_TO_LCASE
+    is_link = _ULL_LINK_PATTERN.match
+    unbox = _BOXED_TOKEN_PATTERN.sub
+
+    for line in lines:
+        if line in _EMPTY_LINES:
+            continue
+
+        if "0" <= line[0] <= "9" and is_link(line[:-1] if line.endswith("\n") else line) is not None \
+                and _INVALID_BYTE_PATTERN.search(line) is None:
+            continue
+
+        if "[" in line:
+            line = unbox(r"\1", line)
+
+        yield _lower(line) if to_lcase else line
+
+
+def read_filtered_lines(corpus_path: str, options: int) -> Iterator[str]:
+    """
+    Read corpus file filtering it the same way sed filters it before the text is sent to link-parser.
+        Invalid UTF-8 bytes are decoded as surrogates ('surrogateescape') so the text can be encoded back
+        to the same bytes.
+
+    :param corpus_path:     Corpus file path.
+    :param options:         Grammar tester options bit mask.
+    :return:                Iterator of filtered lines.
+    """
+    with open(corpus_path, "r", encoding="utf-8", errors="surrogateescape", newline="\n") as file:
+        yield from filter_lines(file, options)
+
+
 def get_sed_cmd_common_part(options: int) -> list:
     """
     Return common part of sed invocation parammeter list used as an argument in Popen call.
@@ -1,6 +1,5 @@
 import os
 from typing import Optional
-from subprocess import PIPE, Popen
 from .sedcommands import *
 from .dirhelper import traverse_dir_tree
 
@@ -26,25 +25,10 @@ def get_sentence_count(corpus_path: str, options: int) -> int:
     """
     sentence_count = 0
 
-    sed_cmd = get_sed_cmd_common_part(options) + [corpus_path]
-
     try:
-        # Get number of sentences in input file
-        with Popen(sed_cmd, stdout=PIPE) as proc_sed, \
-             Popen(["wc", "-l"], stdin=proc_sed.stdout, stdout=PIPE, stderr=PIPE) as proc_wcl:
-
-            # Closing grep output stream will terminate it's process.
-            proc_sed.stdout.close()
-
-            # Read pipes to get complete output returned by link-parser
-            raw, err = proc_wcl.communicate()
-
-            # Check return code to make sure the process completed successfully.
-            if proc_wcl.returncode != 0:
-                raise SentCountError("Process '{0}' terminated with exit code: {1} "
-                                     "and error message:\n'{2}'.".format("wc", proc_wcl.returncode, err.decode()))
-
-            sentence_count = int((raw.decode("utf-8-sig")).strip())
+        # Corpus file is filtered in-process the same way sed filters it before the text is sent to link-parser
+        for _ in read_filtered_lines(corpus_path, options):
+            sentence_count += 1
 
     except KeyboardInterrupt:
         print("get_sentence_count(): Ctrl+C triggered.")
@@ -0,0 +1,285 @@
+import os
+import json
+import numpy as np
+from typing import List, Tuple, Iterable, Iterator, Callable, Optional
+
+"""
+    Binary columnar ULL corpus format
+
+    File layout:
+        - 8 byte magic string ULL_BINARY_MAGIC;
+        - 8 byte little endian header length;
+        - JSON header holding interned vocabulary and array descriptors;
+        - arrays aligned to 8 bytes: 'tokens' (vocabulary indexes of sentence tokens), 'sentence_offsets'
+          (sentence boundaries in 'tokens'), 'links' (rows of (<index1>, <word1>, <index2>, <word2>, <weight>),
+          where words and weights are vocabulary indexes, weight is -1 if not specified) and 'link_offsets'
+          (sentence boundaries in 'links').
+
+    Arrays are stored in native numpy format so they can be memory-mapped. Whitespace between tokens is
+        normalized to a single space.
+"""
+
+__all__ = [
+    'ULL_BINARY_MAGIC',
+    'ULL_BINARY_EXT',
+    'ULLFormatError',
+    'ULLCorpus',
+    'parse_ull_lines',
+    'is_ull_binary',
+    'save_ull_binary',
+    'load_ull_binary',
+    'ull2binary',
+    'binary2ull'
+]
+
+
+ULL_BINARY_MAGIC = b"ULLBIN01"
+ULL_BINARY_EXT = ".ullb"
+
+_ALIGNMENT = 8
+_ARRAYS = ("tokens", "sentence_offsets", "links", "link_offsets")
+
+
+class ULLFormatError(Exception):
+    pass
+
+
+class ULLCorpus:
+    """ ULL parses stored as interned vocabulary and integer arrays """
+
+    def __init__(self, vocab: List[str], tokens: np.ndarray, sentence_offsets: np.ndarray, links: np.ndarray,
+                 link_offsets: np.ndarray):
+        """
+        :param vocab:               List of unique words and link weights.
+        :param tokens:              int32 array of vocabulary indexes of all sentence tokens.
+        :param sentence_offsets:    int64 array of sentence boundaries in 'tokens', one item longer than the
+                                    number of sentences.
+        :param links:               int32 array of shape (<number of links>, 5).
+        :param link_offsets:        int64 array of sentence boundaries in 'links'.
+        """
+        self.vocab = vocab
+        self.tokens = tokens
+        self.sentence_offsets = sentence_offsets
+        self.links = links
+        self.link_offsets = link_offsets
+
+    def __len__(self) -> int:
+        return len(self.sentence_offsets) - 1
+
+    def sentence_tokens(self, index: int) -> List[str]:
+        """ Return list of sentence tokens """
+        vocab = self.vocab
+        return [vocab[i] for i in self.tokens[self.sentence_offsets[index]:self.sentence_offsets[index+1]].tolist()]
+
+    def sentence(self, index: int) -> str:
+        """ Return sentence text """
+        return " ".join(self.sentence_tokens(index))
+
+    def sentence_links(self, index: int) -> np.ndarray:
+        """ Return array of sentence links with rows of (<index1>, <word1>, <index2>, <word2>, <weight>) """
+        return self.links[self.link_offsets[index]:self.link_offsets[index+1]]
+
+    def lines(self, transform: Optional[Callable[[str], str]] = None, newline: str = "\n") -> Iterator[str]:
+        """
+        Generate ULL text lines. Each sentence is followed by an empty line.
+
+        :param transform:   Function applied to each vocabulary item (token or weight) once, e.g. str.lower.
+        :param newline:     String appended to each line.
+        :return:            Line iterator.
+        """
+        words = self.vocab if transform is None else [transform(word) for word in self.vocab]
+        tokens, links = self.tokens.tolist(), self.links.tolist()
+        sent_offsets, link_offsets = self.sentence_offsets.tolist(), self.link_offsets.tolist()
+
+        for sent in range(len(sent_offsets) - 1):
+            yield " ".join([words[i] for i in tokens[sent_offsets[sent]:sent_offsets[sent+1]]]) + newline
+
+            for index1, word1, index2, word2, weight in links[link_offsets[sent]:link_offsets[sent+1]]:
+                if weight < 0:
+                    yield f"{index1} {words[word1]} {index2} {words[word2]}{newline}"
+                else:
+                    yield f"{index1} {words[word1]} {index2} {words[word2]} {words[weight]}{newline}"
+
+            yield newline
+
+    def select(self, mask: np.ndarray) -> "ULLCorpus":
+        """
+        Return corpus of selected sentences sharing the same vocabulary
+
+        :param mask:        Boolean array, one item per sentence.
+        :return:            ULLCorpus instance.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        token_counts, link_counts = np.diff(self.sentence_offsets), np.diff(self.link_offsets)
+
+        return ULLCorpus(self.vocab, self.tokens[np.repeat(mask, token_counts)],
+                         np.concatenate(([0], np.cumsum(token_counts[mask]))).astype(np.int64),
+                         self.links[np.repeat(mask, link_counts)],
+                         np.concatenate(([0], np.cumsum(link_counts[mask]))).astype(np.int64))
+
+    def parses(self) -> List[Tuple[str, set]]:
+        """ Return parses in the same format as parsevaluate.load_parses() does """
+        link_pairs = self.links[:, [0, 2]].tolist()
+        link_offsets = self.link_offsets.tolist()
+
+        return [(self.sentence(sent), {(i, j) for i, j in link_pairs[link_offsets[sent]:link_offsets[sent+1]]})
+                for sent in range(len(self))]
+
+
+def parse_ull_lines(lines: Iterable[str]) -> ULLCorpus:
+    """
+    Parse ULL text lines. Sentences are separated by empty lines. The first line of each sentence is the sentence
+        itself, the rest are links in '<index1> <word1> <index2> <word2> [<weight>]' format.
+
+    :param lines:       Iterable of ULL file lines.
+    :return:            ULLCorpus instance.
+    :raises:            ULLFormatError
+    """
+    vocab_ids = {}
+    intern = lambda word: vocab_ids.setdefault(word, len(vocab_ids))
+
+    tokens, sent_offsets, links, link_offsets = [], [0], [], [0]
+    in_sentence = False
+
+    for line_number, line in enumerate(lines, 1):
+        fields = line.split()
+
+        if not fields:
+            if in_sentence:
+                link_offsets.append(len(links))
+                in_sentence = False
+            continue
+
+        if not in_sentence:
+            tokens.extend([intern(word) for word in fields])
+            sent_offsets.append(len(tokens))
+            in_sentence = True
+            continue
+
+        if len(fields) not in (4, 5) or not fields[0].isdigit() or not fields[2].isdigit():
+            raise ULLFormatError(f"Line #{line_number} appears not to be a link: '{line.rstrip()}'")
+
+        links.append((int(fields[0]), intern(fields[1]), int(fields[2]), intern(fields[3]),
+                      intern(fields[4]) if len(fields) == 5 else -1))
+
+    if in_sentence:
+        link_offsets.append(len(links))
+
+    return ULLCorpus(list(vocab_ids), np.array(tokens, dtype=np.int32), np.array(sent_offsets, dtype=np.int64),
+                     np.array(links, dtype=np.int32).reshape((len(links), 5)), np.array(link_offsets, dtype=np.int64))
+
+
+def is_ull_binary(file_path: str) -> bool:
+    """ Return True if the file is a binary ULL corpus file """
+    try:
+        with open(file_path, "rb") as file:
+            return file.read(len(ULL_BINARY_MAGIC)) == ULL_BINARY_MAGIC
+
+    except OSError:
+        return False
+
+
+def save_ull_binary(corpus: ULLCorpus, file_path: str) -> None:
+    """
+    Save ULL corpus in binary format
+
+    :param corpus:      ULLCorpus instance.
+    :param file_path:   Output file path.
+    :return:            None
+    """
+    arrays = {name: np.ascontiguousarray(getattr(corpus, name)) for name in _ARRAYS}
+    descriptors = {}
+
+    # Array offsets depend on header length, so it is calculated with offsets relative to the data start
+    offset = 0
+
+    for name in _ARRAYS:
+        descriptors[name] = {"dtype": arrays[name].dtype.str, "shape": list(arrays[name].shape), "offset": offset}
+        offset += -(-arrays[name].nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({"vocab": corpus.vocab, "arrays": descriptors}, ensure_ascii=False).encode("utf-8")
+    header += b" " * (-(len(ULL_BINARY_MAGIC) + 8 + len(header)) % _ALIGNMENT)
+
+    with open(file_path, "wb") as file:
+        file.write(ULL_BINARY_MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+
+        for name in _ARRAYS:
+            data = arrays[name].tobytes()
+            file.write(data)
+            file.write(b"\0" * (-len(data) % _ALIGNMENT))
+
+
+def load_ull_binary(file_path: str, mmap: bool = True) -> ULLCorpus:
+    """
+    Load binary ULL corpus
+
+    :param file_path:   Binary ULL corpus file path.
+    :param mmap:        Arrays are memory-mapped if True, read into memory otherwise.
+    :return:            ULLCorpus instance.
+    :raises:            ULLFormatError
+    """
+    with open(file_path, "rb") as file:
+        if file.read(len(ULL_BINARY_MAGIC)) != ULL_BINARY_MAGIC:
+            raise ULLFormatError(f"'{file_path}' is not a binary ULL corpus file.")
+
+        header_len = int.from_bytes(file.read(8), "little")
+        header = json.loads(file.read(header_len).decode("utf-8"))
+
+    data_start = len(ULL_BINARY_MAGIC) + 8 + header_len
+    arrays = {}
+
+    for name in _ARRAYS:
+        desc = header["arrays"][name]
+        dtype, shape = np.dtype(desc["dtype"]), tuple(desc["shape"])
+        count = int(np.prod(shape))
+
+        if not count:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+
+        elif mmap:
+            arrays[name] = np.memmap(file_path, dtype=dtype, mode="r", offset=data_start + desc["offset"],
+                                     shape=shape)
+        else:
+            arrays[name] = np.fromfile(file_path, dtype=dtype, count=count,
+                                       offset=data_start + desc["offset"]).reshape(shape)
+
+    return ULLCorpus(header["vocab"], arrays["tokens"], arrays["sentence_offsets"], arrays["links"],
+                     arrays["link_offsets"])
+
+
+def ull2binary(ull_path: str, bin_path: Optional[str] = None) -> str:
+    """
+    Convert text ULL file into binary one
+
+    :param ull_path:    Text ULL file path.
+    :param bin_path:    Binary file path. ULL file path with ULL_BINARY_EXT extension appended is used if None.
+    :return:            Binary file path.
+    """
+    bin_path = ull_path + ULL_BINARY_EXT if bin_path is None else bin_path
+
+    with open(ull_path, "r", encoding="utf-8-sig") as file:
+        corpus = parse_ull_lines(file)
+
+    save_ull_binary(corpus, bin_path)
+
+    return bin_path
+
+
+def binary2ull(bin_path: str, ull_path: Optional[str] = None) -> str:
+    """
+    Convert binary ULL file into text one
+
+    :param bin_path:    Binary file path.
+    :param ull_path:    Text ULL file path. Binary file path without ULL_BINARY_EXT extension is used if None.
+    :return:            Text ULL file path.
+    """
+    if ull_path is None:
+        ull_path = bin_path[:-len(ULL_BINARY_EXT)] if bin_path.endswith(ULL_BINARY_EXT) \
+            else os.path.splitext(bin_path)[0] + ".ull"
+
+    with open(ull_path, "w", encoding="utf-8") as file:
+        file.writelines(load_ull_binary(bin_path).lines())
+
+    return ull_path
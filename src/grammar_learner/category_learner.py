@@ -13,9 +13,10 @@ from .sparse_word_space import clean_links, \
 from .skl_clustering import optimal_clusters
 
 
-def learn_categories(links, **kwargs):
+def learn_categories(links, symbols = None, **kwargs):
     """ learns word categories (clusters)
     :param links:   pd.DataFrame(columns = ['word', 'link', 'count'])
+    :param symbols: SymbolTable if links words and terms are integer ids
     :param kwargs:  disclosed below in kwa(...)
     :return:        (categories, re)
     """
@@ -26,6 +27,9 @@ def learn_categories(links, **kwargs):
     word_space = kwa('embeddings', 'word_space', **kwargs)
     dim_max = kwa(100, 'dim_max', **kwargs)
     sv_min = kwa(0.1, 'sv_min', **kwargs)
+    vector_files = kwa(False, 'vector_files', **kwargs)                 # 261017
+    svd = kwa('sparsesvd', 'svd', **kwargs)                             # 261017
+    reuse_svd = kwa(True, 'reuse_svd', **kwargs)                        # 261017
     algorithm = kwa('kmeans', 'clustering', **kwargs)
     verbose = kwa('none', 'verbose', **kwargs)
 
@@ -47,14 +51,22 @@ def learn_categories(links, **kwargs):
     # «DRK» -- "Dimensionality Reduction (SVD) & K-means clustering"
     elif word_space[0] in ['e', 'v']:  # 'embeddings' / 'vectors' - 0.6 legacy
         dict_path = tmpath
-        try:
-            dim = vector_space_dim(links, dict_path, tmpath, dim_max, sv_min,
-                                   verbose)
-        except:  # FIXME
-            dim = dim_max
-        log.update({'vector_space_dim': dim})
-
-        vdf, sv, re01 = pmisvd(links, dict_path, tmpath, dim)
+        if reuse_svd:  # one SVD: dimension selection & embedding       # 261017
+            vdf, sv, re01 = pmisvd(links, dict_path, tmpath, dim_max,
+                                   save_files=vector_files, svd=svd,
+                                   sv_min=sv_min, symbols=symbols)
+            log.update({'vector_space_dim': len(vdf.columns) - 1})
+        else:
+            try:
+                dim = vector_space_dim(links, dict_path, tmpath, dim_max,
+                                       sv_min, verbose, svd=svd)
+            except:  # FIXME
+                dim = dim_max
+            log.update({'vector_space_dim': dim})
+
+            vdf, sv, re01 = pmisvd(links, dict_path, tmpath, dim,
+                                   save_files=vector_files, svd=svd,    # 261017
+                                   symbols=symbols)
         #-log.update(re01)  # {'vectors_file': out_file} -- no need
         cdf, silhouette, inertia = best_clusters(vdf, **kwargs)
         log.update({'silhouette': silhouette, 'inertia': inertia})
@@ -62,7 +74,7 @@ def learn_categories(links, **kwargs):
     # Sparse word space, agglomerative clustering 2018-10-21, mean shift, ...
     elif word_space[0] == 's':  # 'sparse'
         log.update({'word_space': 'sparse'})
-        linx, words, features = clean_links(links, **kwargs)
+        linx, words, features = clean_links(links, symbols, **kwargs)
         log.update({'cleaned_words': len(sorted(np.unique(words))),
                     'clean_features': len(sorted(np.unique(features)))})
         # 'links_array': linx.shape})
@@ -167,3 +179,8 @@ def cdf2cats(clusters, **kwargs):
 # 81231 cleanup after upstream merge and conflicts resolution (FIXME: 2nd check)
 # 90221 tmpath defined in learn, tweaks removed here
 # 90410 empty filtered parses dataset issue
+# 261017 links: SymbolTable ids instead of strings
+# 261017 pmisvd in memory, 'vector_files': True ⇒ save temporary files
+# 261017 'vector_files': 'npy' ⇒ binary vectors.npy + vectors.vocab
+# 261017 'svd': 'sparsesvd' / ('randomized', oversamples, iterations)
+# 261017 'reuse_svd': True ⇒ vector space dimension sliced from one SVD
@@ -1,14 +1,18 @@
 # language-learning/src/grammar_learner/clustering.py                   # 90221
+import os
 import logging
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import pairwise_distances, silhouette_score
 from statistics import mode
 from random import randint
 from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
 from .utl import UTC, kwa
 
+_worker_vdf = None
+
 
 def cluster_id(n, nmax):
     def int2az(n, l = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'):
@@ -16,10 +20,42 @@ def cluster_id(n, nmax):
     return int2az(n).zfill(len(int2az(nmax))).replace('0', 'A')
 
 
-def cluster_words_kmeans(words_df, n_clusters, init = 'k-means++', n_init = 10):
+def sampled_silhouette(m, labels, metric = 'euclidean', sample = None):  # 261017
+    # sample: None ⇒ exact silhouette_score, O(n²) / size, (size, seed) ⇒
+    # silhouette of a fixed random sample of size vectors, O(size²)
+    if sample is None:
+        return silhouette_score(m, labels, metric = metric)
+    if type(sample) is int:
+        sample = (sample,)
+    size = sample[0]
+    seed = sample[1] if len(sample) > 1 else 0
+    if size >= m.shape[0]:
+        return silhouette_score(m, labels, metric = metric)
+    try:
+        return silhouette_score(m, labels, metric = metric,
+                                sample_size = size, random_state = seed)
+    except ValueError:  # a single cluster in the sample
+        return silhouette_score(m, labels, metric = metric)
+
+
+def clusters_silhouette(vdf, clusters):                                 # 261017
+    # exact silhouette of cluster_words_kmeans clusters of vdf words
+    label = {w: i for i, words in enumerate(clusters['cluster_words'])
+             for w in words}
+    m = vdf[[x for x in vdf.columns if isinstance(x, int)]].values
+    return silhouette_score(m, [label[w] for w in vdf['word']],
+                            metric = 'euclidean')
+
+
+def cluster_words_kmeans(words_df, n_clusters, init = 'k-means++', n_init = 10,
+                         random_state = None, batch_size = None,
+                         sample = None):
     # words_df: pandas DataFrame
     # init: 'k-means++', 'random', ndarray with random seed
     # n_init: number of initializations (runs), default 10
+    # random_state: None ⇒ np.random, int seed ⇒ reproducible fit      # 261017
+    # batch_size: None ⇒ KMeans, int ⇒ MiniBatchKMeans                 # 261017
+    # sample: silhouette sample size ⇒ sampled_silhouette               # 261017
     words_list = words_df['word'].tolist()
 
     if n_clusters < 2:                                                  # 90104
@@ -30,12 +66,18 @@ def cluster_words_kmeans(words_df, n_clusters, init = 'k-means++', n_init = 10):
     del df['word']
     # fails? = KMeans(init='random', n_clusters=n_clusters, n_init=30)
     # kmeans_model = KMeans(init='k-means++', n_clusters=n_clusters, n_init=10)
-    kmeans_model = KMeans(init = init, n_clusters = n_clusters, n_init = n_init)
+    if batch_size is None:
+        kmeans_model = KMeans(init = init, n_clusters = n_clusters,
+                              n_init = n_init, random_state = random_state)
+    else:                                                               # 261017
+        kmeans_model = MiniBatchKMeans(init = init, n_clusters = n_clusters,
+                                       n_init = n_init, batch_size = batch_size,
+                                       random_state = random_state)
     kmeans_model.fit(df)
     labels = kmeans_model.labels_
     inertia = kmeans_model.inertia_
     centroids = np.asarray(kmeans_model.cluster_centers_[:(max(labels) + 1)])
-    silhouette = silhouette_score(df, labels, metric = 'euclidean')
+    silhouette = sampled_silhouette(df, labels, 'euclidean', sample)   # 261017
 
     cdf = pd.DataFrame(centroids)
     cdf = cdf.applymap(lambda x: x if abs(x) > 1e-12 else 0.)
@@ -54,6 +96,186 @@ def cluster_words_kmeans(words_df, n_clusters, init = 'k-means++', n_init = 10):
     return cdf, silhouette, inertia
 
 
+def kmeans_options(algo):                                               # 261017
+    # 'clustering' ⇒ init, n_init, batch_size:
+    # 'kmeans' / ['kmeans', init, n_init] ⇒ KMeans
+    # 'minibatch' / ['minibatch', init, n_init, batch_size] ⇒ MiniBatchKMeans
+    # init: 'k-means++' / 'random' / 'warm': k+1 clusters fit in a search
+    #       seeded from k clusters fit ⇒ kmeans_search, best_clusters
+    init = 'k-means++'
+    n_init = 10
+    batch_size = None
+    if type(algo) is str:
+        algo = [algo]
+    if type(algo) in [tuple, list] and algo[0] in ['kmeans', 'minibatch']:
+        if algo[0] == 'minibatch':
+            batch_size = 1024
+            if len(algo) > 3:
+                try: batch_size = int(algo[3])
+                except: batch_size = 1024
+        if len(algo) > 1 and algo[1][0] == 'r': init = 'random'
+        if len(algo) > 1 and algo[1][0] == 'w': init = 'warm'
+        if len(algo) > 2:
+            try: n_init = int(algo[2])
+            except: n_init = 10
+    return init, n_init, batch_size
+
+
+def cluster_centers(clusters):                                          # 261017
+    # cluster_words_kmeans clusters ⇒ centroids ndarray / None: 1 cluster
+    cols = [x for x in clusters.columns if isinstance(x, int)]
+    return clusters[cols].values if len(cols) > 0 else None
+
+
+def warm_init(m, centers, n_clusters, random_state = None):             # 261017
+    # k centers ⇒ n_clusters centers: + vectors sampled with probability
+    # ~ squared distance to the nearest center, as in k-means++
+    rs = np.random if random_state is None \
+        else np.random.RandomState(random_state)
+    centers = list(centers[:n_clusters])
+    d2 = pairwise_distances(m, np.asarray(centers)).min(axis = 1) ** 2
+    while len(centers) < n_clusters:
+        if d2.sum() > 0:
+            i = int(rs.choice(len(m), p = d2 / d2.sum()))
+        else:
+            i = int(rs.randint(len(m)))
+        centers.append(m[i])
+        d2 = np.minimum(d2, ((m - m[i]) ** 2).sum(axis = 1))
+    return np.asarray(centers)
+
+
+class _Plateau:                                                         # 261017
+    # patience fits in a row without silhouette gain > tolerance ⇒ stopped
+    def __init__(self, patience = 0, tolerance = 0.001):
+        self.patience = patience
+        self.tolerance = tolerance
+        self.best = None
+        self.stale = 0
+        self.stopped = False
+
+    def update(self, silhouette):
+        if self.patience < 1:
+            return
+        if self.best is None or silhouette > self.best + self.tolerance:
+            self.best = silhouette
+            self.stale = 0
+        else:
+            self.stale += 1
+            self.stopped = self.stale >= self.patience
+
+
+def _init_kmeans_worker(vdf):                                           # 261017
+    global _worker_vdf
+    _worker_vdf = vdf
+
+
+def _fit_kmeans(vdf, n_clusters, init, n_init, seed, batch_size = None,
+                sample = None):                                         # 261017
+    # one candidate fit ⇒ (clusters, silhouette, inertia) / None: failed
+    try:
+        return cluster_words_kmeans(vdf, n_clusters, init, n_init, seed,
+                                    batch_size, sample)
+    except:
+        return None
+
+
+def _fit_kmeans_worker(args):
+    return _fit_kmeans(_worker_vdf, *args)
+
+
+def _fit_kmeans_runs(vdf, candidates, init, n_init, batch_size,
+                     patience, tolerance, sample = None):               # 261017
+    # sequential fits ⇒ [(run, n_clusters, c, s, i)]; 'warm' init: each fit
+    # of a run seeded from the previous fit, k-means++ for the 1st one
+    m = vdf[[x for x in vdf.columns if isinstance(x, int)]].values
+    results = []
+    plateaus = dict()
+    centers = dict()
+    for run, n, seed in candidates:
+        plateau = plateaus.setdefault(run, _Plateau(patience, tolerance))
+        if plateau.stopped:
+            continue
+        if init != 'warm':
+            fit = _fit_kmeans(vdf, n, init, n_init, seed, batch_size, sample)
+        elif centers.get(run) is None:
+            fit = _fit_kmeans(vdf, n, 'k-means++', n_init, seed, batch_size,
+                              sample)
+        else:
+            fit = _fit_kmeans(vdf, n, warm_init(m, centers[run], n, seed),
+                              1, seed, batch_size, sample)
+        if init == 'warm':
+            centers[run] = None if fit is None else cluster_centers(fit[0])
+        if fit is not None:
+            results.append((run, n) + tuple(fit))
+            plateau.update(fit[1])
+    return results
+
+
+def _fit_kmeans_runs_worker(args):
+    return _fit_kmeans_runs(_worker_vdf, *args)
+
+
+def kmeans_seeds(n, seed = None, jobs = 1):                             # 261017
+    # jobs < 2, seed None ⇒ [None]: KMeans uses np.random as before;
+    # parallel fits get seeds drawn in the parent: forked workers share
+    # the np.random state and would repeat the same "random" fits
+    if seed is None and jobs < 2:
+        return [None] * n
+    rs = np.random if seed is None else np.random.RandomState(seed)
+    return rs.randint(np.iinfo(np.int32).max, size = n).tolist()
+
+
+def kmeans_search(vdf, candidates, init = 'k-means++', n_init = 10,
+                  jobs = 1, patience = 0, tolerance = 0.001,
+                  batch_size = None, sample = None):                    # 261017
+    # candidates: [(run, n_clusters, seed)] ⇒ [(run, n_clusters, c, s, i)]
+    #   fitted clusters c, silhouette s, inertia i in candidates order,
+    #   failed fits skipped
+    # init: 'warm' ⇒ fits of a run seeded from the previous fit of the run,
+    #   runs are fitted in parallel, candidates grouped by run
+    # jobs > 1: fits fanned out across processes (-1: all CPUs), the same
+    #   results as jobs = 1 with the same seeds
+    # patience > 0: a run stops after patience fits in a row without
+    #   silhouette gain > tolerance over the best fit of the run (plateau)
+    # batch_size: None ⇒ KMeans, int ⇒ MiniBatchKMeans
+    # sample: silhouette sample size ⇒ sampled_silhouette
+    if jobs < 0: jobs = os.cpu_count() or 1
+    runs = []
+    for x in candidates:
+        if x[0] not in runs: runs.append(x[0])
+
+    if jobs < 2 or len(candidates) < 2 or (init == 'warm' and len(runs) < 2):
+        return _fit_kmeans_runs(vdf, candidates, init, n_init, batch_size,
+                                patience, tolerance, sample)
+
+    results = []
+    with ProcessPoolExecutor(max_workers = jobs, initializer = _init_kmeans_worker,
+                             initargs = (vdf,)) as executor:
+        if init == 'warm':  # sequential k chain in each run
+            for fits in executor.map(_fit_kmeans_runs_worker, [
+                    ([x for x in candidates if x[0] == run], init, n_init,
+                     batch_size, patience, tolerance, sample) for run in runs]):
+                results.extend(fits)
+            return results
+
+        plateaus = {run: _Plateau(patience, tolerance) for run in runs}
+        todo = list(candidates)
+        while len(todo) > 0:
+            # plateau check after every `jobs` fits, all at once otherwise
+            todo = [x for x in todo if not plateaus[x[0]].stopped]
+            size = jobs if patience > 0 else len(todo)
+            chunk, todo = todo[:size], todo[size:]
+            fits = executor.map(_fit_kmeans_worker,
+                                [(n, init, n_init, seed, batch_size, sample)
+                                 for _, n, seed in chunk])
+            for (run, n, seed), fit in zip(chunk, fits):
+                if fit is not None and not plateaus[run].stopped:
+                    results.append((run, n) + tuple(fit))
+                    plateaus[run].update(fit[1])
+
+    return results
+
+
 def number_of_clusters(vdf, **kwargs):                                  # 90104
     logger = logging.getLogger(__name__ + "number_of_clusters")
     algorithm = kwa('kmeans', 'clustering', **kwargs)
@@ -61,6 +283,10 @@ def number_of_clusters(vdf, **kwargs):                                  # 90104
     level = kwa(1.0, 'cluster_level', **kwargs)
     verbose = kwa('none', 'verbose', **kwargs)
     crange = kwa((2, 48, 3), 'cluster_range', **kwargs)
+    jobs = kwa(1, 'cluster_jobs', **kwargs)                             # 261017
+    patience = kwa(0, 'cluster_patience', **kwargs)                     # 261017
+    seed = kwa(None, 'cluster_seed', **kwargs)                          # 261017
+    sample = kwa(None, 'silhouette_sample', **kwargs)                   # 261017
     # crange :: cluster range:
     # (10) = (10,10) = (10,10,n) :: 10 clusters
     # (10,40,5) :: min, max, step
@@ -84,23 +310,34 @@ def number_of_clusters(vdf, **kwargs):                                  # 90104
         return 4  # FIXME: hack Turtle 80420!
     n_clusters = max_clusters
 
+    # 261017 all (attempt, number of clusters) fits ⇒ kmeans_search,
+    # then the sequential selection over the fits in the same order
+    steps = list(range(crange[0], max_clusters, crange[2]))
+    seeds = kmeans_seeds(attempts * len(steps), seed, jobs)
+    candidates = [(k, j, seeds[k * len(steps) + i])
+                  for k in range(attempts) for i, j in enumerate(steps)]
+    init, n_init, batch_size = kmeans_options(algorithm)
+    if init != 'warm':  # legacy search settings
+        init, n_init = 'k-means++', 10
+    fits = kmeans_search(vdf, candidates, init, n_init, jobs, patience,
+                         batch_size = batch_size, sample = sample)
+
     lst = []
-    for k in range(attempts):
-        for i, j in enumerate(range(crange[0], max_clusters, crange[2])):
-            cdf, silhouette, inertia = cluster_words_kmeans(vdf, j)
-            sil_range.loc[i] = [j, len(cdf), round(silhouette, 4),
-                                round(inertia, 2)]
-            if level > 0.9999:  # 1 - max Silhouette index
-                n_clusters = \
-                    sil_range.loc[sil_range['Silhouette'].idxmax()]['Nc']
-            elif level < 0.0001:  # 0 - max number of clusters
-                n_clusters = sil_range.loc[sil_range['Nc'].idxmax()]['Nc']
-            else:
-                thresh = level * sil_range \
-                    .loc[sil_range['Silhouette'].idxmax()]['Silhouette']
-                n_clusters = min(sil_range.loc[sil_range['Silhouette'] >
-                                               thresh]['Nc'].tolist())
-            lst.append(int(n_clusters))
+    for k, j, cdf, silhouette, inertia in fits:
+        i = steps.index(j)
+        sil_range.loc[i] = [j, len(cdf), round(silhouette, 4),
+                            round(inertia, 2)]
+        if level > 0.9999:  # 1 - max Silhouette index
+            n_clusters = \
+                sil_range.loc[sil_range['Silhouette'].idxmax()]['Nc']
+        elif level < 0.0001:  # 0 - max number of clusters
+            n_clusters = sil_range.loc[sil_range['Nc'].idxmax()]['Nc']
+        else:
+            thresh = level * sil_range \
+                .loc[sil_range['Silhouette'].idxmax()]['Silhouette']
+            n_clusters = min(sil_range.loc[sil_range['Silhouette'] >
+                                           thresh]['Nc'].tolist())
+        lst.append(int(n_clusters))
 
     if len(lst) < 1:                                                    # 90104
         logger.debug("number_of_clusters » empty lst")
@@ -130,13 +367,28 @@ def number_of_clusters(vdf, **kwargs):                                  # 90104
     return int(n_clusters)
 
 
-def best_clusters(vdf, **kwargs):                                       # 90104
+def best_clusters(vdf, **kwargs):                                       # 261017
+    # 'silhouette_sample': None ⇒ exact silhouette index of each candidate
+    # clustering / size, (size, seed) ⇒ sampled silhouette for selection,
+    # exact silhouette of the best clustering
+    sample = kwa(None, 'silhouette_sample', **kwargs)
+    clusters, silhouette, inertia = search_clusters(vdf, **kwargs)
+    if sample is not None and isinstance(clusters, pd.DataFrame) \
+            and len(clusters) > 1:
+        silhouette = clusters_silhouette(vdf, clusters)
+    return clusters, silhouette, inertia
+
+
+def search_clusters(vdf, **kwargs):                                     # 90104
     logger = logging.getLogger(__name__ + ".best_clusters")
     algo = kwa('kmeans', 'clustering', **kwargs)
     criteria = kwa('silhouette', 'cluster_criteria', **kwargs)
     level = kwa(1.0, 'cluster_level', **kwargs)
     verbose = kwa('none', 'verbose', **kwargs)
     crange = kwa([2, 50, 2], 'cluster_range', **kwargs)
+    jobs = kwa(1, 'cluster_jobs', **kwargs)                             # 261017
+    seed = kwa(None, 'cluster_seed', **kwargs)                          # 261017
+    sample = kwa(None, 'silhouette_sample', **kwargs)                   # 261017
     # crange = kwa(10, 'cluster_range', **kwargs)
     # crange :: cluster range:
     # [10], [10,10] :: 10 clusters
@@ -147,40 +399,26 @@ def best_clusters(vdf, **kwargs):                                       # 90104
     #                                     with the same number of clusters
     if type(crange) is int:
         crange = [crange, crange]
-    init = 'k-means++'
-    n_init = 10
-    if type(algo) is str:
-        if algo == 'kmeans':
-            algorithm = 'kmeans'
-            init = 'k-means++'
-            n_init = 10
-    elif type(algo) in [tuple, list]:
-        if algo[0] == 'kmeans':
-            algorithm = 'kmeans'
-            if len(algo) > 1 and algo[1][0] == 'r': init = 'random'
-            if len(algo) > 2:
-                try: n_init = int(algo[2])
-                except: n_init = 10
+    init, n_init, batch_size = kmeans_options(algo)                     # 261017
+    warm = init == 'warm'
+    if warm:  # given number of clusters fits: k-means++
+        init = 'k-means++'
 
     if crange[0] == crange[1]:  # given n_clusters
         if len(crange) > 2 and crange[2] > 1:  # run crange[2] times
-            lst = []
-            for n in range(crange[2]):
-                try:
-                    c, s, i = cluster_words_kmeans(vdf, crange[0], init, n_init)
-                    lst.append((n, crange[0], c, s, i))
-                except:
-                    if n == crange[2] - 1 and len(lst) == 0:
-                        return 0, 0, 0
-                    else:
-                        continue
+            seeds = kmeans_seeds(crange[2], seed, jobs)                 # 261017
+            lst = kmeans_search(vdf, [(n, crange[0], seeds[n])
+                                      for n in range(crange[2])],
+                                init, n_init, jobs, batch_size = batch_size,
+                                sample = sample)
             lst.sort(key = itemgetter(3), reverse = True)
             if len(lst) > 0:
                 return lst[0][2], lst[0][3], lst[0][4]
             else:
                 return 0, 0, 0
         else:  # run once
-            clusters, silhouette, inertia = cluster_words_kmeans(vdf, crange[0])
+            clusters, silhouette, inertia = cluster_words_kmeans(
+                vdf, crange[0], batch_size = batch_size, sample = sample)
             return clusters, silhouette, inertia
 
     elif crange[1] > crange[0]:  # 80809 option: legacy search in a given range
@@ -190,22 +428,39 @@ def best_clusters(vdf, **kwargs):                                       # 90104
                 {'cluster': 'B', 'cluster_words': [vdf['word'].tolist()]}), 0, 0
 
         if len(crange) > 3 and crange[3] > 1:
-            lst = []
-            for n in range(crange[3]):
-                try:
-                    c, s, i = cluster_words_kmeans(vdf, n_clstrs, init, n_init)
-                    lst.append((n, n_clstrs, c, s, i))
-                except:
-                    if n == crange[3] - 1 and len(lst) == 0:
-                        return 0, 0, 0
-                    else:
-                        continue
+            seeds = kmeans_seeds(crange[3], seed, jobs)                 # 261017
+            lst = kmeans_search(vdf, [(n, n_clstrs, seeds[n])
+                                      for n in range(crange[3])],
+                                init, n_init, jobs, batch_size = batch_size,
+                                sample = sample)
+            if len(lst) == 0:
+                return 0, 0, 0
             lst.sort(key = itemgetter(3), reverse = True)
             return lst[0][2], lst[0][3], lst[0][4]
         else:
-            clusters, silhouette, inertia = cluster_words_kmeans(vdf, n_clstrs)
+            clusters, silhouette, inertia = cluster_words_kmeans(
+                vdf, n_clstrs, batch_size = batch_size, sample = sample)
             return clusters, silhouette, inertia
     else:  # TODO: elif algorithm == 'kmeans'
+        m = vdf[[x for x in vdf.columns if isinstance(x, int)]].values
+        fits = []  # [(n_clusters, centroids)] ⇒ 'warm' init             # 261017
+        seeds = None if seed is None else np.random.RandomState(seed)
+
+        def kmeans(n):  # 'warm': seeded from the largest smaller k fit
+            state = None if seeds is None \
+                else int(seeds.randint(np.iinfo(np.int32).max))
+            smaller = [x for x in fits if x[0] < n and x[1] is not None]
+            if warm and len(smaller) > 0:
+                centers = max(smaller, key = itemgetter(0))[1]
+                fit = cluster_words_kmeans(vdf, n,
+                                           warm_init(m, centers, n, state), 1,
+                                           state, batch_size, sample)
+            else:
+                fit = cluster_words_kmeans(vdf, n, init, n_init, state,
+                                           batch_size, sample)
+            fits.append((n, cluster_centers(fit[0])))
+            return fit
+
         # Check number of clusters <= word vector dimensionality
         max_clusters = min(max(crange[0], crange[1]), len(vdf),
                            max([x for x in list(vdf) if isinstance(x, int)]))
@@ -216,7 +471,7 @@ def best_clusters(vdf, **kwargs):                                       # 90104
         i = 0
         while max_clusters > crange[0]:
             try:
-                c, s, i = cluster_words_kmeans(vdf, max_clusters, init, n_init)
+                c, s, i = kmeans(max_clusters)
                 break
             except:
                 max_clusters -= 1
@@ -232,32 +487,31 @@ def best_clusters(vdf, **kwargs):                                       # 90104
             else:  # check min clusters, find min viable # FIXME: overkill?
                 while min_clusters < max_clusters:
                     try:
-                        c, s, i = cluster_words_kmeans(vdf, min_clusters,
-                                                       init, n_init)
+                        c, s, i = kmeans(min_clusters)
                         break
                     except:
                         min_clusters += 1
             lst.append((1, min_clusters, c, s, i))
             middle = int((min_clusters + max_clusters) / 2)
-            c, s, i = cluster_words_kmeans(vdf, middle, init, n_init)
+            c, s, i = kmeans(middle)
             lst.append((2, middle, c, s, i))
             lst.sort(key = itemgetter(3), reverse = True)
 
             ntop = 1
             while ntop < crange[2]:
                 no = lst[0][1]
-                c, s, i = cluster_words_kmeans(vdf, no, init, n_init)
+                c, s, i = kmeans(no)
                 lst.append((len(lst), no, c, s, i))
                 dn = int(round(0.6 * abs(no - lst[ntop][1]), 0))
                 if ntop > crange[2] / 2.0:
                     dn = 1
                 if no > min_clusters:
                     nm = max(no - dn, min_clusters)
-                    c, s, i = cluster_words_kmeans(vdf, nm, init, n_init)
+                    c, s, i = kmeans(nm)
                     lst.append((len(lst), nm, c, s, i))
                 if no < max_clusters:
                     nm = min(no + dn, max_clusters)
-                    c, s, i = cluster_words_kmeans(vdf, nm, init, n_init)
+                    c, s, i = kmeans(nm)
                     lst.append((len(lst), nm, c, s, i))
                 lst.sort(key = itemgetter(3), reverse = True)
                 for n, x in enumerate(lst):
@@ -351,3 +605,6 @@ def random_clusters(links, **kwargs):
 # 90104 resolve Turtle MST LW crash: 1 cluster
 # 90209 group_links: add min_word_count to 80925 legacy version
 # 90221 kmeans defaults updated for Grammar Learner tutorial
+# 261017 kmeans_search: parallel (n_clusters, seed) fits, plateau early stop
+# 261017 'minibatch' MiniBatchKMeans, 'warm' init: k+1 fit seeded from k fit
+# 261017 'silhouette_sample': sampled silhouette for selection, exact for best
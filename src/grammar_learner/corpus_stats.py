@@ -4,6 +4,7 @@ from collections import Counter
 
 def corpus_stats(lines, extended = False):
     # lines :: [str] -- parses file converted to a list of strings
+    #       or [[str]] -- split lines of binary ULL corpora         # 261017
     words = Counter()   # words in sentences
     pw = Counter()      # parsed words
     npw = Counter()     # non-parsed words
@@ -17,9 +18,9 @@ def corpus_stats(lines, extended = False):
     sentence = []       # a list of words (used within loops)
     sentence_lengths = []  # a list of sentence lengths (to find max, mean)
 
-    for line in lines:
-        if(len(line)) > 1:
-            x = line.split()
+    for line in lines:  # 261017 text lines or split lines: lists of tokens
+        if(len(line)) > 1 or type(line) is list:
+            x = line.split() if type(line) is str else line
             if len(x) in [4, 5] and x[0].isdigit() and x[2].isdigit():
                 if x[1] != '###LEFT-WALL###' and x[3] != '.':
                     links[(x[1], x[3])] += 1
@@ -114,3 +115,4 @@ def corpus_stats(lines, extended = False):
 # 90217 update for use with filtered dataset
 # 90219 count non-linked words, not marked as [not parsed] -- nlw, nlws, nnlws
 # TODO: update sentence length count to parsed words?
+# 261017 split lines (lists of tokens) of binary ULL corpora
@@ -2,6 +2,7 @@
 import logging
 from copy import deepcopy
 from collections import Counter
+import numpy as np
 from typing import List, Tuple
 from .utl import UTC, kwa
 
@@ -60,6 +61,52 @@ def add_disjuncts(cats, links, **kwargs):
     return fat_cats
 
 
+def fast_add_disjuncts(cats, links, **kwargs):                          # 261017
+    # add_disjuncts with one groupby for all clusters ⇒ the same {cats}
+    # cats: {'cluster': [], 'words': [], }
+    # links: pd.DataFrame(columns = ['word', 'link', 'count'])
+    added = ['counts', 'disjuncts', 'dj_counts', 'djs']
+    fat_cats = {key: (None if key in added else deepcopy(value))
+                for key, value in cats.items()}  # no copies of replaced keys
+    top_clusters = [i for i, x in enumerate(cats['cluster']) if
+                    i > 0 and x is not None]
+    word_clusters = dict()
+    for i in top_clusters:
+        for word in cats['words'][i]:
+            word_clusters[word] = i
+
+    df = links[['word', 'link', 'count']].copy()
+    df['cluster'] = df['word'].map(word_clusters).fillna(0).astype(int)
+    counts = df.groupby('cluster')['count'].sum()
+    fat_cats['counts'] = [0] + counts[counts.index > 0].tolist()
+
+    cdf = df.groupby(['cluster', 'link'], as_index = False)['count'].sum() \
+        .sort_values(by = ['cluster', 'count'], ascending = [True, False])
+    ldf = df[['link', 'count']].groupby('link').sum().sort_values(
+        by = 'count', ascending = False).reset_index()
+    djdict = {x: i for i, x in enumerate(ldf['link'].tolist())}
+    cdf['dj'] = cdf['link'].map(djdict)
+
+    # cdf rows sorted by cluster ⇒ [start, end) row range of each cluster
+    ids, starts = np.unique(cdf['cluster'].values, return_index = True)
+    ranges = dict(zip(ids.tolist(), zip(starts.tolist(),
+                                        starts[1:].tolist() + [len(cdf)])))
+    disjuncts = cdf['link'].tolist()
+    dj_counts = cdf['count'].tolist()
+    djs = cdf.sort_values(by = ['cluster', 'dj'])['dj'].tolist()
+
+    fat_cats['disjuncts'] = [[]]
+    fat_cats['dj_counts'] = [[]]
+    fat_cats['djs'] = [[]]
+    for cluster in top_clusters:
+        start, end = ranges.get(cluster, (0, 0))
+        fat_cats['disjuncts'].append(disjuncts[start:end])
+        fat_cats['dj_counts'].append(dj_counts[start:end])
+        fat_cats['djs'].append(djs[start:end])
+
+    return fat_cats
+
+
 def prune_cats(categories, **kwargs):  # 81204 checked as check_cats ~OK?
     # check each category has associated disjuncts, delete if no disjuncts
     # 81204 ad-hoc:  lost hierarchy, connectors to deleted clusters :(
@@ -83,9 +130,11 @@ def check_cats(cats, **kwargs):
     return {'orphaned_clusters': orphans}
 
 
-def induce_grammar(categories, **kwargs):
+def induce_grammar(categories, symbols = None, **kwargs):
     logger = logging.getLogger(__name__ + ".induce_grammar")
     # categories: {'cluster': [], 'words': [], ...}
+    # symbols: SymbolTable if words, disjuncts are integer ids         # 261017
+    #          None: words, disjuncts as strings 'a- & was-' (legacy)
     max_disjuncts = kwa(100000, 'max_disjuncts', **kwargs)
     verbose = kwa('none', 'verbose', **kwargs)
 
@@ -102,23 +151,29 @@ def induce_grammar(categories, **kwargs):
     for cluster in clusters:
         djs = []
         for i, rule in enumerate(categories['disjuncts'][cluster]):
+            lefts = []
+            rights = []
             if type(rule) is str:  # 'a- & was-' ⇒ (-9,-26) + reverse 81012
-                x = rule.split()
-                lefts = []
-                rights = []
-                for y in x:
+                for y in rule.split():
                     if (y not in ['&', ' ', '']) and (y[:-1] in word_clusters):
                         if y[-1] == '+':
                             rights.append(word_clusters[y[:-1]])
                         elif y[-1] == '-':
                             lefts.append(-1 * word_clusters[y[:-1]])
                         else:
-                            print('no sign?', y, 'in', x)  # TODO:ERROR?
-                lefts.reverse()  # 81012
-                dj = lefts + rights
-                if len(dj) > 0:
-                    djs.append(tuple(dj))
-                    dj_counts[tuple(dj)] += categories['dj_counts'][cluster][i]
+                            print('no sign?', y, 'in', rule)  # TODO:ERROR?
+            elif symbols is not None:  # term id, parsed once           # 261017
+                for x in symbols.connectors[rule]:
+                    if abs(x) in word_clusters:
+                        if x > 0:
+                            rights.append(word_clusters[x])
+                        else:
+                            lefts.append(-1 * word_clusters[-x])
+            lefts.reverse()  # 81012
+            dj = lefts + rights
+            if len(dj) > 0:
+                djs.append(tuple(dj))
+                dj_counts[tuple(dj)] += categories['dj_counts'][cluster][i]
 
         rules['disjuncts'][cluster] = set(djs)
 
@@ -165,3 +220,6 @@ def induce_grammar(categories, **kwargs):
 # 81102 max_disjuncts ⇒ induce_grammar
 # 81204 add_disjuncts, check_cats, prune_cats :: resolve rules with empty dj list
 # 81231 cleanup
+# 261017 induce_grammar: disjuncts as SymbolTable term ids, not re-split
+# 261017 induce_grammar: symbols = None ⇒ string disjuncts, legacy calls
+# 261017 fast_add_disjuncts: add_disjuncts without per-cluster filtering
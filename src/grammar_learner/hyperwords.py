@@ -7,6 +7,7 @@ import pandas as pd
 #-from collections import Counter
 from scipy.sparse import dok_matrix, csr_matrix
 from sparsesvd import sparsesvd
+from sklearn.utils.extmath import randomized_svd
 import matplotlib.pyplot as plt
 
 '''links => PMI'''
@@ -178,7 +179,7 @@ class EnsembleEmbedding(Embedding):
 
 def list2tsv(lst, path):
     with open(path, 'w') as f:
-        for item in lst: f.write(item + '\n')
+        for item in lst: f.write(str(item) + '\n')  # 261017 ids
     return {'saved_items': len(lst)}
 
 def links2vec(links,out_path,tmp_path,dim=100,cds=1.0,eig=0.5,verbose='none'):
@@ -378,7 +379,64 @@ def epmisvd(links,path,tmpath,dim=100,cds=1.0,eig=0.5,neg=1,verbose='none'):
     return vectors_df, response
 
 
-def pmisvd(links,path,tmpath, dim=100, cds=1.0, eig=0.5, neg=1, verbose='none'):
+def positive_explicit(pmi, neg=1):                                  # 261017
+    # PositiveExplicit(path, normalize=False, neg) without .npz round-trip
+    m = pmi.copy()
+    m.data = np.log(m.data)
+    m.data -= np.log(neg)
+    m.data[m.data < 0] = 0
+    m.eliminate_zeros()
+    return m
+
+def svd_embedding(ut, s, eig=0.0, normalize=True):                   # 261017
+    # SVDEmbedding(path, normalize, eig).m without .npy round-trip
+    if eig == 0.0:   m = ut.T
+    elif eig == 1.0: m = s * ut.T
+    else:            m = np.power(s, eig) * ut.T
+    if normalize:
+        norm = np.sqrt(np.sum(m * m, axis=1))
+        m = m / norm[:, np.newaxis]
+    return m
+
+def truncated_svd(m, dim, svd='sparsesvd'):                          # 261017
+    # m: scipy.sparse PPMI matrix ⇒ ut, s, vt ~ sparsesvd(m, dim)
+    # svd: 'sparsesvd' / ('randomized', oversamples, power iterations)
+    if type(svd) is str: svd = (svd,)
+    if svd[0] == 'randomized':
+        n_oversamples = svd[1] if len(svd) > 1 else 10
+        n_iter = svd[2] if len(svd) > 2 else 4
+        u, s, vt = randomized_svd(m, min(dim, min(m.shape)),
+                                  n_oversamples=n_oversamples, n_iter=n_iter,
+                                  random_state=0)
+        # drop (numerically) zero singular values like sparsesvd
+        rank = int(np.sum(s > s[0] * np.finfo(s.dtype).eps * max(m.shape)))
+        return u[:, :rank].T, s[:rank], vt[:rank]
+    return sparsesvd(m.tocsc(), dim)
+
+def vectors_frame(iw, m):                                           # 261017
+    # words + embedding matrix ⇒ vectors_df in one step, no row by row .loc
+    vectors_df = pd.DataFrame(m, columns=list(range(1, m.shape[1]+1)))
+    vectors_df.insert(0, 'word', iw)
+    return vectors_df
+
+def save_vectors(iw, m, path):                                      # 261017
+    # binary dump: path.npy matrix + path.vocab word index, row i ⇔ word i
+    np.save(path + '.npy', m)
+    list2tsv(iw, path + '.vocab')
+    return {'vectors_file': path + '.npy', 'vocabulary_file': path + '.vocab'}
+
+def load_vectors(path):                                             # 261017
+    # save_vectors ⇒ vectors_df (words as saved: str)
+    wi, iw = load_vocabulary(path + '.vocab')
+    return vectors_frame(iw, np.load(path + '.npy'))
+
+def sv_dim(sv, sv_min=0.9):                                         # 261017
+    # number of singular values (in descending order, sorted by pmisvd)
+    # down to the last one greater than sv_min * max(sv) ⇒ dimension
+    return max([i for i,x in enumerate(sv) if x > max(sv)*sv_min]) + 1
+
+def pmisvd(links,path,tmpath, dim=100, cds=1.0, eig=0.5, neg=1, verbose='none',
+           save_files=False, svd='sparsesvd', sv_min=None, symbols=None):
     logger = logging.getLogger(__name__ + ".pmisvd")
     '''80223 epmisvd enhanced: return +singular values'''
     # path - dir to save vectors.txt and readme
@@ -387,11 +445,15 @@ def pmisvd(links,path,tmpath, dim=100, cds=1.0, eig=0.5, neg=1, verbose='none'):
     # eig = 0.5 # weighted exponent of the eigenvalue matrix [default: 0.5]
     # neg = 1   # Number of negative samples; [default: 1] subtracts its log from PMI
                 # PMI => SVD PositiveExplicit parameter
-    if tmpath[-1] == '/': tmpath = tmpath[:-1]
-    if path[-1] == '/': path = path[:-1]
+    # save_files: save pmi, svd, vectors.txt files, RAM2RAM otherwise  # 261017
+    #             'npy' ⇒ binary vectors.npy + vectors.vocab, not vectors.txt
+    # svd: 'sparsesvd' / ('randomized', oversamples, iterations) ⇒ truncated_svd
+    # sv_min: None ⇒ dim vectors / float ⇒ sv_dim(s, sv_min) vectors sliced
+    #         from the same SVD: no separate vector_space_dim SVD     # 261017
+    # symbols: SymbolTable if links words and terms are integer ids, saved
+    #          files list decoded words and terms                    # 261017
 
     '''links => PMI'''
-    pmi_path = tmpath + '/pmi'
     start = time.time()
     #-linkz = links.loc[(links['count'] > 2)]
     linkz = links
@@ -417,47 +479,63 @@ def pmisvd(links,path,tmpath, dim=100, cds=1.0, eig=0.5, neg=1, verbose='none'):
             tmp_counts = dok_matrix((len(wi), len(ci)), dtype=np.float32)
             i = 0
     counts = counts + tmp_counts.tocsr()
-    list2tsv(iw, pmi_path + '.words.vocab')  # any need to save?
-    list2tsv(ic, pmi_path + '.contexts.vocab')
 
     '''counts + vocab => pmi'''
     pmi = calc_pmi(counts, cds)
-    np.savez_compressed(pmi_path, \
-        data=pmi.data, indices=pmi.indices, indptr=pmi.indptr, shape=pmi.shape)
 
     '''PMI => SVD'''
-    svd_path = pmi_path[:-3] + 'svd'
-    explicit = PositiveExplicit(pmi_path, normalize=False, neg=neg)
-    ut, s, vt = sparsesvd(explicit.m.tocsc(), dim)
-    np.save(svd_path + '.ut.npy', ut)
-    np.save(svd_path + '.s.npy', s)
-    np.save(svd_path + '.vt.npy', vt)
-    list2tsv(explicit.iw, svd_path + '.words.vocab')  # any need to save?
-    list2tsv(explicit.ic, svd_path + '.contexts.vocab')
-
-    '''SVD => vectors.txt'''
-    svd = SVDEmbedding(svd_path, True, eig)   # TODO: move code here, RAM2RAM
-    if len(svd.m[0]) < dim: dim = len(svd.m[0])   # 80216
-    vectors_df = pd.DataFrame(columns=['word'] + list(range(1,dim+1)))
-    for i, w in enumerate(svd.iw):
-        vectors_df.loc[i] = [w] + svd.m[i].tolist()
-    out_file = path + '/vectors.txt'
-    with open(out_file, 'w') as file:
-        for i, w in enumerate(svd.iw):
-            file.write(w+' '+(' '.join([str(x) for x in svd.m[i]]))+'\n')
-    readme_path = path + '/vectors_readme.txt'
-    readme = 'Word vectors: dimension '+str(dim)+', '+str(len(svd.iw))+' vectors'
-    with open(readme_path, 'w') as f: f.write(readme)
+    ut, s, vt = truncated_svd(positive_explicit(pmi, neg), dim, svd)  # 261017
+    # sparsesvd may return spurious near-zero values out of order ⇒ sort
+    order = np.argsort(-s, kind='stable')                               # 261017
+    ut, s, vt = ut[order], s[order], vt[order]
+    if sv_min is not None:                                              # 261017
+        dim = sv_dim(s, sv_min)
+        ut, s, vt = ut[:dim], s[:dim], vt[:dim]
+
+    '''SVD => vectors'''
+    m = svd_embedding(ut, s, eig)
+    if len(m[0]) < dim: dim = len(m[0])   # 80216
+    vectors_df = vectors_frame(iw, m)                                   # 261017
+
+    response = {}
+    if save_files:  # the same files as before 261017, not read back
+        if tmpath[-1] == '/': tmpath = tmpath[:-1]
+        if path[-1] == '/': path = path[:-1]
+        if symbols is not None:                                         # 261017
+            iw = symbols.decode(iw)
+            ic = [symbols.terms[c] for c in ic]
+        pmi_path = tmpath + '/pmi'
+        list2tsv(iw, pmi_path + '.words.vocab')
+        list2tsv(ic, pmi_path + '.contexts.vocab')
+        np.savez_compressed(pmi_path, \
+            data=pmi.data, indices=pmi.indices, indptr=pmi.indptr, shape=pmi.shape)
+        svd_path = pmi_path[:-3] + 'svd'
+        np.save(svd_path + '.ut.npy', ut)
+        np.save(svd_path + '.s.npy', s)
+        np.save(svd_path + '.vt.npy', vt)
+        list2tsv(iw, svd_path + '.words.vocab')
+        list2tsv(ic, svd_path + '.contexts.vocab')
+        if save_files == 'npy':                                         # 261017
+            response.update(save_vectors(iw, m, path + '/vectors'))
+        else:
+            out_file = path + '/vectors.txt'
+            with open(out_file, 'w') as file:
+                for i, w in enumerate(iw):
+                    file.write(str(w)+' '+(' '.join([str(x) for x in m[i]]))+'\n')
+            response['vectors_file'] = out_file
+        readme_path = path + '/vectors_readme.txt'
+        readme = 'Word vectors: dimension '+str(dim)+', '+str(len(iw))+' vectors'
+        with open(readme_path, 'w') as f: f.write(readme)
 
     singular_values = s.tolist()  # type(s): numpy.ndarray
-    return vectors_df, singular_values, {'vectors_file': out_file}
+    return vectors_df, singular_values, response
 
 
 def vector_space_dim(links, path, tmpath, dim_max=100, sv_min=0.9,
-                     verbose='none', cds=1.0, eig=0.5, neg=1):      # 80329
-    vdf, sv, response = pmisvd(links, path, tmpath, dim_max)
-    dim = max([i for i,x in enumerate(sv) if x > max(sv)*sv_min])
-    return dim+1
+                     verbose='none', cds=1.0, eig=0.5, neg=1,
+                     svd='sparsesvd'):                                  # 80329
+    vdf, sv, response = pmisvd(links, path, tmpath, dim_max, svd=svd)
+    return sv_dim(sv, sv_min)
 
 
 # Notes:
@@ -465,3 +543,7 @@ def vector_space_dim(links, path, tmpath, dim_max=100, sv_min=0.9,
 # 80329 added vector_space_dim
 # TODO: refactor, control disk writes, ... PPMI ⇒ +frequency?
 # 90221 minor updates for Grammar Learner tutorial
+# 261017 pmisvd: in-memory PMI ⇒ SVD ⇒ vectors, files saved only on request
+# 261017 truncated_svd: sparsesvd or randomized SVD (power iterations)
+# 261017 pmisvd(..., sv_min): dimension selection and embedding with one SVD
+# 261017 vectors_frame: vectors_df from the embedding matrix, save/load_vectors
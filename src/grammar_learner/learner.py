@@ -10,10 +10,11 @@ from .preprocessing import filter_links
 from .pparser import files2links, lines2links, filter_lines
 from .corpus_stats import corpus_stats
 from .category_learner import learn_categories, cats2list
-from .grammar_inducer import induce_grammar, add_disjuncts, check_cats
+from .grammar_inducer import induce_grammar, fast_add_disjuncts, check_cats
 from .generalization import generalize_categories, generalize_rules, \
                             generalise_rules, add_upper_level
 from .write_files import list2file, save_link_grammar, save_cat_tree
+from .symbols import SymbolTable
 from ..common.cliutils import handle_path_string
 
 __all__ = ['learn_grammar', 'learn']
@@ -103,9 +104,26 @@ def learn(**kwargs):
     else:  # FIXME: raise error / assert ?
         return {'error': 'input_files'}, log
 
+    # Grammar rules links are read before interning: ids of all words  # 261017
+    # and terms are numbered in one sorted order, the same as strings
+    if grammar_rules != context:
+        context = kwargs['context']
+        kwargs['context'] = kwargs['grammar_rules']
+        grammar_links, re06 = files2links(**kwargs)
+        kwargs['context'] = context
+    else:
+        grammar_links = None
+
+    # Words, connectors, disjuncts ⇒ integer ids, decoded on save       # 261017
+    symbols = SymbolTable()
+    if grammar_links is None:
+        links = symbols.intern_links(links)
+    else:
+        links, grammar_links = symbols.intern_links(links, grammar_links)
+
     '''Learn word categories'''
 
-    categories, re03 = learn_categories(links, **kwargs)
+    categories, re03 = learn_categories(links, symbols, **kwargs)
     log.update(re03)
     if 'corpus_stats' in log and 'cleaned_words' in re03:
         log['corpus_stats'].extend([
@@ -127,13 +145,10 @@ def learn(**kwargs):
 
     '''Learn grammar'''
 
-    if grammar_rules != context:
-        context = kwargs['context']
-        kwargs['context'] = kwargs['grammar_rules']
-        links, re06 = files2links(**kwargs)
-        kwargs['context'] = context
+    if grammar_links is not None:                                       # 261017
+        links = grammar_links
 
-    categories = add_disjuncts(categories, links, **kwargs)
+    categories = fast_add_disjuncts(categories, links, **kwargs)      # 261017
     # TODO: check every category has disjuncts?         # 81204,  blocked 81207
     #  ? categories = prune_cats(categories, **kwargs)  # [F] ⇒ induce_grammar?
     #  ? re = check_cats(categories, **kwargs)
@@ -148,7 +163,7 @@ def learn(**kwargs):
         for cluster in clusters:
             rules['disjuncts'][cluster] = set(rule_list)
     else:
-        rules, re07 = induce_grammar(categories, **kwargs)
+        rules, re07 = induce_grammar(categories, symbols, **kwargs)
 
     lengths = [len(x) for x in rules['disjuncts']]
 
@@ -173,16 +188,20 @@ def learn(**kwargs):
     # 81126 3rd hierarchy level over rules:
     if 'top_level' in kwargs and kwargs['top_level'] > -1:
         tree, _ = add_upper_level(rules, **kwargs)
-        re09 = save_cat_tree(tree, output_categories, verbose='none')
+        re09 = save_cat_tree(tree, output_categories, verbose='none',
+                             symbols=symbols)
     else:
-        re09 = save_cat_tree(rules, output_categories, verbose='none')
+        re09 = save_cat_tree(rules, output_categories, verbose='none',
+                             symbols=symbols)
     # TODO: check file save error?
     log.update(re09)
-    re10 = save_link_grammar(rules, output_grammar, grammar_rules)
+    re10 = save_link_grammar(rules, output_grammar, grammar_rules,
+                             symbols=symbols)
     log.update(re10)
     log.update({'finish': str(UTC())})
     log.update({'grammar_learn_time': sec2string(time.time() - start)})
 
+    rules = symbols.decode_words(rules)  # returned with words as strings
     return rules, log  # 81126 + rules to count clusters in .ipynb tests  FIXME:DEL?
 
 
@@ -204,3 +223,5 @@ def learn_grammar(**kwargs):  # Backwards compatibility with legacy calls
 # 190409 Optional WSD, kwargs['wsd_symbol']
 # 190410 resolved empty filtered parses dataset issue
 # 190426 raise ValueError in case of empty filtered dataset (requested by pipeline)
+# 261017 SymbolTable: learn with integer ids, decode on save
+# 261017 fast_add_disjuncts: per-cluster disjuncts in one groupby
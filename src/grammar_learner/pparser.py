@@ -1,14 +1,17 @@
 # language-learning/src/grammar_learner/pparser.py                      # 190417
-import logging, pandas as pd
+import logging, numpy as np, pandas as pd
 from collections import Counter
+from itertools import chain
 from .corpus_stats import corpus_stats
 from .utl import kwa
+from .read_files import iter_parse_lines, read_ull_binary
+from ..common.ullcorpus import is_ull_binary
 
 
-def mst2words(lines, **kwargs):
+def mst2pairs(lines, **kwargs):                                        # 261017
+    # yield (word, link) pairs of parsed links one by one
     lw = kwa('', 'left_wall', **kwargs)
     dot = kwa(False, 'period', **kwargs)
-    pairs = []
     for line in lines:
         if len(line) > 1:
             if line[0].isdigit():
@@ -21,93 +24,195 @@ def mst2words(lines, **kwargs):
                             x[1] = lw
                     if not dot and x[3] == '.':
                         continue
-                    pairs.append([x[1], x[3]])
-    df = pd.DataFrame(pairs, columns=['word','link'])
-    df['count'] = 1
+                    yield x[1], x[3]
 
-    return df
+
+def counts2df(counts):                                                  # 261017
+    # Counter {(word, link): count} » deduplicated DataFrame
+    return pd.DataFrame([(w, l, c) for (w, l), c in counts.items()],
+                        columns=['word', 'link', 'count'])
+
+
+def mst2words(lines, **kwargs):  # 261017 counts aggregated while reading
+    return counts2df(Counter(mst2pairs(lines, **kwargs)))
+
+
+def pairs2connectors(pairs):                                            # 261017
+    # Counter {(word, word): count} » connectors DataFrame
+    counts = Counter()
+    for (word, link), count in pairs.items():
+        counts[(link, word + '-')] += count
+        counts[(word, link + '+')] += count
+
+    return counts2df(counts)
 
 
 def mst2connectors(lines, **kwargs):
-    df = mst2words(lines, **kwargs)
-    lefts = df.copy()
-    lefts['word'] = lefts['word'] + '-'
-    lefts = lefts.rename(columns={'word': 'link', 'link': 'word'})
-    df['link'] = df['link'] + '+'
-    links = pd.concat([lefts, df], axis=0, ignore_index=True, sort=True)
+    return pairs2connectors(Counter(mst2pairs(lines, **kwargs)))
+
+
+def is_link(x):                                                         # 261017
+    # split line x is a parsed link: "i word_i j word_j [weight]"
+    return len(x) in [4, 5] and x[0].isdigit() and x[2].isdigit()     # 190325
+
 
-    return links
+def sentence_djs(djs, words, links):                                    # 261017
+    # add disjuncts of a parsed sentence to djs Counter:
+    # {(word, ((word, '+' or '-'), ...)): count}, connectors not pruned
+    for k, v in links.items():
+        l = sorted([x for x in v if x <= 0], reverse=True)
+        r = sorted([y for y in v if y > 0])
+        djs[(words[k], tuple((words[abs(z)], '+' if z > 0 else '-')
+                             for z in (l + r)))] += 1
 
 
-def mst2disjuncts(lines, **kwargs):
+def count_parses(lines, **kwargs):                                      # 261017
+    # single pass over parses lines, one sentence buffered at a time »
+    # pairs: {(word, word): count}, parsed links » mst2words, mst2connectors
+    # djs: {(word, connectors): count}, not pruned » djs2df
+    # word_counts: {word: count}, sentence words » djs2df: min_word_count
     lw = kwa('', 'left_wall', **kwargs)
     dot = kwa(False, 'period', **kwargs)
-    min_word_count = kwa(1, 'min_word_count', **kwargs)                 # 190417
-    min_link_count = kwa(1, 'min_link_count', **kwargs)
-
-    if len(lines[-1]) > 0: lines.append([])
-    pairs = []
-    links = dict()
+    pairs = Counter()
+    djs = Counter()
+    word_counts = Counter()
     words = dict()
+    links = dict()
+    for line in lines:
+        x = line.split()
+        if len(line) > 1 and line[0].isdigit() and is_link(x):
+            i = int(x[0])
+            j = int(x[2])
+            words[i] = x[1]
+            words[j] = x[3]
+            links.setdefault(i, set()).add(j)
+            links.setdefault(j, set()).add(-i)
+            if x[1] == '###LEFT-WALL###':
+                if lw in ['', 'none']:
+                    continue
+                x[1] = lw
+            if not dot and x[3] == '.':
+                continue
+            pairs[(x[1], x[3])] += 1
+        else:  # sentence, empty line or last line not ending with CR
+            if len(links) > 0:
+                sentence_djs(djs, words, links)
+                words = dict()
+                links = dict()
+            if len(x) > 0 and not is_link(x):
+                word_counts.update(x)
+    if len(links) > 0:  # last sentence not followed by empty line
+        sentence_djs(djs, words, links)
+
+    return pairs, djs, word_counts
+
+
+def count_ull(corpus, **kwargs):                                        # 261017
+    # binary ULL corpus » (pairs, djs, word_counts) as count_parses,
+    # counted on vocabulary ids and offsets, lines are not generated
+    lw = kwa('', 'left_wall', **kwargs)
+    dot = kwa(False, 'period', **kwargs)
+    vocab = corpus.vocab
+    n = len(vocab)
+    wall = vocab.index('###LEFT-WALL###') if '###LEFT-WALL###' in vocab else -1
+    period = vocab.index('.') if '.' in vocab else -1
+
+    word_counts = Counter()
+    bins = np.bincount(corpus.tokens, minlength=n)
+    for i in np.flatnonzero(bins).tolist():
+        word_counts[vocab[i]] += int(bins[i])
+
+    links = np.asarray(corpus.links)
+    left = links[:, 1].astype(np.int64)
+    right = links[:, 3].astype(np.int64)
+    mask = np.ones(len(links), dtype=bool)
+    if lw in ['', 'none']: mask &= left != wall
+    if not dot: mask &= right != period
+    keys, counts = np.unique(left[mask] * n + right[mask], return_counts=True)
+    pairs = Counter()
+    for k, count in zip(keys.tolist(), counts.tolist()):
+        pairs[(lw if k // n == wall else vocab[k // n], vocab[k % n])] += count
+
+    ids = Counter()  # {(word id, ((word id, '+' or '-'), ...)): count}
+    rows = links[:, :4].tolist()
+    offsets = corpus.link_offsets.tolist()
+    for s in range(len(offsets) - 1):
+        words = dict()
+        sentence = dict()
+        for i, w1, j, w2 in rows[offsets[s]:offsets[s+1]]:
+            words[i] = w1
+            words[j] = w2
+            sentence.setdefault(i, set()).add(j)
+            sentence.setdefault(j, set()).add(-i)
+        sentence_djs(ids, words, sentence)
+    djs = Counter()
+    for (word, connectors), count in ids.items():
+        djs[(vocab[word], tuple((vocab[w], c) for w, c in connectors))] += count
+
+    return pairs, djs, word_counts
+
+
+def count_corpora(lines, corpora, **kwargs):                            # 261017
+    # text lines and binary ULL corpora » merged (pairs, djs, word_counts)
+    counts = count_parses(lines, **kwargs)
+    for corpus in corpora:
+        for total, more in zip(counts, count_ull(corpus, **kwargs)):
+            total.update(more)
+    return counts
+
+
+def split_lines(corpus):                                                # 261017
+    # binary ULL corpus » lists of tokens for corpus_stats, not joined to lines
+    vocab = corpus.vocab
+    tokens = corpus.tokens.tolist()
+    sent_offsets = corpus.sentence_offsets.tolist()
+    rows = np.asarray(corpus.links)[:, :4].tolist()
+    link_offsets = corpus.link_offsets.tolist()
+    for s in range(len(sent_offsets) - 1):
+        yield [vocab[i] for i in tokens[sent_offsets[s]:sent_offsets[s+1]]]
+        for i, w1, j, w2 in rows[link_offsets[s]:link_offsets[s+1]]:
+            yield [str(i), vocab[w1], str(j), vocab[w2]]
+        yield []
+
+
+def djs2df(djs, word_counts, **kwargs):                                 # 261017
+    # prune words with counts < min_word_count after counting » DataFrame
+    lw = kwa('', 'left_wall', **kwargs)
+    dot = kwa(False, 'period', **kwargs)
+    min_word_count = kwa(1, 'min_word_count', **kwargs)                 # 190417
 
-    # sl: sentences as lists of words                                   # 190417
-    sl = [x for x in [l.split() for l in lines] if len(x) > 0 and
-          not (len(x) in [4, 5] and x[0].isdigit() and x[2].isdigit())]
     # tokens: words with counts >= min_word_count                       # 190417
-    tokens = {w: c for w, c in Counter([w for s in sl for w in s]).items()
-              if c >= min_word_count}
-    if lw not in ['', 'none']: tokens['###LEFT-WALL###'] = 1            # 190424
-    if dot: tokens['.'] = 1                                             # 190424
-
-    def save_djs(words, links):
-        if len(links) > 0:
-            for k, v in links.items():
-                if k in words:
-                    if len(v) == 1:
-                        disjunct = words[abs(list(v)[0])] \
-                                   + ('+' if list(v)[0] > 0 else '-')
-                    else:
-                        l = sorted([x for x in v if abs(x) in words and x <= 0],
-                                   reverse=True)
-                        r = sorted([y for y in v if y in words and y > 0])
-                        disjunct = ' & '.join([words[abs(z)]
-                                               + ('+' if z > 0 else '-')
-                                               for z in (l + r)])
-                    pairs.append([words[k], disjunct])
-        links = {}
-        words = {}
-        return words, links
+    tokens = {w for w, c in word_counts.items() if c >= min_word_count}
+    if lw not in ['', 'none']: tokens.add('###LEFT-WALL###')            # 190424
+    if dot: tokens.add('.')                                             # 190424
+    name = lambda w: lw if w == '###LEFT-WALL###' else w
 
-    for line in lines:
-        if len(line) > 1:
-            if line[0].isdigit():
-                x = line.split()
-                if len(x) in [4, 5] and x[0].isdigit() and x[2].isdigit() \
-                        and x[1] in tokens and x[3] in tokens:          # 190417
-                    if x[1] == '###LEFT-WALL###': x[1] = lw             # 190424
-                    try:  # FIXME: overkill? already checked by .isdigit lin3 85
-                        i = int(x[0])
-                        j = int(x[2])
-                    except: continue
-                    words[i] = x[1]
-                    words[j] = x[3]
-                    if i in links:
-                        links[i].add(j)
-                    else: links[i] = set([j])
-                    if j in links:
-                        links[j].add(-i)
-                    else: links[j] = set([-i])
-                else:  # sentence starting with digit = same as next else
-                    words, links = save_djs(words, links)
-            else:  # sentence starting with letter
-                words, links = save_djs(words, links)
-        else:  # empty line or last LR = same as previous else
-            words, links = save_djs(words, links)
-
-    df = pd.DataFrame(pairs, columns=['word','link'])
-    df['count'] = 1
-
-    return df
+    counts = Counter()  # {(word, disjunct): count}
+    for (word, connectors), count in djs.items():
+        if word in tokens:
+            disjunct = ' & '.join([name(w) + s for w, s in connectors
+                                   if w in tokens])
+            if len(disjunct) > 0:
+                counts[(name(word), disjunct)] += count
+
+    return counts2df(counts)
+
+
+def mst2disjuncts(lines, **kwargs):  # 261017 single pass, lines can be a generator
+    pairs, djs, word_counts = count_parses(lines, **kwargs)
+    return djs2df(djs, word_counts, **kwargs)
+
+
+def djs_stats(df):                                                      # 261017
+    # disjunct stats on deduplicated DataFrame, counts used as weights
+    total = int(df['count'].sum())
+    djlen = df['link'].apply(lambda x: x.count('&') + 1)
+    return [['Unique disjuncts number', df['link'].nunique()],
+            ['Total  disjuncts count ', total],
+            ['Average disjunct count ', round(total / df['link'].nunique(), 1)],
+            ['Average disjunct length',
+             float(round(int((djlen * df['count']).sum()) / total, 1))],
+            ['Maximum disjunct length', int(djlen.max())]]
 
 
 def files2links(**kwargs):  # 2018 legacy, 2019-02: » filter_lines, lines2links
@@ -123,45 +228,34 @@ def files2links(**kwargs):  # 2018 legacy, 2019-02: » filter_lines, lines2links
     files = kwargs['input_files']
     if len(files) == 0:
         return df, {'parsed_links': 0, 'error': 'files2links: files = []'}
-    lines = []
-    for i, file in enumerate(files):
-        with open(file, 'r') as f:
-            lines.extend(f.readlines())
-
-    if parse_mode == 'lower':
-        lines = [' '.join([y.lower() if y != '###LEFT-WALL###'
-                 else y for y in x.split()]) for x in lines]
-    elif parse_mode == 'casefold':
-        lines = [' '.join([y.casefold() if y != '###LEFT-WALL###'
-                 else y for y in x.split()]) for x in lines]
-
-    response = corpus_stats(lines)
-    ordnung = ['word', 'link', 'count']
-    cdf = mst2connectors(lines, **kwargs)[ordnung]
-    ddf = mst2disjuncts(lines, **kwargs)[ordnung]
+    text_files = [f for f in files if not is_ull_binary(f)]            # 261017
+    corpora = [read_ull_binary(f, parse_mode) for f in files if is_ull_binary(f)]
 
-    unique_connectors = cdf.groupby('link', as_index=False).sum()
-    avg_connector_count = round(len(cdf)/len(unique_connectors), 1)
-    unique_djs = ddf.groupby('link', as_index=False).sum()
-    avg_disjunct_count = round(len(ddf)/len(unique_djs), 1)
-    unique_seeds = ddf.groupby(['word', 'link'], as_index=False).sum()
-    avg_seed_count = round(len(ddf) / len(unique_seeds), 1)
+    def parse_lines():  # stream text files, re-read on each pass       # 261017
+        for file in text_files:
+            yield from iter_parse_lines(file, parse_mode)
+
+    response = corpus_stats(chain(parse_lines(),
+                                  *[split_lines(c) for c in corpora]))
+    pairs, djs, word_counts = count_corpora(parse_lines(), corpora, **kwargs)
+    ordnung = ['word', 'link', 'count']
+    cdf = pairs2connectors(pairs)[ordnung]
+    ddf = djs2df(djs, word_counts, **kwargs)[ordnung]
 
-    ddf['djlen'] = ddf['link'].apply(lambda x: x.count('&') +1)
-    avg_disjunct_length = float(round(ddf['djlen'].mean(), 1))
-    max_disjunct_length = int(ddf['djlen'].max())
+    # cdf, ddf: deduplicated, counts aggregated while reading lines     # 261017
+    total_connectors = int(cdf['count'].sum())
+    unique_connectors = cdf['link'].nunique()
+    avg_connector_count = round(total_connectors / unique_connectors, 1)
+    total_disjuncts = int(ddf['count'].sum())
+    avg_seed_count = round(total_disjuncts / len(ddf), 1)
 
     response['corpus_stats'].extend([
-        ['Unique connectors number', len(unique_connectors)],
-        ['Total  connectors count ', len(cdf)],
-        ['Average connector count ', avg_connector_count],
-        ['Unique disjuncts number', len(unique_djs)],
-        ['Total  disjuncts count ', len(ddf)],
-        ['Average disjunct count ', avg_disjunct_count],
-        ['Average disjunct length', avg_disjunct_length],
-        ['Maximum disjunct length', max_disjunct_length],
-        ['Unique seeds number', len(unique_seeds)],
-        ['Total  seeds count ', len(ddf)],
+        ['Unique connectors number', unique_connectors],
+        ['Total  connectors count ', total_connectors],
+        ['Average connector count ', avg_connector_count]]
+        + djs_stats(ddf) + [
+        ['Unique seeds number', len(ddf)],
+        ['Total  seeds count ', total_disjuncts],
         ['Average seed count ', avg_seed_count]])
 
     if context > 1:
@@ -171,7 +265,7 @@ def files2links(**kwargs):  # 2018 legacy, 2019-02: » filter_lines, lines2links
         df = cdf
         terms = 'connectors'
     else:
-        df = mst2words(lines, **kwargs)
+        df = counts2df(pairs)
         terms = 'words'  # legacy, not used  # FIXME:DEL?
 
     if group:  # Always True?  # FIXME:DEL?
@@ -229,54 +323,81 @@ def filter_lines(lines, **kwargs):                                      # 90216
     return filtered_lines, corpus_stats(filtered_lines)
 
 
-def lines2links(lines, **kwargs):                                       # 190410
+def filter_ull(corpus, **kwargs):                                       # 261017
+    # filter_lines on binary ULL corpus arrays » ULLCorpus
+    max_sentence_length = kwa(99, 'max_sentence_length', **kwargs) + 1
+    max_unparsed_words = kwa(0, 'max_unparsed_words', **kwargs) + 1
+    vocab = corpus.vocab
+    parsed = [w[0] != '[' and w[-1] != ']' for w in vocab]
+    period = vocab.index('.') if '.' in vocab else -1
+    tokens = corpus.tokens.tolist()
+    sent_offsets = corpus.sentence_offsets.tolist()
+    rows = np.asarray(corpus.links)[:, :4].tolist()
+    link_offsets = corpus.link_offsets.tolist()
+    mask = np.zeros(len(corpus), dtype=bool)
+    for s in range(len(corpus)):
+        x = tokens[sent_offsets[s]:sent_offsets[s+1]]
+        if len(x) > 0 and x[-1] == period: x = x[:-1]
+        parsed_words = set([i+1 for i, w in enumerate(x) if parsed[w]])
+        linked_words = set()
+        for i, w1, j, w2 in rows[link_offsets[s]:link_offsets[s+1]]:
+            if i > 0 and w2 != period:
+                linked_words.add(i)
+                linked_words.add(j)
+        if len(parsed_words) < max_sentence_length:
+            if len(x) - len(parsed_words) + len(parsed_words - linked_words) \
+                    < max_unparsed_words:
+                mask[s] = True
+
+    return corpus.select(mask)
+
+
+def lines2links(lines, corpora = (), **kwargs):                         # 190410
     # TODO: logger = logging.getLogger(__name__ + "lines2links")
+    # corpora: binary ULL corpora, filtered and counted on arrays       # 261017
     context = kwa(2, 'context', **kwargs)
     group = True  # always? » kwa(True, 'group', **kwargs)? FIXME:DEL?
 
-    lines, re = filter_lines(lines, **kwargs)
-    if len(lines) < 1:                                                  # 190410
+    if len(corpora) > 0:                                                # 261017
+        corpora = [filter_ull(corpus, **kwargs) for corpus in corpora]
+        lines = filter_lines(lines, **kwargs)[0] if len(lines) > 0 else []
+        re = corpus_stats(chain(lines, *[split_lines(c) for c in corpora]))
+    else:
+        lines, re = filter_lines(lines, **kwargs)
+    if len(lines) < 1 and sum([len(c) for c in corpora]) < 1:           # 190410
         df = pd.DataFrame(columns=['word','link'])
         return df, {'filter_lines_error': 'empty_filtered_set'}
 
     # df = pd.DataFrame(columns=['word', 'link', 'count'])
+    # df: deduplicated, counts aggregated while reading lines           # 261017
+    pairs, djs, word_counts = count_corpora(lines, corpora, **kwargs)
     if context > 1:  # ddf - disjuncts DataFrame
-        df = mst2disjuncts(lines, **kwargs)[['word', 'link', 'count']]
-        unique_djs = df.groupby('link', as_index = False).sum()
-        avg_disjunct_count = round(len(df) / len(unique_djs), 1)
-        df['djlen'] = df['link'].apply(lambda x: x.count('&') + 1)
-        avg_disjunct_length = float(round(df['djlen'].mean(), 1))
-        max_disjunct_length = int(df['djlen'].max())
-        re['corpus_stats'].extend([
-            ['Unique disjuncts number', len(unique_djs)],
-            ['Total  disjuncts count ', len(df)],         # FIXME!
-            ['Average disjunct count ', avg_disjunct_count],
-            ['Average disjunct length', avg_disjunct_length],
-            ['Maximum disjunct length', max_disjunct_length]])
+        df = djs2df(djs, word_counts, **kwargs)
+        re['corpus_stats'].extend(djs_stats(df))
         # TODO: re-calculate stats on df filtered in mst2words with min_word_count?
 
     elif context == 1:  # cdf - connectors DataFrame
-        df = mst2connectors(lines, **kwargs)[['word', 'link', 'count']]  # cdf
-        unique_connectors = df.groupby('link', as_index = False).sum()
-        avg_connector_count = round(len(df) / len(unique_connectors), 1)
+        df = pairs2connectors(pairs)  # cdf
+        total_connectors = int(df['count'].sum())
+        unique_connectors = df['link'].nunique()
         re['corpus_stats'].extend([
-            ['Unique connectors number', len(unique_connectors)],
-            ['Total  connectors count ', len(df)],
-            ['Average connector count ', avg_connector_count]])
+            ['Unique connectors number', unique_connectors],
+            ['Total  connectors count ', total_connectors],
+            ['Average connector count ',
+             round(total_connectors / unique_connectors, 1)]])
 
     else:  # unused legacy: wdf - words DataFrame - word-based word space
-        df = mst2words(lines, **kwargs)
-        unique_words = df.groupby('word', as_index = False).sum()
-        avg_word_count = round(len(df) / len(unique_words), 1)
+        df = counts2df(pairs)
+        total_words = int(df['count'].sum())
+        unique_words = df['word'].nunique()
         re['corpus_stats'].extend([
-            ['Unique words number', len(unique_words)],
-            ['Total  words count ', len(df)],
-            ['Average word count ', avg_word_count]])
+            ['Unique words number', unique_words],
+            ['Total  words count ', total_words],
+            ['Average word count ', round(total_words / unique_words, 1)]])
 
-    unique_seeds = df.groupby(['word', 'link'], as_index = False).sum()
-    avg_seed_count = round(len(df) / len(unique_seeds), 1)
+    avg_seed_count = round(int(df['count'].sum()) / len(df), 1)
     re['corpus_stats'].extend([
-        ['Unique seeds number', len(unique_seeds)],
+        ['Unique seeds number', len(df)],
         ['Average seed count ', avg_seed_count]])
 
     if group:  # Always True?  # FIXME:DEL?
@@ -299,3 +420,12 @@ def lines2links(lines, **kwargs):                                       # 190410
 # 190410 lines2links: check length of filtered dataset > 0
 # 190417 mst2disjuncts: prune words with counts < min_word_count
 # 190424 Add '###LEFT-WALL###' and '.' to tokens - lines 59, 60
+# 261017 files2links: binary ULL corpus files
+# 261017 mst2pairs, counts2df: mst2words, mst2connectors, mst2disjuncts
+#        aggregate counts while reading lines, return deduplicated DataFrames
+# 261017 count_parses, djs2df: mst2disjuncts single pass over lines, one sentence
+#        buffered at a time, min_word_count pruning applied after counting;
+#        link lines pruned by min_word_count no longer split the sentence
+# 261017 files2links: stream input files (corpus stats, then counts), no lines list
+# 261017 count_ull, filter_ull, split_lines: binary ULL corpora counted, filtered
+#        and passed to corpus_stats on vocabulary ids and offsets, not as lines
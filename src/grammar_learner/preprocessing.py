@@ -2,8 +2,11 @@
 import os
 from collections import OrderedDict
 from .utl import UTC, kwa
-from .read_files import check_dir, check_mst_files
-from .pparser import lines2links
+from itertools import chain
+from .read_files import check_dir, check_mst_files, read_parse_lines, \
+    read_ull_binary
+from .pparser import lines2links, split_lines
+from ..common.ullcorpus import is_ull_binary
 from .corpus_stats import corpus_stats
 from .write_files import list2file, save_link_grammar, save_cat_tree
 
@@ -106,29 +109,28 @@ def filter_links(files, **kwargs):                                      # 190417
 
     re = OrderedDict()
     lines = []  # learner line 91
+    corpora = []  # binary ULL files, converted and counted on arrays   # 261017
     for i, file in enumerate(files):
-        with open(file, 'r') as f: lines.extend(f.readlines())
-        if len(lines[-1]) > 0: lines.append('')
-    if parse_mode == 'lower':
-        lines = [' '.join([w.lower() if w != '###LEFT-WALL###'
-                           else w for w in l.split()]) for l in lines]
-    elif parse_mode == 'casefold':
-        lines = [' '.join([w.casefold() if w != '###LEFT-WALL###'
-                           else w for w in l.split()]) for l in lines]
+        if is_ull_binary(file):
+            corpora.append(read_ull_binary(file, parse_mode, wsd_symbol))
+            continue
+        lines.extend(read_parse_lines(file, parse_mode))
+        if len(lines) > 0 and len(lines[-1]) > 0: lines.append('')
     # WSD: word sense disambiguation symbol resolution:
     if wsd_symbol != '':                                                # 190408
         lines = [' '.join([w[0] + w[1:-1].replace(wsd_symbol, '.') + w[-1]
                            if len(w) > 2 else w
                            for w in l.split()]) for l in lines]
 
-    if 'corpus_stats' in corpus_stats(lines):
-        raw_corpus_stats = corpus_stats(lines)['corpus_stats']
+    raw_stats = corpus_stats(chain(lines, *[split_lines(c) for c in corpora]))
+    if 'corpus_stats' in raw_stats:
+        raw_corpus_stats = raw_stats['corpus_stats']
         if type(raw_corpus_stats) is list:
             re.update({'raw_corpus_stats': raw_corpus_stats})
             list2file(raw_corpus_stats, prj_dir + '/raw_corpus_stats.txt')
             re.update({'raw_corpus_stats_file': prj_dir + '/raw_corpus_stats.txt'})
 
-    links, re_ = lines2links(lines, **kwargs)
+    links, re_ = lines2links(lines, corpora, **kwargs)
     re.update(re_)
     # Empty filtered df with 'max_sentence_length', 'max_unparsed_words'
     if len(links) < 1:
@@ -1,6 +1,8 @@
 # language-learning/src/grammar_learner/read_files.py                   # 90129
 import logging
 import os
+import numpy as np
+from ..common.ullcorpus import ULLCorpus, is_ull_binary, load_ull_binary
 
 
 def check_dir(dir_path, create = False, verbose = 'none'):
@@ -57,6 +59,81 @@ def check_mst_files(input_dir, verbose = 'none'):
         return [], {'check_mst_file_error': 'no input directory'}
 
 
+def read_ull_binary(file_path, parse_mode = 'given', wsd_symbol = ''):   # 261017
+    """ loads binary ULL corpus converting vocabulary for the parse_mode
+    :param file_path:   binary ULL file path
+    :param parse_mode:  'given', 'lower', 'casefold'
+    :param wsd_symbol:  word sense disambiguation symbol, replaced with '.'
+    :return:            ULLCorpus, the same words as text file lines
+                        converted by learner for the parse_mode
+    Binary ULL files are not parsed: conversion is applied once per
+    interned vocabulary item, ids of items converted to the same word
+    are merged
+    """
+    corpus = load_ull_binary(file_path)
+    if parse_mode == 'lower':
+        words = [w.lower() if w != '###LEFT-WALL###' else w
+                 for w in corpus.vocab]
+    elif parse_mode == 'casefold':
+        words = [w.casefold() if w != '###LEFT-WALL###' else w
+                 for w in corpus.vocab]
+    else:
+        words = list(corpus.vocab)
+    if wsd_symbol != '':
+        words = [w[0] + w[1:-1].replace(wsd_symbol, '.') + w[-1]
+                 if len(w) > 2 else w for w in words]
+    if words == corpus.vocab:
+        return corpus
+
+    ids = dict()
+    remap = np.array([ids.setdefault(w, len(ids)) for w in words],
+                     dtype=np.int32)
+    links = np.array(corpus.links)
+    links[:, 1] = remap[links[:, 1]]
+    links[:, 3] = remap[links[:, 3]]
+    links[:, 4] = np.where(links[:, 4] < 0, -1, remap[links[:, 4]])
+    return ULLCorpus(list(ids), remap[corpus.tokens],
+                     np.array(corpus.sentence_offsets), links,
+                     np.array(corpus.link_offsets))
+
+
+def iter_parse_lines(file_path, parse_mode = 'given'):                  # 261017
+    """ yields parses file lines converting case according to parse_mode
+    :param file_path:   text or binary ULL file path
+    :param parse_mode:  'given', 'lower', 'casefold'
+    :return:            generator of lines, the same as text file lines
+                        converted by learner for the parse_mode
+    Text files are read line by line, not loaded to memory.
+    Learner counts binary ULL files from arrays: read_ull_binary
+    """
+    if is_ull_binary(file_path):
+        yield from read_ull_binary(file_path, parse_mode) \
+            .lines(newline='\n' if parse_mode not in ['lower', 'casefold'] else '')
+        return
+
+    with open(file_path, 'r') as f:
+        if parse_mode == 'lower':
+            for l in f:
+                yield ' '.join([w.lower() if w != '###LEFT-WALL###'
+                                else w for w in l.split()])
+        elif parse_mode == 'casefold':
+            for l in f:
+                yield ' '.join([w.casefold() if w != '###LEFT-WALL###'
+                                else w for w in l.split()])
+        else:
+            yield from f
+
+
+def read_parse_lines(file_path, parse_mode = 'given'):                  # 261017
+    """ reads parses file lines converting case according to parse_mode
+    :param file_path:   text or binary ULL file path
+    :param parse_mode:  'given', 'lower', 'casefold'
+    :return:            list of lines, the same as text file lines
+                        converted by learner for the parse_mode
+    """
+    return list(iter_parse_lines(file_path, parse_mode))
+
+
 def check_dict(file_path):          # TODO: update this stub            # 90128
     if os.path.isfile(file_path):
         return True
@@ -138,4 +215,7 @@ def check_path(par, t = 'else', **kwargs):  # TODO: update stubs...     # 90129
 # 81219 @alex: logger
 # 81231 cleanup
 # 90128 check_path, stubs: check_dict, check_ull
+# 261017 read_parse_lines: text and binary ULL files
+# 261017 iter_parse_lines: stream parses file lines, not loaded to memory
+# 261017 read_ull_binary: binary ULL corpus, vocabulary converted for parse_mode
 # TODO: cleanup, check_ull, check corpus dir or/and single file
@@ -1,18 +1,129 @@
 # language-learning/src/grammar_learner/skl_clustering.py               # 190425
+import os
+import time
+import heapq
 import numpy as np
+from scipy.sparse import csr_matrix, issparse
 from sklearn.cluster import AgglomerativeClustering, KMeans, MeanShift, \
-    estimate_bandwidth
+    MiniBatchKMeans, estimate_bandwidth
 # from sklearn import metrics, pairwise_distances
 from sklearn.metrics import silhouette_score, calinski_harabaz_score
 from sklearn.neighbors import kneighbors_graph
 # davies_bouldin_score -- next scikit-learn release?
 # https://github.com/scikit-learn/scikit-learn/issues/11303
+from concurrent.futures import ProcessPoolExecutor
 from .utl import kwa
-from .clustering import cluster_id
+from .clustering import cluster_id, sampled_silhouette, kmeans_seeds
 
+_worker_cd = None
+_worker_kwargs = None
 
-def skl_clustering(cd, n_clusters=10, **kwargs):
-    # cd: ndarray(words*disjuncts)
+
+def variance_ratio(cd, labels):                                         # 261017
+    # Calinski-Harabasz index of sparse cd without dense copy ~ sklearn
+    n = cd.shape[0]
+    ids, labels = np.unique(labels, return_inverse=True)
+    k = len(ids)
+    if not 1 < k < n:
+        raise ValueError('Number of labels is %d. Valid values are 2 '
+                         'to n_samples - 1 (inclusive)' % k)
+    members = csr_matrix((np.ones(n), (labels, np.arange(n))), shape=(k, n))
+    sizes = np.asarray(members.sum(axis=1)).ravel()
+    sums = np.asarray((members @ cd).todense(), dtype=float)
+    mean = sums.sum(axis=0) / n
+    extra_disp = np.sum(sizes * ((sums / sizes[:, None] - mean) ** 2).sum(axis=1))
+    intra_disp = float(cd.multiply(cd).sum()) \
+                 - np.sum((sums ** 2).sum(axis=1) / sizes)
+    if intra_disp == 0.:
+        return 1.
+    return extra_disp * (n - k) / (intra_disp * (k - 1.))
+
+
+def sparse_ward(cd, n_clusters, connectivity):                          # 261017
+    # ward linkage of sparse cd rows, only connected clusters are merged
+    # ~ AgglomerativeClustering(linkage='ward', connectivity=connectivity)
+    # without dense cd: memory ~ cd.nnz + connectivity.nnz
+    # connectivity: sparse words*words neighbour graph ⇒ labels
+    cd = csr_matrix(cd, dtype=float)
+    n = cd.shape[0]
+    graph = csr_matrix(connectivity)
+    graph = (graph + graph.T).tocoo()
+    edges = graph.row != graph.col
+    rows, cols = graph.row[edges], graph.col[edges]
+    sums = [dict(zip(cd.indices[cd.indptr[i]:cd.indptr[i+1]].tolist(),
+                     cd.data[cd.indptr[i]:cd.indptr[i+1]].tolist()))
+            for i in range(n)]  # cluster vector sums
+    norms = np.asarray(cd.multiply(cd).sum(axis=1)).ravel().tolist()  # |sum|²
+    sizes = [1] * n
+    versions = [0] * n
+    parent = list(range(n))
+    # dots[a][b]: sum a · sum b of neighbour clusters a, b
+    dots = [dict() for i in range(n)]
+    for a, b, x in zip(rows.tolist(), cols.tolist(), np.asarray(
+            cd[rows].multiply(cd[cols]).sum(axis=1)).ravel().tolist()):
+        dots[a][b] = x
+
+    def dot(a, b):
+        if len(sums[a]) > len(sums[b]): a, b = b, a
+        sb = sums[b]
+        return sum(x * sb.get(j, 0.) for j, x in sums[a].items())
+
+    def push(a, b):  # increase of within-cluster sum of squares
+        cost = norms[a] / sizes[a] + norms[b] / sizes[b] \
+               - (norms[a] + norms[b] + 2 * dots[a][b]) / (sizes[a] + sizes[b])
+        heapq.heappush(heap, (cost, min(a, b), max(a, b),
+                              versions[a] + versions[b]))
+
+    heap = []
+    for a in range(n):
+        for b in dots[a]:
+            if a < b: push(a, b)
+    clusters = set(range(n))
+    while len(clusters) > max(n_clusters, 1):
+        if len(heap) == 0:  # disconnected graph ⇒ connect remaining clusters
+            for a in clusters:
+                for b in clusters:
+                    if a < b and b not in dots[a]:
+                        dots[a][b] = dots[b][a] = dot(a, b)
+                        push(a, b)
+        cost, a, b, version = heapq.heappop(heap)
+        if a not in clusters or b not in clusters \
+                or version != versions[a] + versions[b]:
+            continue  # merged or changed since pushed
+        if len(sums[a]) < len(sums[b]): a, b = b, a  # keep the larger sum
+        # (a + b) · x = a · x + b · x, computed for new neighbours only
+        merged = dict()
+        for x in set(dots[a]) | set(dots[b]):
+            if x != a and x != b:
+                merged[x] = (dots[a][x] if x in dots[a] else dot(a, x)) \
+                          + (dots[b][x] if x in dots[b] else dot(b, x))
+        norms[a] += norms[b] + 2 * dots[a][b]
+        for j, x in sums[b].items():
+            sums[a][j] = sums[a].get(j, 0.) + x
+        sizes[a] += sizes[b]
+        versions[a] += 1 + versions[b]
+        parent[b] = a
+        clusters.discard(b)
+        for x in dots[b]:
+            del dots[x][b]
+        sums[b] = dots[b] = None
+        dots[a] = merged
+        for x, d in merged.items():
+            dots[x][a] = d
+            push(a, x)
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    return np.unique([root(i) for i in range(n)], return_inverse=True)[1]
+
+
+def skl_clustering(cd, n_clusters=10, random_state=None, **kwargs):
+    # cd: ndarray(words*disjuncts) or scipy.sparse matrix               # 261017
+    # random_state: k-means seed, None ⇒ np.random                     # 261017
     nc = min(n_clusters, cd.shape[0])                           # 190425
     clustering = kwa(('agglomerative', 'ward'), 'clustering', **kwargs)
     if type(clustering) is str:
@@ -20,6 +131,8 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
             clustering = ('agglomerative', 'ward')
         elif clustering == 'kmeans':
             clustering = ('kmeans', 'k-means++', 10)
+        elif clustering == 'minibatch':                                 # 261017
+            clustering = ('minibatch', 'k-means++', 10)
         elif clustering in ['mean_shift', 'mean shift', 'meanshift']:
             clustering = ('mean_shift', 2)  # TODO: check (..., 'auto)
         elif clustering == 'group':  # TODO: call ILE clustering?
@@ -35,6 +148,7 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
 
     clustering_metric = kwa(('silhouette', 'euclidean'),
                             'clustering_metric', **kwargs)
+    sample = kwa(None, 'silhouette_sample', **kwargs)                   # 261017
     labels = np.asarray([[]])
     metrics = {'clustering': clustering}
     centroids = np.asarray([[]])
@@ -59,17 +173,23 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
             if len(clustering) > 4:  # compute_full_tree
                 if clustering[4] is bool:
                     compute_full_tree = clustering[4]
-
-            model = AgglomerativeClustering(n_clusters=nc,
-                                            linkage=linkage, affinity=affinity,
-                                            connectivity=connectivity,
-                                            compute_full_tree=compute_full_tree)
-            model.fit(cd)
-            labels = model.labels_
+            if clustering[1] == 'sparse_ward':  # no dense cd          # 261017
+                if connectivity is None:
+                    connectivity = kneighbors_graph(
+                        cd, min(10, cd.shape[0] - 1), include_self=False)
+                labels = sparse_ward(cd, nc, connectivity)
+            else:
+                if issparse(cd): cd = cd.toarray()  # dense input only # 261017
+                model = AgglomerativeClustering(
+                    n_clusters=nc, linkage=linkage, affinity=affinity,
+                    connectivity=connectivity,
+                    compute_full_tree=compute_full_tree)
+                model.fit(cd)
+                labels = model.labels_
 
             # TODO: centroids = ...
 
-        elif clustering[0] in ['k-means', 'kmeans']:
+        elif clustering[0] in ['k-means', 'kmeans', 'minibatch']:
             if clustering[1] in ['k-means++']:  # 'random' - fails?
                 init = clustering[1]
             else:
@@ -78,7 +198,17 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
                 n_init = clustering[2]
             else:
                 n_init = 10
-            model = KMeans(init=init, n_clusters=nc, n_init=n_init)
+            if clustering[0] == 'minibatch':                            # 261017
+                if len(clustering) > 3 and type(clustering[3]) is int:
+                    batch_size = clustering[3]
+                else:
+                    batch_size = 1024
+                model = MiniBatchKMeans(init=init, n_clusters=nc,
+                                        n_init=n_init, batch_size=batch_size,
+                                        random_state=random_state)
+            else:
+                model = KMeans(init=init, n_clusters=nc, n_init=n_init,
+                               random_state=random_state)
             model.fit(cd)
             labels = model.labels_
             metrics['inertia'] = model.inertia_
@@ -93,6 +223,7 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
                 bandwidth = None  # TODO: auto ⇒ estimate_bandwidth
                 bandwidth = 'auto'
 
+            if issparse(cd): cd = cd.toarray()  # dense input only     # 261017
             model = MeanShift(bandwidth=bandwidth)
             model.fit(cd)
             labels = model.labels_
@@ -100,18 +231,22 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
             centroids = np.asarray(model.cluster_centers_[:(max(labels) + 1)])
 
         else:  # TODO: random clustering?
+            if issparse(cd): cd = cd.toarray()                         # 261017
             model = AgglomerativeClustering(linkage='ward', n_clusters=nc)
             model.fit(cd)
             labels = model.labels_
 
         try:
-            metrics['silhouette_index'] = float(
-                silhouette_score(cd, labels, metric=clustering_metric[1]))
+            metrics['silhouette_index'] = float(sampled_silhouette(
+                cd, labels, clustering_metric[1], sample))              # 261017
         except:  # FIXME
             metrics['silhouette_index'] = 0.0
         try:
-            metrics['variance_ratio'] = float(
-                calinski_harabaz_score(cd, labels))
+            if issparse(cd):                                            # 261017
+                metrics['variance_ratio'] = float(variance_ratio(cd, labels))
+            else:
+                metrics['variance_ratio'] = float(
+                    calinski_harabaz_score(cd, labels))
         except:  # FIXME
             metrics['variance_ratio'] = 0.0
         # try:
@@ -126,6 +261,51 @@ def skl_clustering(cd, n_clusters=10, **kwargs):
                {'clustering': 'skl_clustering error'}, []
 
 
+def _init_grid_worker(cd, kwargs):                                      # 261017
+    global _worker_cd, _worker_kwargs
+    _worker_cd, _worker_kwargs = cd, kwargs
+
+
+def _grid_worker(args):
+    n_clusters, seed = args
+    return skl_clustering(_worker_cd, n_clusters, seed, **_worker_kwargs)
+
+
+def grid_search(cd, grid, **kwargs):                                    # 261017
+    # grid: [n_clusters] ⇒ [(labels, metrics, centroids)] in grid order
+    # 'cluster_jobs': parallel processes (-1: all CPUs), the same results
+    #   as 1 job with the same 'cluster_seed'
+    # 'cluster_time': time budget, s: no new clusterings after it is over,
+    #   the 1st one is always done; None: no limit
+    jobs = kwa(1, 'cluster_jobs', **kwargs)
+    seed = kwa(None, 'cluster_seed', **kwargs)
+    budget = kwa(None, 'cluster_time', **kwargs)
+    if jobs < 0: jobs = os.cpu_count() or 1
+    start = time.time()
+    candidates = list(zip(grid, kmeans_seeds(len(grid), seed, jobs)))
+    results = []
+
+    if jobs < 2 or len(candidates) < 2:
+        for n_clusters, random_state in candidates:
+            if len(results) > 0 and budget is not None \
+                    and time.time() - start > budget:
+                break
+            results.append(skl_clustering(cd, n_clusters, random_state,
+                                          **kwargs))
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_grid_worker,
+                             initargs=(cd, kwargs)) as executor:
+        # budget check after every `jobs` clusterings, all at once otherwise
+        size = len(candidates) if budget is None else jobs
+        for i in range(0, len(candidates), size):
+            if i > 0 and time.time() - start > budget:
+                break
+            results.extend(executor.map(_grid_worker, candidates[i:i+size]))
+
+    return results
+
+
 def optimal_clusters(cd, **kwargs):
     # cluster_range = kwa((2,48,1), 'cluster_range')
     algo = kwa('agglomerative', 'clustering', **kwargs)
@@ -133,12 +313,17 @@ def optimal_clusters(cd, **kwargs):
     level = kwa(1.0, 'cluster_level', **kwargs)
     verbose = kwa('none', 'verbose', **kwargs)
     crange = kwa(10, 'cluster_range', **kwargs)                         # 90206
+    clustering_metric = kwa(('silhouette', 'euclidean'),
+                            'clustering_metric', **kwargs)              # 261017
+    sample = kwa(None, 'silhouette_sample', **kwargs)                   # 261017
 
     if type(algo) is str:
         if algo == 'agglomerative':
             algo = ('agglomerative', 'ward')
         elif algo == 'kmeans':
             algo = ('kmeans', 'k-means++', 10)
+        elif algo == 'minibatch':                                       # 261017
+            algo = ('minibatch', 'k-means++', 10)
         elif algo in ['mean_shift', 'mean shift', 'meanshift']:
             algo = ('mean_shift', 2)  # ('mean_shift', 'auto')?
         elif algo == 'group':
@@ -160,39 +345,36 @@ def optimal_clusters(cd, **kwargs):
             if type(crange[0]) is int:
                 labels, metrics, centroids = skl_clustering(cd, crange[0],
                                                             **kwargs)
-        elif len(crange) == 2:
-            if type(crange[0]) is int and type(crange[1]) is int:
-                labels, metrics, centroids = skl_clustering(cd, crange[0],
-                                                            **kwargs)
-                for n in range(crange[1] - 1):
-                    l, m, c = skl_clustering(cd, crange[0], **kwargs)
-                    if m['silhouette_index'] > metrics['silhouette_index']:
-                        labels, metrics, centroids = l, m, c
-        elif len(crange) == 3:  # TODO: replace with SGD?
-            n_min = min(crange[0], crange[1])
-            n_max = max(crange[0], crange[1])
-            labels, metrics, centroids = \
-                skl_clustering(cd, int((n_min + n_max) / 2), **kwargs)
-            for n_clusters in range(n_min, n_max + 1):
-                for n in range(kwargs['cluster_range'][2]):
-                    l, m, c = skl_clustering(cd, n_clusters, **kwargs)
+        elif len(crange) in [2, 3, 4]:  # 261017 grid_search, TODO: SGD?
+            grid = [10]
+            if len(crange) == 2:  # n_clusters, n tests
+                if type(crange[0]) is int and type(crange[1]) is int:
+                    grid = [crange[0]] * max(crange[1], 1)
+            else:  # min, max, [step,] n tests; middle ⇒ initial clustering
+                n_min = min(crange[0], crange[1])
+                n_max = max(crange[0], crange[1])
+                step = crange[2] if len(crange) == 4 else 1
+                repeat = crange[3] if len(crange) == 4 else crange[2]
+                grid = [int((n_min + n_max) / 2)] + \
+                       [n for n in range(n_min, n_max + 1, step)
+                        for _ in range(repeat)]
+            results = grid_search(cd, grid, **kwargs)
+            labels, metrics, centroids = results[0]
+            for l, m, c in results[1:]:
+                if 'silhouette_index' in m and 'silhouette_index' in metrics:
                     if m['silhouette_index'] > metrics['silhouette_index']:
                         labels, metrics, centroids = l, m, c
-        elif len(crange) == 4:
-            n_min = min(crange[0], crange[1])
-            n_max = max(crange[0], crange[1])
-            labels, metrics, centroids = \
-                skl_clustering(cd, int((n_min + n_max) / 2), **kwargs)
-            for n_clusters in range(n_min, n_max + 1, crange[2]):
-                for n in range(kwargs['cluster_range'][3]):
-                    l, m, c = skl_clustering(cd, n_clusters, **kwargs)
-                    if 'silhouette_index' in m \
-                            and 'silhouette_index' in metrics:
-                        if m['silhouette_index'] > metrics['silhouette_index']:
-                            labels, metrics, centroids = l, m, c
         else:
             labels, metrics, centroids = skl_clustering(cd, 10, **kwargs)
 
+    # 261017 sampled silhouette selection ⇒ exact silhouette of the best
+    if sample is not None and 'silhouette_index' in metrics:
+        try:
+            metrics['silhouette_index'] = float(
+                silhouette_score(cd, labels, metric=clustering_metric[1]))
+        except:  # FIXME
+            metrics['silhouette_index'] = 0.0
+
     return labels, metrics, centroids
 
 
@@ -204,4 +386,9 @@ def optimal_clusters(cd, **kwargs):
 # 181203 cleanup
 # 190118 cleanup: remove debug printing
 # 190425 fix n_clusters > n_words case
+# 261017 sparse cd: k-means, silhouette, variance_ratio without dense copy
+# 261017 'minibatch': MiniBatchKMeans
+# 261017 'silhouette_sample': sampled silhouette selection, exact for the best
+# 261017 grid_search: parallel optimal_clusters grid, 'cluster_time' budget
+# 261017 sparse_ward: ward linkage of sparse cd with kNN connectivity
 # FIXME: try...except
@@ -1,11 +1,13 @@
 # language-learner/src/grammar_learner/sparse_word_space.py             # 81114
 import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix, issparse
 from .utl import kwa
 
 
-def clean_links(links, **kwargs):
+def clean_links(links, symbols = None, **kwargs):
     # links == pd.DataFrame ['word', 'word- & word+']
+    # symbols: SymbolTable if links words and terms are integer ids     # 261017
     min_word_count = kwa(1, 'min_word_count', **kwargs)
     min_link_count = kwa(1, 'min_link_count', **kwargs)
     min_word_frequency = kwa(0.0, 'min_word_frequency', **kwargs)
@@ -20,14 +22,19 @@ def clean_links(links, **kwargs):
         .sort_values(by=['count', 'word'], ascending=[False, True])
     if 'djlen' in wdf: del wdf['djlen']
     words = np.asarray([x for x in wdf.loc[wdf['count'] > min_word_count - 1]['word']
-                       .tolist() if x not in stop_words])
+                       .tolist() if (x if symbols is None else symbols.words[x])
+                        not in stop_words])  # stop_words: str        # 261017
     word_idx = {word: i for i, word in enumerate(words)}
 
     ldf = links.groupby('link', as_index=False).sum()\
         .sort_values(by=['count', 'link'], ascending=[False, True])
     if 'djlen' in ldf: del ldf['djlen']
     ldf.index = [x for x in range(len(ldf))]
-    if kwargs['context'] == 1:
+    if kwargs['context'] == 1 and symbols is not None:                  # 261017
+        features = np.asarray(
+            [x for x in ldf.loc[ldf['count'] > min_link_count - 1]['link']
+                .tolist() if abs(symbols.connectors[x][0]) in word_idx])
+    elif kwargs['context'] == 1:
         features = np.asarray(
             [x for x in ldf.loc[ldf['count'] > min_link_count - 1]['link']
                 .tolist() if x[:-1] in word_idx])
@@ -51,14 +58,30 @@ def clean_links(links, **kwargs):
 def co_occurrence_matrix(linx, **kwargs):  # updated 81012
     # linx == numpy.ndarray [[word_id, feature_id, count]]
     threshold = kwa(1, 'min_co-occurrence_count', **kwargs)
-    counts = np.zeros((max(linx[:, 0]) + 1, max(linx[:, 1]) + 1), dtype=np.int16)
+    if kwa(True, 'sparse_matrix', **kwargs):                            # 261017
+        # scipy.sparse.csr_matrix: memory ~ non-zero counts, no int16 overflow
+        mask = linx[:, 2] >= threshold
+        return csr_matrix((linx[mask, 2], (linx[mask, 0], linx[mask, 1])),
+                          shape=(max(linx[:, 0]) + 1, max(linx[:, 1]) + 1))
+    counts = np.zeros((max(linx[:, 0]) + 1, max(linx[:, 1]) + 1), dtype=np.int64)
     for x in linx: counts[x[0], x[1]] = x[2] if x[2] >= threshold else 0
     return counts
 
 
 def categorical_distribution(counts, **kwargs):
-    # counts: numpy.ndarray [words]*[links]
+    # counts: numpy.ndarray [words]*[links] or scipy.sparse matrix
     threshold = kwa(0.0, 'min_co-occurrence_frequency', **kwargs)
+    if issparse(counts) and threshold >= 0:                             # 261017
+        cd = csr_matrix(counts, dtype=float)
+        cd.data = (cd.data / cd.sum() > threshold).astype(int)
+        cd.eliminate_zeros()
+        return cd.astype(int)
+    if issparse(counts): counts = counts.toarray()
     vsm = np.divide(counts, np.sum(counts))  # Vector Space Model
     cd = (vsm > threshold).astype(int)  # categorical distribution
     return cd
+
+
+# Notes:
+
+# 261017 co_occurrence_matrix, categorical_distribution: sparse matrices
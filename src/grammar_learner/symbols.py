@@ -0,0 +1,78 @@
+# language-learning/src/grammar_learner/symbols.py                      # 261017
+
+
+class SymbolTable:
+    """ interns words and link terms into integer ids, shared by category
+    learning, grammar induction and generalization; strings are restored
+    only when grammar and category tree files are saved
+    words:       [str]   word id » word, 1, 2, ... (0: signed ids)
+    terms:       [str]   term id » connector 'a-' / disjunct 'a- & b+'
+    connectors:  [(int)] term id » signed word ids: 'a- & b+' » (-a, b)
+    Symbols added to the table by one intern_links call are numbered in
+    sorted order, words found only in connectors included: their ids sort
+    the same way as strings. Symbols interned by a later call follow them
+    """
+
+    def __init__(self):
+        self.words = [None]
+        self.word_ids = dict()
+        self.terms = []
+        self.term_ids = dict()
+        self.connectors = []
+
+    def word_id(self, word):
+        if word not in self.word_ids:
+            self.word_ids[word] = len(self.words)
+            self.words.append(word)
+        return self.word_ids[word]
+
+    def term_id(self, term):
+        if term not in self.term_ids:
+            # parsed once: 'a- & was-' » (-a, -was) ⇒ induce_grammar
+            connectors = []
+            for x in term.split():
+                if x != '&' and x[-1] in ['+', '-']:
+                    connectors.append(self.word_id(x[:-1])
+                                      * (1 if x[-1] == '+' else -1))
+            self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            self.connectors.append(tuple(connectors))
+        return self.term_ids[term]
+
+    def intern_links(self, *links):
+        """ links with words and terms as strings » integer ids
+        :param links:   pd.DataFrame(columns = ['word', 'link', 'count']),
+                        several frames are interned in one sorted order
+        :return:        a copy of links, 'word', 'link' replaced with ids,
+                        a tuple of copies if several frames are passed
+        """
+        terms = sorted(set().union(*[set(df['link'].tolist()) for df in links]))
+        words = set().union(*[set(df['word'].tolist()) for df in links])
+        for term in terms:
+            words.update(x[:-1] for x in term.split()
+                         if x != '&' and x[-1] in ['+', '-'])
+        for word in sorted(words):
+            self.word_id(word)
+        for term in terms:
+            self.term_id(term)
+        interned = []
+        for df in links:
+            df = df.copy()
+            df['word'] = df['word'].map(self.word_ids)
+            df['link'] = df['link'].map(self.term_ids)
+            interned.append(df)
+        return interned[0] if len(interned) == 1 else tuple(interned)
+
+    def decode(self, word_ids):
+        return [self.words[i] for i in word_ids]
+
+    def decode_words(self, cats):
+        # cats: {'cluster': [], 'words': [{int}], ...} » 'words': [{str}]
+        decoded = dict(cats)
+        decoded['words'] = [set(self.decode(x)) for x in cats['words']]
+        return decoded
+
+# Notes:
+
+# 261017 integer ids instead of strings in learn, decoded in write_files
+# 261017 intern_links: one sorted order for words, connector words, frames
@@ -24,10 +24,12 @@ def list2file(lst, out_file):
     return string
 
 
-def rules2list(rules_dict, grammar_rules = 2, verbose = 'none'):
+def rules2list(rules_dict, grammar_rules = 2, verbose = 'none',
+               symbols = None):
     logger = logging.getLogger(__name__ + ".rules2list")
     # rules_dict: {'cluster': [], 'words': [], } ⇒ return rules []
     # grammar_rules = kwargs['grammar_rules']: 1 - connectors, 2 - disjuncts
+    # symbols: SymbolTable ⇒ decode word ids                            # 261017
 
     sign = lambda x: ('+', '-')[x < 0]
 
@@ -42,7 +44,9 @@ def rules2list(rules_dict, grammar_rules = 2, verbose = 'none'):
         if i == 0: continue
         if cluster is None: continue
         rule = [cluster]
-        rule.append(sorted(rules_dict['words'][i]))
+        if symbols is not None:                                         # 261017
+            rule.append(sorted(symbols.decode(rules_dict['words'][i])))
+        else: rule.append(sorted(rules_dict['words'][i]))
         if grammar_rules in [1,-1]:  # interconnected connector-based rules
             lefts = set()
             rights = set()
@@ -74,11 +78,12 @@ def rules2list(rules_dict, grammar_rules = 2, verbose = 'none'):
 
 
 def save_link_grammar(rules, output_grammar, grammar_rules = 2,
-                      header = '', footer = ''):  # legacy FIXME:DEL?
+                      header = '', footer = '', symbols = None):  # legacy FIXME:DEL?
     # rules: [] or {}
     # grammar_rules = kwargs['grammar_rules']: 1 ⇒ connectors, 2+ ⇒ disjuncts
+    # symbols: SymbolTable ⇒ decode word ids in rules dict              # 261017
     if type(rules) is dict:
-        rules = rules2list(rules, grammar_rules)
+        rules = rules2list(rules, grammar_rules, symbols = symbols)
 
     line_list = list()
     clusters = set()
@@ -178,8 +183,9 @@ def save_category_tree(category_list, tree_file, verbose = 'none'):
     return {'tree_file': tree_file}
 
 
-def save_cat_tree(cats, output_categories, verbose = 'none'):
+def save_cat_tree(cats, output_categories, verbose = 'none', symbols = None):
     # cats: {'cluster':[], 'words':[], ...}
+    # symbols: SymbolTable ⇒ decode word ids                            # 261017
     tree_file = output_categories
     if os.path.isdir(tree_file):  # received directory ⇒ auto file name
         if tree_file[-1] != '/': tree_file += '/'
@@ -199,7 +205,9 @@ def save_cat_tree(cats, output_categories, verbose = 'none'):
         category.append(cats['parent'][i])
         category.append(i)
         category.append(round(cats['quality'][i], 2))
-        wordz = deepcopy(sorted(cats['words'][i]))
+        if symbols is not None:                                         # 261017
+            wordz = sorted(symbols.decode(cats['words'][i]))
+        else: wordz = deepcopy(sorted(cats['words'][i]))
         #-wordz = [x.replace('@', '.') for x in wordz]  # WSD           # 190408
         category.append(wordz)  # 80704+06 tmp hack FIXME
         category.append(cats['similarities'][i])
@@ -223,3 +231,4 @@ def save_cat_tree(cats, output_categories, verbose = 'none'):
 # 90119 remove Link Grammar 5.4.4 options (v.0.6)
 # 90128 restore Link Grammar 5.4.4 'UNKNOWN-WORD: XXX+;' option
 # 190428 WSD ⇒ learner: optional, configurable
+# 261017 save_link_grammar, save_cat_tree: decode SymbolTable word ids
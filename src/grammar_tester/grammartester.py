@@ -4,20 +4,21 @@ import logging
 from decimal import *
 from time import time
 from inspect import isclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from ..common.absclient import AbstractGrammarTestClient, AbstractStatEventHandler, AbstractFileParserClient, \
     AbstractPipelineComponent, AbstractProgressClient
 from ..common.dirhelper import traverse_dir_tree, create_dir
-from ..common.parsemetrics import ParseMetrics, ParseQuality
+from ..common.parsemetrics import ParseMetrics, ParseQuality, get_metrics_types
 from ..common.fileconfman import JsonFileConfigManager
 from ..common.cliutils import handle_path_string, strip_quotes
 from ..common.textprogress import TextProgress
-from ..common.sentencecount import get_corpus_sentence_count
+from ..common.corpusscan import scan_corpus, is_scan_cache_file
 from ..common.tokencount import *
 from ..common.optconst import *
 from .textfiledashb import TextFileDashboardConf  # , HTMLFileDashboard
 
-from .lgmisc import create_grammar_dir, get_output_suffix
+from .lgmisc import create_grammar_dir, get_output_suffix, GRAMMAR_DIR_COPY
 
 from .lginprocparser import LGInprocParser
 
@@ -32,6 +33,12 @@ CONF_MIN_WORD_CNT = "min_word_count"
 CONF_MAX_SENT_LEN = "max_sentence_len"
 CONF_STOP_TOKENS = "stop_tokens"
 CONF_WORD_CNT_PATH = "word_count_path"
+CONF_CORPUS_WORKERS = "corpus_workers"
+CONF_DICT_WORKERS = "dict_workers"
+CONF_GRAMMAR_DIR_MODE = "grammar_dir_mode"
+CONF_FAST_METRICS = "fast_metrics"
+CONF_PARSE_CACHE = "parse_cache"
+CONF_CORPUS_SCAN_CACHE = "corpus_scan_cache"
 
 # on_corpus_file() argument list indexes
 # [dest_path, lang_path, dict_path, corpus_path, output_path, reference_path]
@@ -50,6 +57,57 @@ DICT_ARG_OUTP = 2
 DICT_ARG_REFF = 3
 
 
+# Parser and keyword arguments shared by all corpus file worker processes
+_worker_parser = None
+_worker_kwargs = None
+
+
+def _init_corpus_worker(parser: AbstractFileParserClient, kwargs: dict) -> None:
+    """ Corpus file worker process initializer """
+    global _worker_parser, _worker_kwargs
+
+    _worker_parser, _worker_kwargs = parser, kwargs
+
+
+def _get_cache_stats(parser: AbstractFileParserClient) -> (int, int):
+    """ Return parser's parse cache statistics tuple (hits, misses) """
+    return parser.cache_stats if isinstance(parser, LGInprocParser) else (0, 0)
+
+
+def _parse_corpus_file(dict_path: str, corpus_path: str, output_path: str, ref_path: str, options: int) \
+        -> (ParseMetrics, ParseQuality, float, (int, int)):
+    """ Parse single corpus file in a worker process """
+    start_time = time()
+    hits, misses = _get_cache_stats(_worker_parser)
+
+    file_metrics, file_quality = _worker_parser.parse(dict_path, corpus_path, output_path, ref_path, options, None,
+                                                      **_worker_kwargs)
+
+    total_hits, total_misses = _get_cache_stats(_worker_parser)
+
+    return file_metrics, file_quality, time() - start_time, (total_hits - hits, total_misses - misses)
+
+
+# Grammar tester copy used by dictionary worker processes
+_worker_tester = None
+
+
+def _init_dict_worker(tester: 'GrammarTester') -> None:
+    """ Dictionary worker process initializer """
+    global _worker_tester
+
+    _worker_tester = tester
+
+
+def _test_dict_file(dest_path: str, lang_path: str, args: list) -> (ParseMetrics, ParseQuality, (int, int)):
+    """ Test single dictionary in a worker process """
+    _worker_tester._cache_hits, _worker_tester._cache_misses = 0, 0
+
+    metrics, quality = _worker_tester._test_dict(dest_path, lang_path, args)
+
+    return metrics, quality, _worker_tester.cache_stats
+
+
 class GrammarTester(AbstractGrammarTestClient):
 
     def __init__(self, grmr: str, tmpl: str, limit: int, parser: AbstractFileParserClient,
@@ -81,6 +139,17 @@ class GrammarTester(AbstractGrammarTestClient):
         self._progress = None
         self._token_counts = {}
         self._test_kwargs = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def cache_stats(self) -> (int, int):
+        """ Return parse cache statistics tuple (hits, misses) of the last test() call """
+        return self._cache_hits, self._cache_misses
+
+    def _add_cache_stats(self, hits: int, misses: int) -> None:
+        self._cache_hits += hits
+        self._cache_misses += misses
 
     @staticmethod
     def _save_stat(stat_path: str, metrics: ParseMetrics, quality: ParseQuality) -> None:
@@ -157,21 +226,43 @@ class GrammarTester(AbstractGrammarTestClient):
         :param args:                List of arguments
         :return:                    None
         """
+        # Corpus pre-scan cache files are not parsed
+        if is_scan_cache_file(corpus_file_path):
+            return
+
         dict_path = args[CORP_ARG_LANG]
 
         start_time = time()
         out_file = self._get_output_file_name(corpus_file_path, args)
         ref_file = self._get_ref_file_name(corpus_file_path, args)
 
+        hits, misses = _get_cache_stats(self._parser)
+
         file_metrics, file_quality = self._parser.parse(dict_path, corpus_file_path, out_file,
                                                         ref_file, self._options, self._progress, **self._test_kwargs)
 
+        total_hits, total_misses = _get_cache_stats(self._parser)
+        self._add_cache_stats(total_hits - hits, total_misses - misses)
+
+        self._on_corpus_file_done(out_file, file_metrics, file_quality, time() - start_time)
+
+    def _on_corpus_file_done(self, out_file: str, file_metrics: ParseMetrics, file_quality: ParseQuality,
+                             parse_time: float) -> None:
+        """
+        Save corpus file statistics if necessary and add it to the totals.
+
+        :param out_file:            Output file path.
+        :param file_metrics:        Corpus file ParseMetrics.
+        :param file_quality:        Corpus file ParseQuality.
+        :param parse_time:          Corpus file parse time in seconds.
+        :return:                    None
+        """
         if self._options & (BIT_SEP_STAT | BIT_OUTPUT) == BIT_SEP_STAT:
             stat_name = out_file + ".stat"
 
             self._save_stat(stat_name, file_metrics, file_quality)
 
-        file_metrics.parse_time = time() - start_time
+        file_metrics.parse_time = parse_time
 
         self._total_metrics += file_metrics
         self._total_quality += file_quality
@@ -181,20 +272,60 @@ class GrammarTester(AbstractGrammarTestClient):
         if self._progress is None:
             self._logger.info(os.path.split(out_file)[1] + " parse time: " + file_metrics.parse_time_str(file_metrics))
 
-    def _on_dict_file(self, dict_file_path: str, args: list) -> None:
+    def _on_corpus_dir_parallel(self, corpus_dir_path: str, args: list, workers: int) -> None:
         """
-        Callback method which is called for each dictionary file.
+        Parse all corpus files found in corpus directory using a pool of worker processes. Results are merged
+            in the same order the files would be parsed sequentially.
 
-        :param dict_file_path:      Path to a .dict file.
-        :param args:                Argument list.
+        :param corpus_dir_path:     Corpus root directory path.
+        :param args:                List of arguments.
+        :param workers:             Number of worker processes.
         :return:                    None
         """
-        self._total_metrics, self._total_quality = ParseMetrics(), ParseQuality()
-        self._total_files = 0
+        corpus_files = []
+
+        traverse_dir_tree(corpus_dir_path, "", [lambda path, _: corpus_files.append(path)],
+                          [self._on_corp_dir] + args, True)
+
+        corpus_files = [path for path in corpus_files if not is_scan_cache_file(path)]
+
+        jobs = [(path, self._get_output_file_name(path, args), self._get_ref_file_name(path, args))
+                for path in corpus_files]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_corpus_worker,
+                                 initargs=(self._parser, self._test_kwargs)) as executor:
 
-        # start_time = time()
+            futures = [executor.submit(_parse_corpus_file, args[CORP_ARG_LANG], path, out_file, ref_file,
+                                       self._options) for path, out_file, ref_file in jobs]
+
+            try:
+                for future in as_completed(futures):
+                    file_metrics, _, _, _ = future.result()
+
+                    if self._progress is not None:
+                        self._progress.update(file_metrics.sentences + file_metrics.skipped_sentences)
+
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+        for (_, out_file, _), future in zip(jobs, futures):
+            file_metrics, file_quality, parse_time, cache_stats = future.result()
+
+            self._add_cache_stats(*cache_stats)
+            self._on_corpus_file_done(out_file, file_metrics, file_quality, parse_time)
+
+    def _prepare_dict_file(self, dict_file_path: str, args: list) -> (str, str, str):
+        """
+        Create grammar directory for the dictionary file if necessary.
+
+        :param dict_file_path:      Path to a .dict file.
+        :param args:                Argument list.
+        :return:                    Tuple (dict_path, dest_path, lang_path).
+        """
         dict_path = os.path.split(dict_file_path)[0]
-        corp_path = args[DICT_ARG_CORP]
         dest_path = args[DICT_ARG_OUTP]
 
         dest_path += str(dict_path[len(args[DICT_ARG_DICT]):])
@@ -204,18 +335,55 @@ class GrammarTester(AbstractGrammarTestClient):
 
         # Create new LG dictionary using .dict file and template directory with the rest of mandatory files.
         lang_path = dict_file_path if self._options & BIT_EXISTING_DICT else \
-            create_grammar_dir(dict_file_path, grmr_path, self._template_dir, self._options)
+            create_grammar_dir(dict_file_path, grmr_path, self._template_dir, self._options,
+                               self._test_kwargs.get(CONF_GRAMMAR_DIR_MODE, GRAMMAR_DIR_COPY))
+
+        return dict_path, dest_path, lang_path
+
+    def _test_dict(self, dest_path: str, lang_path: str, args: list) -> (ParseMetrics, ParseQuality):
+        """
+        Parse the whole corpus with a single dictionary.
+
+        :param dest_path:           Output directory path for the dictionary.
+        :param lang_path:           Grammar directory path.
+        :param args:                Argument list.
+        :return:                    Tuple (ParseMetrics, ParseQuality).
+        """
+        metrics_type, quality_type = get_metrics_types(self._test_kwargs.get(CONF_FAST_METRICS, False))
+        self._total_metrics, self._total_quality = metrics_type(), quality_type()
+        self._total_files = 0
+
+        corp_path = args[DICT_ARG_CORP]
 
         if os.path.isfile(corp_path):
             self._on_corpus_file(corp_path, [dest_path, lang_path] + args)
 
         elif os.path.isdir(corp_path):
-            traverse_dir_tree(corp_path, "", [self._on_corpus_file, dest_path, lang_path] + args,
-                                             [self._on_corp_dir, dest_path, lang_path] + args, True)
+            workers = self._test_kwargs.get(CONF_CORPUS_WORKERS, 1)
+
+            # Corpus files are parsed concurrently if more than one worker is specified
+            if workers is not None and workers > 1:
+                self._on_corpus_dir_parallel(corp_path, [dest_path, lang_path] + args, workers)
 
+            else:
+                traverse_dir_tree(corp_path, "", [self._on_corpus_file, dest_path, lang_path] + args,
+                                                 [self._on_corp_dir, dest_path, lang_path] + args, True)
+
+        return self._total_metrics, self._total_quality
+
+    def _on_dict_file_done(self, dict_file_path: str, dict_path: str, dest_path: str, args: list) -> None:
+        """
+        Save dictionary statistics and notify event handler.
+
+        :param dict_file_path:      Path to a .dict file.
+        :param dict_path:           Path to a directory where .dict file is located.
+        :param dest_path:           Output directory path for the dictionary.
+        :param args:                Argument list.
+        :return:                    None
+        """
         # If output format is set to ULL
         if not (self._options & BIT_OUTPUT):
-            stat_path = dest_path + "/" + os.path.split(corp_path)[1] + ".stat"  # + stat_suffix
+            stat_path = dest_path + "/" + os.path.split(args[DICT_ARG_CORP])[1] + ".stat"  # + stat_suffix
 
             # Write statistics summary to a file
             self._save_stat(stat_path, self._total_metrics, self._total_quality)
@@ -232,6 +400,109 @@ class GrammarTester(AbstractGrammarTestClient):
 
         self._total_dicts += 1
 
+    def _on_dict_file(self, dict_file_path: str, args: list) -> None:
+        """
+        Callback method which is called for each dictionary file.
+
+        :param dict_file_path:      Path to a .dict file.
+        :param args:                Argument list.
+        :return:                    None
+        """
+        dict_path, dest_path, lang_path = self._prepare_dict_file(dict_file_path, args)
+
+        self._test_dict(dest_path, lang_path, args)
+
+        self._on_dict_file_done(dict_file_path, dict_path, dest_path, args)
+
+    def _worker_copy(self) -> 'GrammarTester':
+        """ Return a copy of the tester, suitable to be passed to a worker process """
+        tester = GrammarTester(self._grammar_root, self._template_dir, self._linkage_limit, self._parser)
+        tester._options = self._options
+        tester._is_dir_corpus = self._is_dir_corpus
+        tester._is_dir_dict = self._is_dir_dict
+        tester._test_kwargs = self._test_kwargs
+
+        return tester
+
+    def _on_dict_dir_parallel(self, dict_dir_path: str, args: list, workers: int) -> None:
+        """
+        Test all dictionaries found in dictionary directory using a pool of worker processes. Grammar directories
+            are created beforehand so each worker has its own one. Results are handled in the same order
+            the dictionaries would be tested sequentially.
+
+        :param dict_dir_path:       Dictionary root directory path.
+        :param args:                Argument list.
+        :param workers:             Number of worker processes.
+        :return:                    None
+        """
+        dict_files = []
+
+        dir_arg_list = [self._on_dict_dir] + args if self._options & BIT_DPATH_CREATE else None
+
+        traverse_dir_tree(dict_dir_path, ("4.0.dict", "dict.db"), [lambda path, _: dict_files.append(path)],
+                          dir_arg_list, True)
+
+        jobs, lang_paths = [], set()
+
+        for dict_file_path in dict_files:
+            dict_path, dest_path, lang_path = self._prepare_dict_file(dict_file_path, args)
+
+            if lang_path in lang_paths:
+                raise GrammarTestError(f"Grammar directory '{lang_path}' is shared by more than one dictionary. "
+                                       f"Dictionaries can not be tested in parallel.")
+
+            lang_paths.add(lang_path)
+            jobs.append((dict_file_path, dict_path, dest_path, lang_path))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_dict_worker,
+                                 initargs=(self._worker_copy(),)) as executor:
+
+            futures = [executor.submit(_test_dict_file, dest_path, lang_path, args)
+                       for _, _, dest_path, lang_path in jobs]
+
+            try:
+                for future in as_completed(futures):
+                    metrics, _, _ = future.result()
+
+                    if self._progress is not None:
+                        self._progress.update(metrics.sentences + metrics.skipped_sentences)
+
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+        results = []
+
+        for (dict_file_path, dict_path, dest_path, _), future in zip(jobs, futures):
+            self._total_metrics, self._total_quality, cache_stats = future.result()
+            self._add_cache_stats(*cache_stats)
+            self._on_dict_file_done(dict_file_path, dict_path, dest_path, args)
+
+            results.append((dict_file_path, self._total_metrics, self._total_quality))
+
+        if not (self._options & BIT_OUTPUT):
+            self._save_summary(args[DICT_ARG_OUTP] + "/" + os.path.split(args[DICT_ARG_CORP])[1] + ".summary",
+                               results)
+
+    @staticmethod
+    def _save_summary(summary_path: str, results: list) -> None:
+        """
+        Save statistics of multiple dictionaries tested over the same corpus into a single file.
+
+        :param summary_path:    Path to file.
+        :param results:         List of tuples (dict_file_path, ParseMetrics, ParseQuality).
+        :return:                None
+        """
+        with open(summary_path, "w", encoding="utf-8") as summary_file:
+            print("Dictionary\tPA\tPQ\tF1\tParse time", file=summary_file)
+
+            for dict_file_path, metrics, quality in results:
+                print("\t".join([dict_file_path, metrics.parseability_str(metrics).strip(),
+                                 quality.parse_quality_str(quality).strip(), quality.f1_str(quality).strip(),
+                                 metrics.parse_time_str(metrics)]), file=summary_file)
+
     def test(self, dict_path: str, corpus_path: str, output_path: str, reference_path: str, options: int,
              progress: AbstractProgressClient = None, **kwargs) -> (ParseMetrics, ParseQuality):
         """
@@ -253,6 +524,7 @@ class GrammarTester(AbstractGrammarTestClient):
         self._is_dir_dict = os.path.isdir(dict_path)
         self._token_counts.clear()
         self._test_kwargs = kwargs
+        self._cache_hits, self._cache_misses = 0, 0
 
         if not (os.path.isfile(corpus_path) or os.path.isdir(corpus_path)):
             raise FileNotFoundError("Path '" + corpus_path + "' does not exist.")
@@ -274,16 +546,25 @@ class GrammarTester(AbstractGrammarTestClient):
         if dict_path == output_path:
             self._options &= (~BIT_DPATH_CREATE)
 
+        # Count sentences and tokens of all corpus files in one read. Results are cached next to the corpus.
+        corpus_scan = scan_corpus(corpus_path, self._options, self._test_kwargs.get(CONF_CORPUS_SCAN_CACHE, True))
+
+        self._logger.debug(f"Corpus pre-scan: {len(corpus_scan.files)} file(s), {corpus_scan.size} bytes, "
+                           f"cached: {corpus_scan.hits}, scanned: {corpus_scan.misses}")
+
         # Count total number of sentences across all corpus files
-        self._total_sentences = get_corpus_sentence_count(corpus_path, self._options)
+        self._total_sentences = corpus_scan.sentences
+
+        # Per file sentence counts are passed to the parser so corpus files are not scanned again
+        self._test_kwargs["sentence_counts"] = {path: file_scan.sentences
+                                                for path, file_scan in corpus_scan.files.items()}
 
         # Either count or load token appearance data if min_word_count is specified
         if self._test_kwargs.get("min_word_count", 0) > 1:
 
             cnt_path = self._test_kwargs.get(CONF_WORD_CNT_PATH, None)
 
-            self._token_counts = count_tokens(corpus_path, self._options) if cnt_path is None \
-                else load_token_counts(cnt_path)
+            self._token_counts = corpus_scan.token_counts if cnt_path is None else load_token_counts(cnt_path)
 
             # self._logger.debug(self._token_counts)
             self._test_kwargs["token_counts"] = self._token_counts
@@ -302,9 +583,17 @@ class GrammarTester(AbstractGrammarTestClient):
 
         # If dict_path is a directory then call on_dict_file for every .dict file found.
         if self._is_dir_dict and not (self._options & BIT_EXISTING_DICT):
-            dir_arg_list = [self._on_dict_dir]+parse_args if self._options & BIT_DPATH_CREATE else None
+            workers = self._test_kwargs.get(CONF_DICT_WORKERS, 1)
 
-            traverse_dir_tree(dict_path, ("4.0.dict", "dict.db"), [self._on_dict_file]+parse_args, dir_arg_list, True)
+            # Dictionaries are tested concurrently if more than one worker is specified
+            if workers is not None and workers > 1:
+                self._on_dict_dir_parallel(dict_path, parse_args, workers)
+
+            else:
+                dir_arg_list = [self._on_dict_dir]+parse_args if self._options & BIT_DPATH_CREATE else None
+
+                traverse_dir_tree(dict_path, ("4.0.dict", "dict.db"), [self._on_dict_file]+parse_args, dir_arg_list,
+                                  True)
 
         # Otherwise it can be either single .dict file name or name of LG preinstalled dictionary e.g. 'en'
         else:
@@ -323,6 +612,14 @@ class GrammarTester(AbstractGrammarTestClient):
         if not self._total_dicts:
             raise FileNotFoundError("No dictionary files found in '" + dict_path + "'")
 
+        if self._test_kwargs.get(CONF_PARSE_CACHE, None) is not None:
+            cache_info = f"Parse cache hits: {self._cache_hits}, misses: {self._cache_misses}"
+
+            if self._progress is None:
+                self._logger.info(cache_info)
+            else:
+                self._progress.write(cache_info)
+
         if self._progress is None:
             self._logger.info("Dictionaries processed: " + str(self._total_dicts))
             self._logger.info("Overal execution time: " + self._total_metrics.parse_time_str(self._total_metrics))
@@ -5,7 +5,7 @@ from linkgrammar import LG_DictionaryError, LG_Error, ParseOptions, Dictionary,
 from ..common.optconst import *
 from ..common.parsemetrics import ParseMetrics, ParseQuality
 from .parsestat import parse_metrics, parse_quality
-from .psparse import parse_postscript, prepare_tokens, get_link_set
+from .psparse import fast_parse_postscript, prepare_tokens, get_link_set
 from .lgmisc import get_output_suffix, print_output
 from ..common.absclient import AbstractFileParserClient
 from .parsevaluate import load_parses
@@ -98,7 +98,7 @@ class LGApiParser(AbstractFileParserClient):
 
                     elif not (options & BIT_OUTPUT):
 
-                        tokens, links = parse_postscript(linkage.postscript().replace("\n", ""), options)
+                        tokens, links = fast_parse_postscript(linkage.postscript().replace("\n", ""), options)
 
                         # Print ULL formated parses
                         print_output(tokens, links, options, output_file_handle)
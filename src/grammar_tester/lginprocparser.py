@@ -2,11 +2,14 @@ import sys
 import os
 import re
 import logging
+import tempfile
+from io import TextIOWrapper
+from threading import Thread
+from typing import Iterable, Iterator
 from subprocess import PIPE, Popen
 
 from ..common.absclient import AbstractFileParserClient, AbstractProgressClient
-from ..common.sentencecount import get_sentence_count
-from ..common.sedcommands import get_sed_cmd_common_part
+from ..common.sedcommands import read_filtered_lines
 from ..common.tokencount import unbox_tokens
 from .psparse import *
 from .parsestat import *
@@ -15,6 +18,8 @@ from .lgmisc import *
 from .parsevaluate import load_parses, tokenize_sentence, unbox_tokens, EvalError
 from .lgpcommands import *
 from .linkgrammarver import get_lg_version, get_lg_dict_version
+from .lgprocpool import LGProcessPool
+from .parsecache import ParseCache, get_dict_hash
 
 
 __all__ = ['LGInprocParser']
@@ -35,10 +40,38 @@ class PSSentence:
         return ret
 
 
+class CountingIterator:
+    """ Iterator wrapper counting the items already returned """
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
+
+
+def strip_bom(lines: Iterable[str]) -> Iterator[str]:
+    """ Return lines removing byte order mark from the first one if any """
+    iterator = iter(lines)
+
+    for line in iterator:
+        yield line[1:] if line.startswith("\ufeff") else line
+        break
+
+    yield from iterator
+
+
 class LGInprocParser(AbstractFileParserClient):
 
     MAX_SENTENCE_LENGTH = 99999
 
+    BLOCK_PATTERN = re.compile(r"\n\n[^\s]", re.M)
+
     def __init__(self, limit: int = 100, timeout=1, verbosity=1):
         self._logger = logging.getLogger("LGInprocParser")
         self._linkage_limit = limit
@@ -52,6 +85,10 @@ class LGInprocParser(AbstractFileParserClient):
         self._min_word_count = 0
         self._max_sentence_len = LGInprocParser.MAX_SENTENCE_LENGTH
         self._token_counts = None
+        self._proc_pool = None
+        self._parse_cache = None
+        self._fast_metrics = False
+        self._metrics_type, self._quality_type = ParseMetrics, ParseQuality
 
     def _parse_batch_ps_output(self, text: str, options: int) -> list:
         """
@@ -64,22 +101,100 @@ class LGInprocParser(AbstractFileParserClient):
         :return:            List of PSSentence.
 
         """
-        sentences = []
-
         pos = skip_command_response(text)
         end = trim_garbage(text)
 
         if pos > end:
             end = text.rfind("No complete linkages found.")
 
+        # Parse output to get sentences and linkages in postscript notation
+        return list(self._parse_ps_blocks(re.split(LGInprocParser.BLOCK_PATTERN, text[pos:end]), options))
+
+    @staticmethod
+    def _iter_ps_blocks(lines: Iterable[str]) -> Iterator[str]:
+        """
+        Split link-parser output into text blocks as they are read, without keeping the whole output in memory.
+            The blocks are exactly the same as the ones produced by _parse_batch_ps_output() for the same text.
+
+        :param lines:       Iterable of link-parser output lines (e.g. text stream).
+        :return:            Iterator of text blocks.
+        """
+        header = []
+        raw_lines = []      # Kept only until the first ']' is found in order to handle 'no linkages at all' case
+        block_lines = None
+        held = []           # Blocks following the last block with ']' in it (inclusive)
+
+        for line in lines:
+            line = line[:-1] if line.endswith("\n") else line
+
+            # Skip command response lines
+            if block_lines is None:
+                if not len(line) or line.startswith("Debug:") or line.find(" set to ") >= 0:
+                    header.append(line)
+                    continue
+
+                block_lines = []
+
+            if raw_lines is not None:
+                raw_lines.append(line)
+
+            # Empty line followed by a line starting with non-space character is a block delimiter
+            if len(block_lines) > 1 and not len(block_lines[-1]) and len(line) and not line[0].isspace():
+                block = "\n".join(block_lines[:-1])
+
+                if block.find("]") >= 0:
+                    yield from held
+                    held = []
+                    raw_lines = None
+
+                held.append(block)
+                block_lines = [line[1:]]
+
+            else:
+                block_lines.append(line)
+
+        if block_lines is None:
+            return
+
+        block = "\n".join(block_lines)
+
+        if block.find("]") >= 0:
+            yield from held
+            held = []
+            raw_lines = None
+
+        held.append(block)
+
+        # Everything following the last ']' is considered as garbage
+        if raw_lines is None:
+            block = held[0]
+            yield block[:block.rfind("]")+1]
+
+        # If there is no ']' in the whole output let batch routine handle the rest
+        else:
+            text = "\n".join(header + raw_lines) + "\n"
+            pos = skip_command_response(text)
+            end = trim_garbage(text)
+
+            if pos > end:
+                end = text.rfind("No complete linkages found.")
+
+            yield from re.split(LGInprocParser.BLOCK_PATTERN, text[pos:end])
+
+    def _parse_ps_blocks(self, blocks: Iterable[str], options: int) -> Iterator[PSSentence]:
+        """
+        Parse postscript text blocks into sentences. Each sentence is yielded as soon as all of its linkages
+            are read.
+
+        :param blocks:      Iterable of text blocks.
+        :param options:     Parsing options.
+        :return:            Iterator of PSSentence.
+        """
         validity_mask = (options & (BIT_EXCLUDE_TIMEOUTED | BIT_EXCLUDE_PANICED | BIT_EXCLUDE_EXPLOSION))
 
         prev_sent = None
 
-        pattern = re.compile(r"\n\n[^\s]", re.M)
-
-        # Parse output to get sentences and linkages in postscript notation
-        for block in re.split(pattern, text[pos:end]):  # text[pos:end].split("\n\n"):
+        for block in blocks:
 
             block = block.strip()
 
@@ -106,11 +221,14 @@ class LGInprocParser(AbstractFileParserClient):
 
                 # Check if it's a new sentence or just another linkage
                 if sentence is not None:
-                    # If the text block is a sentence then add another sentence to the sentence list.
+                    # Previous sentence has no more linkages to come
+                    if prev_sent is not None:
+                        yield prev_sent
+
+                    # If the text block is a sentence then create another sentence.
                     #   The linkage will be added to the newly created sentence.
                     cur_sent = PSSentence(sentence)
                     cur_sent.valid = is_valid
-                    sentences.append(cur_sent)
 
                 else:
                     # If the text block is another linkage then it will be added to the previous sentence
@@ -129,7 +247,8 @@ class LGInprocParser(AbstractFileParserClient):
 
                 prev_sent = cur_sent
 
-        return sentences
+        if prev_sent is not None:
+            yield prev_sent
 
     def _check_token_counts(self, tokens: List[str]) -> bool:
         if self._token_counts is None:
@@ -143,6 +262,60 @@ class LGInprocParser(AbstractFileParserClient):
 
         return True
 
+    def _handle_sentence(self, sent: PSSentence, sentence_index: int, options: int, out_stream, ref_parses: list,
+                         metrics: ParseMetrics, quality: ParseQuality) -> None:
+        """
+        Parse the first linkage of a sentence, print it out in ULL format and update statistics.
+
+        :param sent:            PSSentence instance.
+        :param sentence_index:  Zero based sentence index in corpus file.
+        :param options:         Integer variable with multiple bit fields.
+        :param out_stream:      Output file stream handle.
+        :param ref_parses:      List of reference parses.
+        :param metrics:         ParseMetrics instance to be updated.
+        :param quality:         ParseQuality instance to be updated.
+        :return:                None
+        """
+        if not len(sent.linkages) or not sent.valid:
+            metrics.skipped_sentences += 1
+            return
+
+        # Parse postscript notated linkage and get two lists with tokens and links in return.
+        tokens, links = fast_parse_postscript(sent.linkages[0], options)
+
+        if not len(tokens):
+            raise LGParseError(f"No tokens for sentence: '{sent.linkages[0].text}'")
+
+        # Filter tokens to match parse options
+        prepared = prepare_tokens(tokens, options)
+
+        # Strip suffixes, convert to lower case and make a set out of token list
+        lcased_token_set = set(prepared)
+        # lcased_token_set = { strip_token(token.lower()) for token in tokens }
+
+        # The sentence is skipped if one of the following is true:
+        #   - stop token list is not empty and the sentence contains at least one of the stop tokens
+        #   - sentence length exceeds 'max_sentence_len' value
+        #   - one of the sentence tokens has count less then specified by 'min_word_count'
+        if self._stop_tokens_set is not None and len(lcased_token_set & self._stop_tokens_set) or \
+                len(prepared) > self._max_sentence_len or not self._check_token_counts(prepared):
+
+            # Increment skipped sentence counter and continue with the next sentence
+            metrics.skipped_sentences += 1
+            return
+
+        # Print out links in ULL-format
+        print_output(tokens, links, options, out_stream)
+
+        # Calculate parse ability etc.
+        metrics += parse_metrics(prepared, self._fast_metrics)
+
+        # Calculate parse quality if the option is set
+        if (options & BIT_PARSE_QUALITY) and len(ref_parses):
+            ref_set = get_link_set(unbox_tokens(tokenize_sentence(ref_parses[sentence_index][0])),
+                                   ref_parses[sentence_index][1], options)
+            quality += parse_quality(get_link_set(tokens, links, options), ref_set, self._fast_metrics)
+
     def _handle_stream_output(self, text: str, options: int, out_stream, ref_path: str) -> (ParseMetrics, ParseQuality):
         """
         Handle link-parser output stream text depending on options' BIT_OUTPUT field.
@@ -153,7 +326,7 @@ class LGInprocParser(AbstractFileParserClient):
         :param ref_path:    Reference file path.
         :return:            Tuple (ParseMetrics, ParseQuality)
         """
-        total_metrics, total_quality = ParseMetrics(), ParseQuality()
+        total_metrics, total_quality = self._metrics_type(), self._quality_type()
 
         ref_parses = []
 
@@ -178,53 +351,269 @@ class LGInprocParser(AbstractFileParserClient):
 
             # Parse linkages and make statistics estimation
             for sentence_count, sent in enumerate(sentences):
+                self._handle_sentence(sent, sentence_count, options, out_stream, ref_parses,
+                                      total_metrics, total_quality)
 
-                if not len(sent.linkages) or not sent.valid:
-                    total_metrics.skipped_sentences += 1
-                    continue
+        # If output format is other than ull then simply write text to the output stream.
+        else:
+            print(text, file=out_stream)
 
-                # Parse postscript notated linkage and get two lists with tokens and links in return.
-                tokens, links = parse_postscript(sent.linkages[0], options)
+        return total_metrics, total_quality
 
-                if not len(tokens):
-                    raise LGParseError(f"No tokens for sentence: '{sent.linkages[0].text}'")
+    def _handle_output_lines(self, lines: Iterable[str], options: int, out_stream, ref_path: str,
+                             progress: AbstractProgressClient = None, bar=None) -> (ParseMetrics, ParseQuality):
+        """
+        Streaming counterpart of _handle_stream_output(). Link-parser output is handled line by line so only
+            the sentence being currently parsed is kept in memory.
 
-                # Filter tokens to match parse options
-                prepared = prepare_tokens(tokens, options)
+        :param lines:       Iterable of link-parser output lines.
+        :param options:     Integer variable with multiple bit fields.
+        :param out_stream:  Output file stream handle.
+        :param ref_path:    Reference file path.
+        :param progress:    Progress instance reference.
+        :param bar:         Corpus file progress bar.
+        :return:            Tuple (ParseMetrics, ParseQuality)
+        """
+        total_metrics, total_quality = self._metrics_type(), self._quality_type()
+
+        # If output format is other than ull then simply write text to the output stream.
+        if options & BIT_OUTPUT:
+            for line in lines:
+                out_stream.write(line)
 
-                # Strip suffixes, convert to lower case and make a set out of token list
-                lcased_token_set = set(prepared)
-                # lcased_token_set = { strip_token(token.lower()) for token in tokens }
+            print("", file=out_stream)
 
-                # The sentence is skipped if one of the following is true:
-                #   - stop token list is not empty and the sentence contains at least one of the stop tokens
-                #   - sentence length exceeds 'max_sentence_len' value
-                #   - one of the sentence tokens has count less then specified by 'min_word_count'
-                if self._stop_tokens_set is not None and len(lcased_token_set & self._stop_tokens_set) or \
-                        len(prepared) > self._max_sentence_len or not self._check_token_counts(prepared):
+            return total_metrics, total_quality
 
-                    # Increment skipped sentence counter and continue with the next sentence
-                    total_metrics.skipped_sentences += 1
-                    continue
+        ref_parses = load_parses(ref_path) if options & BIT_PARSE_QUALITY and ref_path is not None else []
+        len_ref, len_par = len(ref_parses), 0
 
-                # Print out links in ULL-format
-                print_output(tokens, links, options, out_stream)
+        for sent in self._parse_ps_blocks(self._iter_ps_blocks(lines), options):
 
-                # Calculate parse ability etc.
-                total_metrics += parse_metrics(prepared)
+            if len_ref and len_par >= len_ref:
+                raise LGParseError("Number of sentences in corpus and reference files missmatch. "
+                                   "Reference file '{}' has only {} sentences.".format(ref_path, len_ref))
 
-                # Calculate parse quality if the option is set
-                if (options & BIT_PARSE_QUALITY) and len(ref_parses):
-                    ref_set = get_link_set(unbox_tokens(tokenize_sentence(ref_parses[sentence_count][0])),
-                                           ref_parses[sentence_count][1], options)
-                    total_quality += parse_quality(get_link_set(tokens, links, options), ref_set)
+            self._handle_sentence(sent, len_par, options, out_stream, ref_parses, total_metrics, total_quality)
 
-        # If output format is other than ull then simply write text to the output stream.
-        else:
-            print(text, file=out_stream)
+            len_par += 1
+
+            if progress is not None:
+                progress.update(1)
+
+            if bar is not None:
+                bar.update(1)
+
+        if options & BIT_PARSE_QUALITY and ref_path is not None and len_ref != len_par:
+            raise LGParseError("Number of sentences in corpus and reference files missmatch. "
+                               "Reference file '{}' does not match "
+                               "its corpus counterpart {} != {}.".format(ref_path, len_ref, len_par))
 
         return total_metrics, total_quality
 
+    @staticmethod
+    def _write_input(stream, sentences: Iterable[str]) -> None:
+        """ Writer thread routine sending corpus lines to link-parser input one by one """
+        try:
+            # Invalid UTF-8 bytes read as surrogates are sent unchanged the same way sed passes them through
+            for sentence in sentences:
+                stream.write(sentence.encode("utf-8", "surrogateescape"))
+
+        # link-parser terminated before reading all the input, its exit code is checked by the caller
+        except (BrokenPipeError, OSError):
+            pass
+
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def _run_batch(self, sentences: Iterable[str], lgp_cmd: list) -> (bytes, bytes):
+        """
+        Run link-parser feeding it with corpus lines and read its whole output at once.
+
+        :param sentences:       Iterable of filtered corpus file lines.
+        :param lgp_cmd:         link-parser command argument list.
+        :return:                Tuple (output_stream_bytes, error_stream_bytes).
+        """
+        # Error stream is redirected to a temporary file to avoid pipe deadlock while stdout is being read
+        with tempfile.TemporaryFile() as err_file:
+
+            with Popen(lgp_cmd, stdin=PIPE, stdout=PIPE, stderr=err_file) as proc_pars:
+
+                writer = Thread(target=self._write_input, args=(proc_pars.stdin, sentences), daemon=True)
+                writer.start()
+
+                try:
+                    raw_stream = proc_pars.stdout.read()
+
+                except BaseException:
+                    proc_pars.kill()
+                    raise
+
+                finally:
+                    proc_pars.wait()
+                    writer.join()
+
+            err_file.seek(0)
+            err_stream = err_file.read()
+
+        # Check return code to make sure the process completed successfully.
+        if proc_pars.returncode != 0:
+            raise ParserError(f"Process '{lgp_cmd[0]}' terminated with exit code: {proc_pars.returncode} "
+                              f"and error message:\n'{err_stream.decode()}'.")
+
+        return raw_stream, err_stream
+
+    def _parse_streaming(self, sentences: Iterable[str], lgp_cmd: list, options: int, out_stream, ref_file: str,
+                         progress: AbstractProgressClient = None, bar=None) -> (ParseMetrics, ParseQuality, bytes):
+        """
+        Run link-parser handling its output while it is being produced.
+
+        :param sentences:       Iterable of filtered corpus file lines.
+        :param lgp_cmd:         link-parser command argument list.
+        :param options:         Bit mask representing parsing options.
+        :param out_stream:      Output file stream handle.
+        :param ref_file:        Reference file path.
+        :param progress:        Progress instance reference.
+        :param bar:             Corpus file progress bar.
+        :return:                Tuple (ParseMetrics, ParseQuality, error_stream_bytes).
+        """
+        # Error stream is redirected to a temporary file to avoid pipe deadlock while stdout is being read
+        with tempfile.TemporaryFile() as err_file:
+
+            with Popen(lgp_cmd, stdin=PIPE, stdout=PIPE, stderr=err_file) as proc_pars:
+
+                # Input is written by a separate thread so link-parser is never blocked on full output pipe
+                writer = Thread(target=self._write_input, args=(proc_pars.stdin, sentences), daemon=True)
+                writer.start()
+
+                lines = TextIOWrapper(proc_pars.stdout, encoding="utf-8-sig", newline="\n")
+
+                try:
+                    metrics, quality = self._handle_output_lines(lines, options, out_stream, ref_file,
+                                                                 progress, bar)
+
+                except BaseException:
+                    proc_pars.kill()
+                    raise
+
+                finally:
+                    # Make sure the process is not blocked on full output pipe
+                    for _ in lines:
+                        pass
+
+                    proc_pars.wait()
+                    writer.join()
+
+            err_file.seek(0)
+            err_stream = err_file.read()
+
+            # Check return code to make sure the process completed successfully.
+            if proc_pars.returncode != 0:
+                raise ParserError(f"Process '{lgp_cmd[0]}' terminated with exit code: {proc_pars.returncode} "
+                                  f"and error message:\n'{err_stream.decode()}'.")
+
+        return metrics, quality, err_stream
+
+    @staticmethod
+    def _get_failed_parse_lines(sentence: str) -> List[str]:
+        """
+        Return link-parser output lines for a sentence that could not be parsed because link-parser process
+            terminated or hung. The sentence is treated the same way as the one with expired parse timer.
+
+        :param sentence:        Sentence text.
+        :return:                List of output lines.
+        """
+        tokens = sentence.split()
+
+        return [sentence + "\n", "No complete linkages found.\n", "Timer is expired!\n",
+                "[([" + "])([".join(tokens) + "])]\n", "[]\n", "[0]\n", "\n"]
+
+    def _iter_persistent_output(self, lgp_cmd: list, sentences: Iterable[str], cache_prefix=None) -> Iterator[str]:
+        """
+        Feed sentences to long-lived link-parser process one by one and return its output lines. If parse cache
+            is set, cached output is returned for already parsed sentences. link-parser process is not started
+            until the first sentence missing in the cache is met.
+
+        :param lgp_cmd:         link-parser command argument list.
+        :param sentences:       Iterable of sentences.
+        :param cache_prefix:    Parse cache key prefix returned by ParseCache.get_key_prefix().
+        :return:                Iterator of link-parser output lines.
+        """
+        proc = None
+
+        for sentence in sentences:
+            key = None
+
+            if cache_prefix is not None:
+                key = ParseCache.get_key(cache_prefix, sentence)
+                lines = self._parse_cache.get(key)
+
+                if lines is not None:
+                    yield from lines
+                    continue
+
+            if proc is None:
+                proc = self._proc_pool.get(lgp_cmd, self._linkage_limit)
+
+            lines = self._proc_pool.parse(proc, sentence)
+
+            if lines is None:
+                yield from self._get_failed_parse_lines(sentence.rstrip("\n"))
+                continue
+
+            # Timed out parses depend on system load so they are not cached
+            if key is not None and not any(line.startswith("Timer is expired!") for line in lines):
+                self._parse_cache.put(key, lines)
+
+            yield from lines
+
+    def _parse_persistent(self, sentences: Iterable[str], lgp_cmd: list, options: int, out_stream, ref_file: str,
+                          progress: AbstractProgressClient = None, bar=None, timeout: float = 60,
+                          cache_prefix=None) -> (ParseMetrics, ParseQuality):
+        """
+        Parse filtered corpus file with link-parser process kept running from one parse() call to another.
+            Dictionary is loaded only once for all corpus files.
+
+        :param sentences:       Iterable of filtered corpus file lines.
+        :param lgp_cmd:         link-parser command argument list.
+        :param options:         Bit mask representing parsing options.
+        :param out_stream:      Output file stream handle.
+        :param ref_file:        Reference file path.
+        :param progress:        Progress instance reference.
+        :param bar:             Corpus file progress bar.
+        :param timeout:         Number of seconds to wait for link-parser response before the process is restarted.
+        :param cache_prefix:    Parse cache key prefix or None if parse cache is not used.
+        :return:                Tuple (ParseMetrics, ParseQuality).
+        """
+        if self._proc_pool is None:
+            self._proc_pool = LGProcessPool(timeout)
+
+        # Byte order mark is not sent to link-parser along with the first sentence
+        sentences = strip_bom(sentences)
+
+        try:
+            return self._handle_output_lines(self._iter_persistent_output(lgp_cmd, sentences, cache_prefix),
+                                             options, out_stream, ref_file, progress, bar)
+        finally:
+            if self._parse_cache is not None:
+                self._parse_cache.flush()
+
+    @property
+    def cache_stats(self) -> (int, int):
+        """ Return parse cache statistics tuple (hits, misses) accumulated since the parser was created """
+        return (0, 0) if self._parse_cache is None else (self._parse_cache.hits, self._parse_cache.misses)
+
+    def close(self) -> None:
+        """ Terminate link-parser processes started in persistent mode if any and close parse cache """
+        if self._proc_pool is not None:
+            self._proc_pool.close()
+
+        if self._parse_cache is not None:
+            self._parse_cache.close()
+
     def parse(self, dict_path: str, corpus_path: str, output_path: str, ref_file: str, options: int,
               progress: AbstractProgressClient = None, **kwargs) -> (ParseMetrics, ParseQuality):
         """
@@ -236,6 +625,9 @@ class LGInprocParser(AbstractFileParserClient):
         :param ref_file:        Reference file path.
         :param options:         Bit mask representing parsing options.
         :param progress:        Progress instance reference.
+        :param kwargs:          Optional keyword arguments such as 'stop_tokens', 'max_sentence_len',
+                                'min_word_count', 'token_counts', 'stream_output', 'persistent_parser',
+                                'process_timeout', 'fast_metrics', 'parse_cache'.
         :return:                Tuple (ParseMetrics, ParseQuality).
         """
         if progress is None:
@@ -266,6 +658,28 @@ class LGInprocParser(AbstractFileParserClient):
         self._min_word_count = kwargs.get("min_word_count", 0)
         self._token_counts = kwargs.get("token_counts", None)
 
+        # Metrics are accumulated in native floats instead of Decimal if set
+        self._fast_metrics = kwargs.get("fast_metrics", False)
+        self._metrics_type, self._quality_type = get_metrics_types(self._fast_metrics)
+
+        # Link-parser output is handled as it comes if set. Otherwise the whole output is read at once.
+        stream_output = kwargs.get("stream_output", False)
+
+        # Link-parser process is kept running between parse() calls if set
+        persistent_parser = kwargs.get("persistent_parser", False)
+
+        # Parse results are looked up in on-disk cache before sending sentences to link-parser if cache path is set.
+        #   Sentences are parsed one by one the same way persistent parser does.
+        cache_path = kwargs.get("parse_cache", None)
+
+        if cache_path is not None and (self._parse_cache is None or self._parse_cache.path != cache_path):
+            if self._parse_cache is not None:
+                self._parse_cache.close()
+
+            self._parse_cache = ParseCache(cache_path)
+
+        cache_prefix = None
+
         sentence_count = 0
 
         bar = None
@@ -284,23 +698,24 @@ class LGInprocParser(AbstractFileParserClient):
             else:
                 self._logger.info("Reference file name is not specified. Parse quality is not calculated.")
 
-        sed_cmd = get_sed_cmd_common_part(options) + [corpus_path]
-
         out_stream = None
-        ret_metrics = ParseMetrics()
-        ret_quality = ParseQuality()
+        ret_metrics = self._metrics_type()
+        ret_quality = self._quality_type()
 
         raw_stream, err_stream = None, None
 
         try:
-            # Get number of sentences in input file
-            sentence_count = get_sentence_count(corpus_path, options)
+            # Number of sentences for the progress bar comes from GrammarTester corpus pre-scan if available.
+            #   Corpus file is not read in advance otherwise. Corpus file lines are streamed to link-parser
+            #   and the lines actually sent are counted.
+            sentence_count = kwargs.get("sentence_counts", {}).get(corpus_path, None)
+            sentences = CountingIterator(read_filtered_lines(corpus_path, options))
 
             if progress is not None:
                 progress_type = type(progress)
                 bar = progress_type(total=sentence_count, desc=os.path.split(corpus_path)[1],
                                     unit="sentences", leave=True)
-            else:
+            elif sentence_count is not None:
                 self._logger.info(f"Number of sentences: {sentence_count}")
 
             lgp_cmd = get_linkparser_command(options, dict_path, self._linkage_limit, self._timeout, self._lg_verbosity)
@@ -310,49 +725,59 @@ class LGInprocParser(AbstractFileParserClient):
             out_stream = sys.stdout if output_path is None \
                 else open(output_path, "w", encoding="utf-8")
 
-            with Popen(sed_cmd, stdout=PIPE) as proc_grep, \
-                 Popen(lgp_cmd, stdin=proc_grep.stdout, stdout=PIPE, stderr=PIPE) as proc_pars:
-
-                # Closing grep output stream will terminate it's process.
-                proc_grep.stdout.close()
-
+            if cache_path is not None:
+                cache_prefix = ParseCache.get_key_prefix(self._lg_version, get_dict_hash(dict_path), lgp_cmd[2:],
+                                                         options)
+
+            if persistent_parser or cache_prefix is not None:
+                ret_metrics, ret_quality = self._parse_persistent(sentences, lgp_cmd, options, out_stream, ref_file,
+                                                                  progress, bar,
+                                                                  kwargs.get("process_timeout", 60), cache_prefix)
+            elif stream_output:
+                ret_metrics, ret_quality, err_stream = self._parse_streaming(sentences, lgp_cmd, options, out_stream,
+                                                                             ref_file, progress, bar)
+            else:
                 # Read pipes to get complete output returned by link-parser
-                raw_stream, err_stream = proc_pars.communicate()
-
-                # Check return code to make sure the process completed successfully.
-                if proc_pars.returncode != 0:
-                    raise ParserError(f"Process '{lgp_cmd[0]}' terminated with exit code: {proc_pars.returncode} "
-                                      f"and error message:\n'{err_stream.decode()}'.")
+                raw_stream, err_stream = self._run_batch(sentences, lgp_cmd)
 
                 # Take an action depending on the output format specified by 'options'
                 ret_metrics, ret_quality = self._handle_stream_output(raw_stream.decode("utf-8-sig"), options,
                                                                       out_stream, ref_file)
 
                 if progress is not None:
-                    progress.update(sentence_count)
+                    progress.update(sentences.count)
 
                 if bar is not None:
-                    bar.update(sentence_count)
+                    bar.update(sentences.count)
+
+            if progress is None and sentence_count is None:
+                self._logger.info(f"Number of sentences: {sentences.count}")
+
+            sentence_count = sentences.count
 
-                if not (options & BIT_OUTPUT) \
-                        and ret_metrics.sentences + ret_metrics.skipped_sentences != sentence_count:
+            if not (options & BIT_OUTPUT) \
+                    and ret_metrics.sentences + ret_metrics.skipped_sentences != sentence_count:
 
-                    path_len = len(corpus_path)
+                path_len = len(corpus_path)
 
-                    raise LGParseError("Number of sentences does not match. "
-                          "Read: {}, Parsed: {}, File: {}".format(sentence_count,
-                                                                  ret_metrics.sentences + ret_metrics.skipped_sentences,
-                                                                  corpus_path if path_len < 31
-                                                                                else "..." + corpus_path[path_len-27:]))
+                raise LGParseError("Number of sentences does not match. "
+                      "Read: {}, Parsed: {}, File: {}".format(sentence_count,
+                                                              ret_metrics.sentences + ret_metrics.skipped_sentences,
+                                                              corpus_path if path_len < 31
+                                                                            else "..." + corpus_path[path_len-27:]))
 
         except LGParseError:
-            self._logger.debug(err_stream.decode("utf-8-sig"))
+            if err_stream is not None:
+                self._logger.debug(err_stream.decode("utf-8-sig"))
 
-            with open(output_path + ".raw", "w") as r:
-                r.write(raw_stream.decode("utf-8-sig"))
+            # Raw output is not kept in streaming mode
+            if raw_stream is not None:
+                with open(output_path + ".raw", "w") as r:
+                    r.write(raw_stream.decode("utf-8-sig"))
 
-            with open(output_path + ".err", "w") as e:
-                e.write(err_stream.decode("utf-8-sig"))
+            if err_stream is not None:
+                with open(output_path + ".err", "w") as e:
+                    e.write(err_stream.decode("utf-8-sig"))
 
             raise
 
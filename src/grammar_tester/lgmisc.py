@@ -2,15 +2,24 @@ import re
 import os
 import shutil
 import logging
+import hashlib
 
 from ..common.optconst import *
 
 __all__ = ['get_output_suffix', 'print_output', 'LGParseError', 'LG_DICT_PATH', 'create_grammar_dir', 'get_dir_name',
-           'ParserError']
+           'ParserError', 'GRAMMAR_DIR_COPY', 'GRAMMAR_DIR_SYMLINK', 'GRAMMAR_DIR_HARDLINK']
 
 
 LG_DICT_PATH = "/usr/local/share/link-grammar"
 
+# Grammar directory provisioning modes
+GRAMMAR_DIR_COPY = "copy"
+GRAMMAR_DIR_SYMLINK = "symlink"
+GRAMMAR_DIR_HARDLINK = "hardlink"
+
+# File storing the key of the dictionary a linked grammar directory was provisioned with
+GRAMMAR_DIR_KEY_FILE = ".provision-key"
+
 LINK_1ST_TOKEN_INDEX = 0
 LINK_2ND_TOKEN_INDEX = 1
 
@@ -54,7 +63,64 @@ def get_dir_name(file_name: str) -> (str, str):
     return (None, None) if m is None else (m.group(4), m.group(3))
 
 
-def create_grammar_dir(dict_file_path: str, grammar_path: str, template_path: str, options: int) -> str:
+def _get_provision_key(dict_file_path: str, template_path: str, mode: str) -> str:
+    """ Return key identifying linked grammar directory content: dictionary file hash, template path and mode """
+    sha = hashlib.sha256()
+
+    with open(dict_file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha.update(chunk)
+
+    return "{}\t{}\t{}".format(sha.hexdigest(), os.path.realpath(template_path), mode)
+
+
+def _read_provision_key(dict_path: str) -> str:
+    try:
+        with open(dict_path + "/" + GRAMMAR_DIR_KEY_FILE, "r") as file:
+            return file.read()
+
+    except OSError:
+        return None
+
+
+def _link_template_dir(template_path: str, dict_path: str, skip_files: set, mode: str) -> None:
+    """
+    Create directory tree replicating template directory with files linked instead of copied.
+
+    :param template_path:   Template directory path.
+    :param dict_path:       Destination directory path.
+    :param skip_files:      Set of top level file names not to be linked.
+    :param mode:            GRAMMAR_DIR_SYMLINK or GRAMMAR_DIR_HARDLINK.
+    :return:                None
+    """
+    template_path = os.path.realpath(template_path)
+
+    for root, dirs, files in os.walk(template_path):
+        rel_dir = os.path.relpath(root, template_path)
+        dest_dir = dict_path if rel_dir == "." else os.path.join(dict_path, rel_dir)
+
+        os.makedirs(dest_dir, exist_ok=True)
+
+        for file_name in files:
+            if rel_dir == "." and file_name in skip_files:
+                continue
+
+            src_file, dest_file = os.path.join(root, file_name), os.path.join(dest_dir, file_name)
+
+            if mode == GRAMMAR_DIR_SYMLINK:
+                os.symlink(src_file, dest_file)
+                continue
+
+            try:
+                os.link(src_file, dest_file)
+
+            # Hard links can not cross file system boundaries
+            except OSError:
+                shutil.copy2(src_file, dest_file)
+
+
+def create_grammar_dir(dict_file_path: str, grammar_path: str, template_path: str, options: int,
+                       mode: str = GRAMMAR_DIR_COPY) -> str:
     """
     Create grammar directory using specified .dict file and other files from template directory.
 
@@ -62,9 +128,15 @@ def create_grammar_dir(dict_file_path: str, grammar_path: str, template_path: st
     :param grammar_path:    Path to a directory where newly created grammar should be stored.
     :param template_path:   Path to template directory or language name installed with LG.
     :param options:         Bit field that specifies multiple parsing options.
+    :param mode:            Provisioning mode. GRAMMAR_DIR_COPY copies the whole template directory.
+                            GRAMMAR_DIR_SYMLINK and GRAMMAR_DIR_HARDLINK link template files and write only the
+                            dictionary file. Directory provisioned in one of linked modes is reused as is if the
+                            dictionary file content and the template are unchanged.
     :return:                Path to newly created grammar directory.
-    :raises:                FileNotFoundError
+    :raises:                FileNotFoundError, ValueError
     """
+    if mode not in (GRAMMAR_DIR_COPY, GRAMMAR_DIR_SYMLINK, GRAMMAR_DIR_HARDLINK):
+        raise ValueError("Unknown grammar directory provisioning mode: '{}'".format(mode))
 
     if len(dict_file_path) == 0:
         raise FileNotFoundError("Dictionary file name should not be empty.")
@@ -111,25 +183,39 @@ def create_grammar_dir(dict_file_path: str, grammar_path: str, template_path: st
         raise FileNotFoundError("Template directory '{0}' does not appear to be a proper Link Grammar dictionary."
                                 .format(template_path))
 
+    dict_name = "dict.db" if dict_file_path.endswith("db") else "4.0.dict"
+    provision_key = None if mode == GRAMMAR_DIR_COPY else _get_provision_key(dict_file_path, template_path, mode)
+
     if os.path.isdir(dict_path):
         logger.info("Directory '" + dict_path + "' already exists.")
 
+        if provision_key is not None and _read_provision_key(dict_path) == provision_key:
+            logger.info("Directory '" + dict_path + "' is reused. Dictionary file content is unchanged.")
+            return dict_path
+
         if options & BIT_RM_DIR > 0:
             shutil.rmtree(dict_path, True)
             logger.info("Directory '" + dict_path + "' has been removed. Option '-r' was specified.")
 
     if not os.path.isdir(dict_path):
-        # Create dictionary directory using existing one as a template
-        shutil.copytree(template_path, dict_path)
+        if mode == GRAMMAR_DIR_COPY:
+            # Create dictionary directory using existing one as a template
+            shutil.copytree(template_path, dict_path)
+        else:
+            # Dictionary file is skipped so that template one is not overwritten through the link
+            _link_template_dir(template_path, dict_path, {dict_name}, mode)
+
         logger.info("Directory '" + dict_path + "' with template files has been created.")
 
         # Replace dictionary file with a new one
-        if dict_file_path.endswith("db"):
-            shutil.copy(dict_file_path, dict_path + "/dict.db")
-        else:
-            shutil.copy(dict_file_path, dict_path + "/4.0.dict")
+        shutil.copy(dict_file_path, dict_path + "/" + dict_name)
         logger.info("Dictionary file has been replaced with '" + dict_file_path + "'.")
 
+        # The key is written last so that partially provisioned directory is never reused
+        if provision_key is not None:
+            with open(dict_path + "/" + GRAMMAR_DIR_KEY_FILE, "w") as file:
+                file.write(provision_key)
+
     return dict_path
 
 
@@ -0,0 +1,278 @@
+import os
+import logging
+import shutil
+import tempfile
+import atexit
+import weakref
+from io import TextIOWrapper
+from queue import Queue, Empty
+from threading import Thread
+from typing import List
+from collections import OrderedDict
+from subprocess import PIPE, Popen
+
+from .lgmisc import ParserError
+
+__all__ = ['LGProcess', 'LGProcessPool', 'LGProcessError']
+
+
+class LGProcessError(ParserError):
+    pass
+
+
+class LGProcess:
+    """
+    Long-lived link-parser process. Sentences are sent to the process one by one over stdin. Each sentence
+        is followed by a command which response is used as end of sentence output marker.
+    """
+    def __init__(self, lgp_cmd: List[str], limit: int, timeout: float):
+        """
+        :param lgp_cmd:     link-parser command argument list.
+        :param limit:       Linkage limit value used in link-parser command line.
+        :param timeout:     Number of seconds to wait for link-parser response before the process is considered hung.
+        """
+        self._logger = logging.getLogger("LGProcess")
+        self._lgp_cmd = lgp_cmd
+        self._timeout = timeout
+        self._limit = limit
+        self._marker_cmd = f"!limit={limit}\n"
+        self._marker_resp = f"limit set to {limit}"
+        self._proc = None
+        self._err_file = None
+        self._queue = None
+        self.restarts = 0
+
+    @staticmethod
+    def _read_stdout(stream, queue: Queue) -> None:
+        """ Reader thread routine putting link-parser output lines into the queue """
+        for line in stream:
+            queue.put(line)
+
+        queue.put(None)
+
+    def _read_response(self, marker_resp: str = None) -> List[str]:
+        """
+        Read link-parser output until end of sentence marker is found.
+
+        :param marker_resp: Marker response text. Default one is used if None.
+        :return:            List of output lines without the marker.
+        :raises:            LGProcessError if the process terminated or did not respond in time.
+        """
+        marker_resp = self._marker_resp if marker_resp is None else marker_resp
+        lines = []
+
+        while True:
+            try:
+                line = self._queue.get(timeout=self._timeout)
+
+            except Empty:
+                raise LGProcessError(f"link-parser did not respond in {self._timeout} seconds.")
+
+            if line is None:
+                raise LGProcessError(f"link-parser terminated with exit code: {self._proc.wait()}")
+
+            line_text = line.rstrip("\n")
+
+            if line_text == marker_resp:
+                return lines
+
+            # Skip marker command if echoed
+            if line_text.startswith("!limit="):
+                continue
+
+            lines.append(line)
+
+    def _send(self, text: str) -> None:
+        try:
+            self._proc.stdin.write(text.encode("utf-8", "surrogateescape"))
+            self._proc.stdin.flush()
+
+        except (BrokenPipeError, OSError) as err:
+            raise LGProcessError(f"Unable to write to link-parser input: {err}")
+
+    def start(self) -> List[str]:
+        """
+        Start link-parser process and wait for it to become ready.
+
+        :return:            Lines printed by link-parser on startup.
+        :raises:            LGProcessError if the process is not responding.
+        """
+        self.close()
+
+        # Make sure link-parser output is not held in stdio buffer while it is waiting for the next sentence
+        cmd = ["stdbuf", "-oL"] + self._lgp_cmd if shutil.which("stdbuf") is not None else self._lgp_cmd
+
+        self._err_file = tempfile.TemporaryFile()
+        self._proc = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=self._err_file)
+        self._queue = Queue()
+
+        stdout = TextIOWrapper(self._proc.stdout, encoding="utf-8", newline="\n")
+
+        Thread(target=self._read_stdout, args=(stdout, self._queue), daemon=True).start()
+
+        try:
+            # Command line options are echoed the same way as marker command response, so the limit is changed
+            #   to some other value first to make sure startup output is over, then it is set back.
+            self._send(f"!limit={self._limit + 1}\n" + self._marker_cmd)
+
+            lines = self._read_response(f"limit set to {self._limit + 1}")
+            self._read_response()
+
+            return lines
+
+        except LGProcessError as err:
+            raise LGProcessError(f"{err}\n'{self.error_text()}'")
+
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def error_text(self) -> str:
+        """ Return text written by link-parser to stderr """
+        if self._err_file is None:
+            return ""
+
+        self._err_file.seek(0)
+        return self._err_file.read().decode("utf-8", errors="replace")
+
+    def parse(self, sentence: str) -> List[str]:
+        """
+        Parse single sentence.
+
+        :param sentence:    Sentence text.
+        :return:            List of link-parser output lines for the sentence.
+        :raises:            LGProcessError if the process terminated or did not respond in time.
+        """
+        if not self.is_alive():
+            self.start()
+
+        self._send(sentence.rstrip("\n") + "\n" + self._marker_cmd)
+
+        return self._read_response()
+
+    def close(self) -> None:
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+
+            self._proc.wait()
+
+            for stream in (self._proc.stdin, self._proc.stdout):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+            self._proc = None
+
+        if self._err_file is not None:
+            self._err_file.close()
+            self._err_file = None
+
+
+# Pools still open at interpreter exit. Weak references do not keep closed or abandoned pools alive.
+_open_pools = weakref.WeakSet()
+
+
+@atexit.register
+def _close_pools() -> None:
+    """ Terminate link-parser processes of all pools at interpreter exit """
+    for pool in list(_open_pools):
+        pool.close()
+
+
+class LGProcessPool:
+    """
+    Pool of long-lived link-parser processes keyed by link-parser command line, which includes dictionary path.
+        Processes are restarted if terminated or hung. Least recently used process is terminated if the number
+        of processes exceeds the limit.
+    """
+    MAX_RESTARTS = 3
+
+    def __init__(self, timeout: float = 60, max_processes: int = 4):
+        """
+        :param timeout:         Number of seconds to wait for link-parser response before the process is restarted.
+        :param max_processes:   Maximum number of processes kept running.
+        """
+        self._logger = logging.getLogger("LGProcessPool")
+        self._timeout = timeout
+        self._max_processes = max_processes
+        self._processes = OrderedDict()
+        self._pid = os.getpid()
+
+        _open_pools.add(self)
+
+    def __getstate__(self):
+        # Processes are not shared with other Python processes, each one starts its own
+        return {"_timeout": self._timeout, "_max_processes": self._max_processes}
+
+    def __setstate__(self, state):
+        self.__init__(state["_timeout"], state["_max_processes"])
+
+    def get(self, lgp_cmd: List[str], limit: int) -> LGProcess:
+        """
+        Return running link-parser process for specified command line starting a new one if necessary.
+
+        :param lgp_cmd:     link-parser command argument list.
+        :param limit:       Linkage limit value used in link-parser command line.
+        :return:            LGProcess instance.
+        """
+        # Processes inherited from the parent by forked child are not touched, the child starts its own ones
+        if self._pid != os.getpid():
+            self._processes = OrderedDict()
+            self._pid = os.getpid()
+
+        key = tuple(lgp_cmd)
+        proc = self._processes.get(key, None)
+
+        if proc is None:
+            proc = LGProcess(lgp_cmd, limit, self._timeout)
+            self._processes[key] = proc
+
+            while len(self._processes) > self._max_processes:
+                _, old_proc = self._processes.popitem(last=False)
+                old_proc.close()
+
+        else:
+            self._processes.move_to_end(key)
+
+        if not proc.is_alive():
+            proc.start()
+
+        return proc
+
+    def parse(self, proc: LGProcess, sentence: str) -> List[str]:
+        """
+        Parse single sentence restarting link-parser process if it fails.
+
+        :param proc:        LGProcess instance returned by get().
+        :param sentence:    Sentence text.
+        :return:            List of link-parser output lines or None if the sentence could not be parsed.
+        :raises:            LGProcessError if the process keeps failing.
+        """
+        try:
+            lines = proc.parse(sentence)
+            proc.restarts = 0
+            return lines
+
+        except LGProcessError as err:
+            self._logger.warning(f"{err} Restarting link-parser while parsing: '{sentence.strip()}'")
+
+            proc.restarts += 1
+
+            if proc.restarts > LGProcessPool.MAX_RESTARTS:
+                raise LGProcessError(f"link-parser failed {proc.restarts} times in a row. Last error: {err}\n"
+                                     f"'{proc.error_text()}'")
+
+            proc.start()
+
+            return None
+
+    def close(self) -> None:
+        """ Terminate all processes in the pool """
+        if self._pid != os.getpid():
+            return
+
+        for proc in self._processes.values():
+            proc.close()
+
+        self._processes.clear()
@@ -1,7 +1,20 @@
 from subprocess import PIPE, Popen
 from typing import Tuple, Optional
+from threading import Lock
 import os
 import re
+import json
+import shutil
+import tempfile
+
+# On-disk cache of link-parser version detection results
+LG_VERSION_CACHE_FILE = os.environ.get("LG_VERSION_CACHE_FILE",
+                                       os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                                                    "language-learning", "lg-version.json"))
+
+# Process-wide cache: {(<binary real path>, <mtime ns>, <size>): (<version>, <dictionary path>)}
+_version_cache = {}
+_version_lock = Lock()
 
 
 class LGVersionParseError(Exception):
@@ -45,15 +58,56 @@ def handle_version_response(text: str) -> Tuple[str, str]:
     return ver, pth
 
 
-def get_lg_version() -> (str, str):
+def _get_binary_key(binary_path: str) -> Optional[Tuple[str, int, int]]:
     """
-    Get Link Grammar version and preinstalled dictionary path
+    Return tuple identifying link-parser binary build or None if the binary is not found
 
-    :return:    Tuple: (<version string>, <dictionary path>)
+    :param binary_path: link-parser executable path
+    :return:            Tuple (<real path>, <modification time in ns>, <size>)
     """
+    try:
+        real_path = os.path.realpath(binary_path)
+        stat = os.stat(real_path)
+        return real_path, stat.st_mtime_ns, stat.st_size
+
+    except OSError:
+        return None
+
+
+def _load_version_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, "r") as file:
+            cache = json.load(file)
+
+        return cache if isinstance(cache, dict) else {}
+
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_version_cache(cache_path: str, cache: dict) -> None:
+    """ Atomically replace on-disk version cache. Cache is an optimization so failure to write is ignored. """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(cache, file, indent=2)
+
+            os.replace(tmp_path, cache_path)
+
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    except OSError:
+        pass
 
-    version, dict_path = None, None
 
+def _run_lg_version() -> Tuple[str, str]:
+    """ Spawn 'link-parser --version' and parse its output """
     try:
 
         with Popen(["link-parser", "--version"], stdout=PIPE, stderr=PIPE) as proc_pars:
@@ -68,7 +122,7 @@ def get_lg_version() -> (str, str):
                                                                     proc_pars.returncode, err.decode()))
 
             # Take an action depending on the output format specified by 'options'
-            version, dict_path = handle_version_response(raw.decode("utf-8-sig"))
+            return handle_version_response(raw.decode("utf-8-sig"))
 
     except LGVersionParseError as err:
         print("get_lg_version(): " + str(err))
@@ -82,7 +136,60 @@ def get_lg_version() -> (str, str):
         print("get_lg_version(): Exception: " + str(type(err)) + str(err))
         raise
 
-    return version, dict_path
+
+def get_lg_version(cache_path: Optional[str] = None) -> (str, str):
+    """
+    Get Link Grammar version and preinstalled dictionary path
+
+    The result is cached both in memory and on disk keyed by link-parser binary path, modification time and
+        size, so 'link-parser --version' is spawned only once per binary build.
+
+    :param cache_path:  On-disk cache file path. LG_VERSION_CACHE_FILE is used if None, empty string disables
+                        on-disk caching.
+    :return:            Tuple: (<version string>, <dictionary path>)
+    """
+    binary_path = shutil.which("link-parser")
+    binary_key = None if binary_path is None else _get_binary_key(binary_path)
+
+    # Nothing to key the cache by, let link-parser spawn report the problem
+    if binary_key is None:
+        return _run_lg_version()
+
+    with _version_lock:
+        version_info = _version_cache.get(binary_key, None)
+
+    if version_info is not None:
+        return version_info
+
+    cache_path = LG_VERSION_CACHE_FILE if cache_path is None else cache_path
+    real_path, mtime, size = binary_key
+
+    if cache_path:
+        entry = _load_version_cache(cache_path).get(real_path, None)
+
+        if isinstance(entry, dict) and entry.get("mtime") == mtime and entry.get("size") == size:
+            version_info = entry.get("version"), entry.get("dict_path")
+
+    if version_info is None:
+        version_info = _run_lg_version()
+
+        if cache_path:
+            # Reload to keep entries possibly written by other processes in the meantime
+            cache = _load_version_cache(cache_path)
+            cache[real_path] = {"mtime": mtime, "size": size,
+                                "version": version_info[0], "dict_path": version_info[1]}
+            _save_version_cache(cache_path, cache)
+
+    with _version_lock:
+        _version_cache[binary_key] = version_info
+
+    return version_info
+
+
+def clear_lg_version_cache() -> None:
+    """ Clear process-wide Link Grammar version cache """
+    with _version_lock:
+        _version_cache.clear()
 
 
 # def get_lg_dict_version(dict_path: str) -> str:
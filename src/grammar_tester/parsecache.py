@@ -0,0 +1,184 @@
+import os
+import json
+import sqlite3
+import hashlib
+from typing import List, Optional
+
+__all__ = ['ParseCache', 'get_dict_hash']
+
+
+def get_dict_hash(dict_path: str) -> str:
+    """
+    Calculate dictionary content hash. If the path is a directory all regular non-hidden files in it are hashed
+        (the dictionary itself, affix, regex and knowledge files). If the path does not exist it is considered
+        to be a name of preinstalled LG dictionary such as 'en' and the name itself is hashed.
+
+    :param dict_path:   Dictionary file or directory path or LG dictionary name.
+    :return:            Hexadecimal digest string.
+    """
+    hasher = hashlib.sha256()
+
+    if os.path.isdir(dict_path):
+        for name in sorted(os.listdir(dict_path)):
+            file_path = os.path.join(dict_path, name)
+
+            if name.startswith(".") or not os.path.isfile(file_path):
+                continue
+
+            hasher.update(name.encode("utf-8") + b"\0")
+
+            with open(file_path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    hasher.update(chunk)
+
+            hasher.update(b"\0")
+
+    elif os.path.isfile(dict_path):
+        with open(dict_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                hasher.update(chunk)
+
+    else:
+        hasher.update(b"name:" + dict_path.encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of link-parser output lines for single sentences stored in SQLite database. The same database
+        can be shared by several processes: it is opened in WAL mode and each sentence is committed as soon as
+        it is stored so that concurrent writers are never locked out for long. Cache is an optimization so any database error
+        is ignored: lookup is counted as a miss and the result is not stored. Parse results are keyed by sha256
+        digest of dictionary content hash, link-parser arguments (linkage limit, timeout, output format),
+        options bitmask and sentence text.
+    """
+    LOCK_TIMEOUT = 60
+
+    def __init__(self, path: str):
+        """
+        :param path:        Database file path. The file is created if it does not exist.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Database connection is not shared with other Python processes, each one opens its own
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _get_conn(self) -> sqlite3.Connection:
+        # Connection inherited from the parent by forked child is not used
+        if self._conn is None or self._pid != os.getpid():
+            dir_path = os.path.dirname(self.path)
+
+            if dir_path and not os.path.isdir(dir_path):
+                os.makedirs(dir_path, exist_ok=True)
+
+            self._conn = None
+            self._pid = os.getpid()
+
+            conn = sqlite3.connect(self.path, timeout=ParseCache.LOCK_TIMEOUT)
+
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, lines TEXT NOT NULL)")
+                conn.commit()
+            except sqlite3.OperationalError:
+                conn.close()
+                raise
+
+            self._conn = conn
+
+        return self._conn
+
+    @staticmethod
+    def get_key_prefix(*args):
+        """
+        Return hash object fed with key components common for all sentences of a corpus file.
+            It is passed to get_key() along with each sentence.
+
+        :param args:        JSON serializable key components such as dictionary hash, link-parser
+                            arguments and options.
+        :return:            Hash object.
+        """
+        return hashlib.sha256(json.dumps(args).encode("utf-8") + b"\0")
+
+    @staticmethod
+    def get_key(prefix, sentence: str) -> str:
+        """
+        Return cache key for the sentence.
+
+        :param prefix:      Hash object returned by get_key_prefix().
+        :param sentence:    Sentence text as it is sent to link-parser.
+        :return:            Key string.
+        """
+        hasher = prefix.copy()
+        hasher.update(sentence.rstrip("\n").encode("utf-8", "surrogateescape"))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Return cached link-parser output lines for the key updating hit/miss statistics.
+
+        :param key:         Key returned by get_key().
+        :return:            List of output lines or None if the key is not found.
+        """
+        try:
+            row = self._get_conn().execute("SELECT lines FROM parses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, lines: List[str]) -> None:
+        """
+        Store and commit link-parser output lines. If the database is locked or can not be written
+            the lines are not stored.
+
+        :param key:         Key returned by get_key().
+        :param lines:       Output lines.
+        :return:            None
+        """
+        try:
+            conn = self._get_conn()
+            conn.execute("INSERT OR REPLACE INTO parses (key, lines) VALUES (?, ?)",
+                         (key, json.dumps(lines, ensure_ascii=False)))
+            conn.commit()
+        except sqlite3.OperationalError:
+            self._rollback()
+
+    def _rollback(self) -> None:
+        """ Drop uncommitted changes releasing the write lock """
+        if self._conn is not None and self._pid == os.getpid():
+            try:
+                self._conn.rollback()
+            except sqlite3.OperationalError:
+                pass
+
+    def flush(self) -> None:
+        """ Commit pending changes if any """
+        if self._conn is not None and self._pid == os.getpid() and self._conn.in_transaction:
+            try:
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._rollback()
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self.flush()
+            self._conn.close()
+
+        self._conn = None
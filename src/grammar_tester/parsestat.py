@@ -1,6 +1,6 @@
 import logging
 from decimal import *
-from ..common.parsemetrics import ParseQuality, ParseMetrics
+from ..common.parsemetrics import ParseQuality, ParseMetrics, FastParseQuality, FastParseMetrics
 
 """
     Statistics estimation set of functions
@@ -64,14 +64,15 @@ def calc_parse_quality(test_set: set, ref_set: set) -> (int, int, Decimal):
     return 0, 0, Decimal("0.0")
 
 
-def parse_metrics(tokens: list) -> ParseMetrics:
+def parse_metrics(tokens: list, fast: bool = False) -> ParseMetrics:
     """
     Calculate percentage of successfully linked tokens. Token in square brackets considered to be unlinked.
 
     :param tokens:      List of tokens.
+    :param fast:        FastParseMetrics instance is returned if True.
     :return:            ParseMetrics
     """
-    pm = ParseMetrics()
+    pm = FastParseMetrics() if fast else ParseMetrics()
 
     total = len(tokens)
 
@@ -88,6 +89,12 @@ def parse_metrics(tokens: list) -> ParseMetrics:
         if token.startswith("["):
             unlinked += 1
 
+    if fast:
+        pm.average_parsed_ratio = (total - unlinked) / total
+        pm.completely_parsed_ratio = 1.0 if unlinked == 0 else 0.0
+        pm.completely_unparsed_ratio = 1.0 if total == unlinked else 0.0
+        return pm
+
     if unlinked == 0:
         pm.completely_parsed_ratio = Decimal("1.0")
         pm.average_parsed_ratio = Decimal("1.0")
@@ -138,14 +145,18 @@ def parse_metrics(tokens: list) -> ParseMetrics:
 #     return pm
 
 
-def parse_quality(test_set: set, ref_set: set) -> ParseQuality:
+def parse_quality(test_set: set, ref_set: set, fast: bool = False) -> ParseQuality:
     """
     Calculate parse quality
 
     :param test_set:    Set of links being tested.
     :param ref_set:     Reference set of links
+    :param fast:        FastParseQuality instance is returned if True.
     :return:            ParseQuality instance filled with calculated values.
     """
+    if fast:
+        return _fast_parse_quality(test_set, ref_set)
+
     # logger = logging.getLogger(__name__ + ".parse_quality")
     #
     # logger.debug(f"tst_set={ref_set}")
@@ -173,3 +184,26 @@ def parse_quality(test_set: set, ref_set: set) -> ParseQuality:
     pq.precision = overlapped / obtained if len_test > 0 else Decimal("0.00")
 
     return pq
+
+
+def _fast_parse_quality(test_set: set, ref_set: set) -> FastParseQuality:
+    """ parse_quality() counterpart using native numeric types """
+    pq = FastParseQuality()
+
+    pq.sentences = 1
+
+    len_ref = len(ref_set)
+    len_test = len(test_set)
+
+    overlapped = len(test_set & ref_set)
+
+    if len_ref > 0:
+        pq.total = len_ref
+        pq.missing = len_ref - overlapped
+        pq.extra = len_test - overlapped
+
+        pq.quality = pq.recall = overlapped / len_ref
+
+    pq.precision = overlapped / len_test if len_test > 0 else 0.0
+
+    return pq
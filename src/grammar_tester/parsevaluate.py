@@ -13,6 +13,7 @@ from ..common.optconst import *
 from ..common.absclient import AbstractPipelineComponent
 from ..common.cliutils import handle_path_string
 from ..common.tokencount import unbox_tokens
+from ..common.ullcorpus import is_ull_binary, load_ull_binary
 from .parsestat import parse_quality
 from .psparse import parse_postscript, get_link_set, prepare_tokens
 from .lgmisc import print_output, get_output_suffix
@@ -92,6 +93,10 @@ def extract_parses(data) -> List[Tuple[str, set]]:
 
 def load_parses(file_name: str) -> List[Tuple[str, set]]:
 
+    # Binary ULL corpus holds already parsed sentences and links
+    if is_ull_binary(file_name):
+        return load_ull_binary(file_name).parses()
+
     with open(file_name, "r", encoding="utf-8-sig") as file:
         data = file.read()
 
@@ -12,10 +12,15 @@ from decimal import Decimal
 
 __all__ = ['strip_token', 'parse_tokens', 'parse_links', 'parse_postscript', 'skip_lines', 'trim_garbage',
            'get_link_set', 'prepare_tokens', 'skip_command_response', 'skip_linkage_header', 'split_ps_parses',
-           'get_sentence_text', 'get_linkage_cost', 'PS_TIMEOUT_EXPIRED', 'PS_PANIC_DETECTED']
+           'get_sentence_text', 'get_linkage_cost', 'PS_TIMEOUT_EXPIRED', 'PS_PANIC_DETECTED',
+           'fast_parse_tokens', 'fast_parse_postscript']
 
 __version__ = "1.0.0"
 
+# Precompiled postscript patterns
+_ps_pattern = re.compile(r'\[(\(.+?\)+?)\]\[(.*?)\]\[0\]', re.S)
+_link_pattern = re.compile(r'(\d+)\s(\d+)\s\d+\s\(.+\)')
+
 
 def strip_token(token) -> str:
     """
@@ -201,10 +206,8 @@ def parse_links(txt: str, tokens: list, offset: int) -> list:
     start_pos = 1
     end_pos = txt.find("]")
 
-    q = re.compile('(\d+)\s(\d+)\s\d+\s\(.+\)')
-
     while end_pos - start_pos > 0:
-        mm = q.match(txt[start_pos:end_pos:])
+        mm = _link_pattern.match(txt[start_pos:end_pos:])
 
         if mm is not None:
             index1, index2 = int(mm.group(1))+offset, int(mm.group(2))+offset
@@ -226,9 +229,7 @@ def parse_postscript(text: str, options: int) -> ([], []):
     :param options      Bit mask, representing different parsing options. See `optconst.py` for details.
     :return:            Tuple of two lists: (tokens, links).
     """
-    p = re.compile('\[(\(.+?\)+?)\]\[(.*?)\]\[0\]', re.S)
-
-    m = p.match(text.replace("\n", ""))
+    m = _ps_pattern.match(text.replace("\n", ""))
 
     if m is not None:
         tokens, offset = parse_tokens(m.group(1), options)
@@ -239,6 +240,87 @@ def parse_postscript(text: str, options: int) -> ([], []):
     raise LGParseError(f"parse_postscript(): regex does not match for:\n{text}")
 
 
+def fast_parse_tokens(txt: str, opt: int) -> (list, int):
+    """
+    Faster counterpart of parse_tokens(). The token string is split at once instead of being scanned token by token.
+        Token strings with empty tokens, which parse_tokens() treats in a special way, are passed to parse_tokens().
+
+    :param txt:         String token line extracted from postfix notation output string.
+    :param opt:         Bit mask option value.
+    :return:            Tuple (<list of tokens>, <offset>), the same as parse_tokens() returns.
+    """
+    raw_tokens = txt[1:-1].split(")(")
+
+    if "" in raw_tokens:
+        return parse_tokens(txt, opt)
+
+    strip = opt & BIT_STRIP == BIT_STRIP
+    lower = opt & BIT_CAPS == 0
+
+    tokens = []
+    append = tokens.append
+    offset = 0
+    first = True
+
+    for token in raw_tokens:
+
+        # Strip LG suffixes if the option is set.
+        if strip and token[0] != "[":
+            pos = token.find("[")
+
+            if pos < 0:
+                pos = token.find(".", 1 if token[0] == "." else 0)
+
+            if pos > 0:
+                token = token[:pos]
+
+        # All walls are supplied with leading and trailing hashes as agreed for the project.
+        if token.find("-WALL") > 0:
+            if token == "RIGHT-WALL" or token == "LEFT-WALL":
+                append("###" + token + "###")
+
+            elif token == "[RIGHT-WALL]" or token == "[LEFT-WALL]":
+                append("###" + token[1:-1] + "###")
+
+        else:
+            # LEFT-WALL is added if the first token is not a wall, see parse_tokens()
+            if first:
+                append("###LEFT-WALL###")
+                offset = 1
+
+            append(token.lower() if lower else token)
+
+        first = False
+
+    return tokens, offset
+
+
+def fast_parse_postscript(text: str, options: int) -> ([], []):
+    """
+    Faster counterpart of parse_postscript() returning the same tokens and links. Token and link strings are
+        located with str.find() instead of the regular expression used by parse_postscript() and tokens are
+        parsed by fast_parse_tokens().
+
+    :param text:        Text string returned by Linkage.postscript() method.
+    :param options      Bit mask, representing different parsing options. See `optconst.py` for details.
+    :return:            Tuple of two lists: (tokens, links).
+    """
+    if "\n" in text:
+        text = text.replace("\n", "")
+
+    # Same as matching '\[(\(.+?\)+?)\]\[(.*?)\]\[0\]'
+    tok_end = text.find(")][", 3) if text.startswith("[(") else -1
+    lnk_end = text.find("][0]", tok_end + 3) if tok_end >= 0 else -1
+
+    if lnk_end >= 0:
+        tokens, offset = fast_parse_tokens(text[1:tok_end + 1], options)
+        links = parse_links(text[tok_end + 3:lnk_end], tokens, offset)
+
+        return tokens, links
+
+    raise LGParseError(f"parse_postscript(): regex does not match for:\n{text}")
+
+
 def get_link_set(tokens: list, links: Union[list, set], options: int) -> set:
     """
     Create link set from link list filtering out unnecessary links according to options bit flags.
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.metrics import silhouette_score
+
+from src.grammar_learner.clustering import kmeans_search, kmeans_seeds, kmeans_options, number_of_clusters, \
+    best_clusters, sampled_silhouette, clusters_silhouette
+
+
+class ClusteringTestCase(unittest.TestCase):
+
+    @staticmethod
+    def vectors(n_clusters=6, size=40, dim=8):
+        rs = np.random.RandomState(1)
+        centers = rs.randn(n_clusters, dim) * 10
+        m = np.vstack([c + rs.randn(size, dim) for c in centers])
+        vdf = pd.DataFrame(m, columns=list(range(1, dim + 1)))
+        vdf.insert(0, 'word', list(range(len(m))))
+        return vdf
+
+    def test_sampled_silhouette(self):
+        vdf = self.vectors()
+        m, labels = vdf[list(vdf)[1:]].values, np.arange(len(vdf)) // 40
+
+        self.assertEqual(silhouette_score(m, labels), sampled_silhouette(m, labels, sample=len(m)))
+        self.assertEqual(sampled_silhouette(m, labels, sample=(50, 1)), sampled_silhouette(m, labels, sample=(50, 1)))
+        self.assertAlmostEqual(silhouette_score(m, labels), sampled_silhouette(m, labels, sample=100), delta=0.05)
+
+    def test_best_clusters_sample(self):
+        vdf = self.vectors()
+        kwargs = {'cluster_range': (2, 10, 1, 1), 'cluster_seed': 3}
+        exact_clusters, exact_silhouette, exact_inertia = best_clusters(vdf, **kwargs)
+        clusters, silhouette, inertia = best_clusters(vdf, silhouette_sample=60, **kwargs)
+
+        # Sampled silhouette for selection, exact silhouette of the best clustering
+        self.assertEqual(len(exact_clusters), len(clusters))
+        self.assertEqual(clusters_silhouette(vdf, clusters), silhouette)
+        self.assertAlmostEqual(exact_silhouette, silhouette)
+
+    def test_kmeans_search_jobs(self):
+        vdf = self.vectors()
+        candidates = [(0, k, seed) for k, seed in zip(range(2, 10), kmeans_seeds(8, 5))]
+        fits = kmeans_search(vdf, candidates, jobs=1)
+        parallel_fits = kmeans_search(vdf, candidates, jobs=3)
+
+        self.assertEqual([x[:2] for x in fits], [x[:2] for x in parallel_fits])
+        self.assertEqual([x[3] for x in fits], [x[3] for x in parallel_fits])
+
+    def test_kmeans_search_plateau(self):
+        vdf = self.vectors()
+        candidates = [(run, k, 0) for run in range(2) for k in range(2, 12)]
+
+        for jobs in (1, 2):
+            fits = kmeans_search(vdf, candidates, jobs=jobs, patience=2, tolerance=1.0)
+            # Each run stops after the first fit and 2 more without silhouette gain
+            self.assertEqual([(0, 2), (0, 3), (0, 4), (1, 2), (1, 3), (1, 4)], [x[:2] for x in fits])
+
+    def test_kmeans_options(self):
+        self.assertEqual(('k-means++', 10, None), kmeans_options('kmeans'))
+        self.assertEqual(('random', 5, None), kmeans_options(['kmeans', 'random', 5]))
+        self.assertEqual(('k-means++', 10, 1024), kmeans_options('minibatch'))
+        self.assertEqual(('warm', 3, 256), kmeans_options(('minibatch', 'warm', 3, 256)))
+
+    def test_kmeans_search_warm(self):
+        vdf = self.vectors()
+        candidates = [(run, k, seed) for run in range(2) for k, seed in zip(range(2, 9), kmeans_seeds(7, run))]
+
+        for batch_size in (None, 64):
+            fits = kmeans_search(vdf, candidates, 'warm', batch_size=batch_size)
+            parallel_fits = kmeans_search(vdf, candidates, 'warm', jobs=2, batch_size=batch_size)
+
+            self.assertEqual([x[:2] for x in candidates], [x[:2] for x in fits])
+            self.assertEqual([x[3] for x in fits], [x[3] for x in parallel_fits])
+            # 6 well separated clusters are found starting from 5
+            self.assertEqual(6, max(fits[:7], key=lambda x: x[3])[1])
+
+    def test_number_of_clusters(self):
+        vdf = self.vectors()
+        kwargs = {'cluster_range': (2, 10, 1, 2), 'cluster_seed': 3}
+
+        self.assertEqual(number_of_clusters(vdf, **kwargs),
+                         number_of_clusters(vdf, cluster_jobs=2, **kwargs))
+
+    def test_best_clusters(self):
+        vdf = self.vectors()
+        kwargs = {'cluster_range': (6, 6, 3), 'cluster_seed': 3}
+        clusters, silhouette, inertia = best_clusters(vdf, **kwargs)
+        parallel_clusters, parallel_silhouette, parallel_inertia = best_clusters(vdf, cluster_jobs=2, **kwargs)
+
+        self.assertEqual(silhouette, parallel_silhouette)
+        self.assertEqual(clusters['cluster_words'].tolist(), parallel_clusters['cluster_words'].tolist())
+
+    def test_best_clusters_warm(self):
+        vdf = self.vectors()
+
+        for clustering in (('kmeans', 'warm'), ('minibatch', 'warm', 10, 64)):
+            kwargs = {'clustering': clustering, 'cluster_range': (12, 3, 4), 'cluster_seed': 0}
+            clusters, silhouette, inertia = best_clusters(vdf, **kwargs)
+            self.assertEqual(6, len(clusters))
+
+
+if __name__ == '__main__':
+    unittest.main()
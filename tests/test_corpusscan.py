@@ -0,0 +1,66 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from src.common.optconst import *
+from src.common.corpusscan import *
+from src.common.sentencecount import get_corpus_sentence_count
+from src.common.tokencount import count_tokens
+
+
+class CorpusScanTestCase(unittest.TestCase):
+
+    corpus_dir = "tests/test-data/corpora/poc-english-multi"
+
+    def test_scan_corpus(self):
+        for options in (BIT_STRIP, BIT_STRIP | BIT_INPUT_TO_LCASE):
+            scan = scan_corpus(self.corpus_dir, options, False)
+
+            self.assertEqual(get_corpus_sentence_count(self.corpus_dir, options), scan.sentences)
+            self.assertEqual(count_tokens(self.corpus_dir, options), scan.token_counts)
+            self.assertEqual(sum(os.path.getsize(os.path.join(self.corpus_dir, name))
+                                 for name in os.listdir(self.corpus_dir)), scan.size)
+            self.assertEqual(len(os.listdir(self.corpus_dir)), len(scan.files))
+
+    def test_scan_corpus_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corpus_path = os.path.join(tmp_dir, "corpus")
+            shutil.copytree(self.corpus_dir, corpus_path)
+
+            cache_path = get_scan_cache_path(corpus_path)
+            self.assertEqual(os.path.join(tmp_dir, ".corpus" + CORPUS_SCAN_SUFFIX), cache_path)
+
+            scan1 = scan_corpus(corpus_path, BIT_STRIP)
+            self.assertTrue(os.path.isfile(cache_path))
+            self.assertEqual((0, len(scan1.files)), (scan1.hits, scan1.misses))
+
+            # Unchanged files are not read again
+            scan2 = scan_corpus(corpus_path, BIT_STRIP)
+            self.assertEqual((len(scan1.files), 0), (scan2.hits, scan2.misses))
+            self.assertEqual(scan1.sentences, scan2.sentences)
+            self.assertEqual(scan1.token_counts, scan2.token_counts)
+
+            # Options affecting corpus filtering have their own cache entries
+            scan3 = scan_corpus(corpus_path, BIT_STRIP | BIT_INPUT_TO_LCASE)
+            self.assertEqual((0, len(scan1.files)), (scan3.hits, scan3.misses))
+
+            # Modified file is scanned again
+            file_path = os.path.join(corpus_path, sorted(os.listdir(corpus_path))[0])
+
+            with open(file_path, "a") as file:
+                file.write("A dad is a human .\n")
+
+            scan4 = scan_corpus(corpus_path, BIT_STRIP)
+            self.assertEqual((len(scan1.files) - 1, 1), (scan4.hits, scan4.misses))
+            self.assertEqual(scan1.sentences + 1, scan4.sentences)
+            self.assertEqual(scan1.files[file_path].sentences + 1, scan4.files[file_path].sentences)
+
+            # Cache file is not treated as a corpus file
+            scan5 = scan_corpus(tmp_dir, BIT_STRIP)
+            self.assertEqual(scan4.sentences, scan5.sentences)
+            self.assertTrue(is_scan_cache_file(cache_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
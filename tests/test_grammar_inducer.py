@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from src.grammar_learner.grammar_inducer import add_disjuncts, fast_add_disjuncts, induce_grammar
+from src.grammar_learner.symbols import SymbolTable
+
+
+class GrammarInducerTestCase(unittest.TestCase):
+
+    @staticmethod
+    def categories(n_words, n_clusters, seed=0):
+        rs = np.random.RandomState(seed)
+        words = rs.randint(1, n_clusters + 1, n_words)
+        cats = {'cluster': [None] + ['C' + str(i) for i in range(1, n_clusters + 1)],
+                'words': [[]] + [[w for w in range(n_words) if words[w] == i] for i in range(1, n_clusters + 1)],
+                'parent': [0] * (n_clusters + 1), 'counts': [0] * (n_clusters + 1)}
+        cats['cluster'][3] = None   # skipped cluster
+        return cats
+
+    @staticmethod
+    def links(n_words, n_links, n_djs, seed=0):
+        rs = np.random.RandomState(seed)
+        df = pd.DataFrame({'word': rs.randint(0, n_words + 5, n_links),     # some words not clustered
+                           'link': rs.randint(0, n_djs, n_links),
+                           'count': rs.randint(1, 4, n_links)})
+        return df.groupby(['word', 'link'], as_index=False).sum()
+
+    def test_fast_add_disjuncts(self):
+        for n_words, n_clusters, n_links in ((30, 5, 100), (200, 40, 2000), (500, 120, 800)):
+            cats = self.categories(n_words, n_clusters)
+            links = self.links(n_words, n_links, 50)
+
+            self.assertEqual(add_disjuncts(cats, links), fast_add_disjuncts(cats, links))
+
+    def test_fast_add_disjuncts_strings(self):
+        cats = {'cluster': [None, 'A', 'B'], 'words': [[], ['a', 'b'], ['c']]}
+        links = pd.DataFrame({'word': ['a', 'b', 'c', 'd', 'a'], 'link': ['x-', 'x-', 'y+', 'y+', 'y+'],
+                              'count': [2, 1, 4, 1, 1]})
+        fat_cats = fast_add_disjuncts(cats, links)
+
+        self.assertEqual(add_disjuncts(cats, links), fat_cats)
+        self.assertEqual([[], ['x-', 'y+'], ['y+']], fat_cats['disjuncts'])
+        self.assertEqual([[], [3, 1], [4]], fat_cats['dj_counts'])
+        self.assertEqual([0, 4, 4], fat_cats['counts'])
+        self.assertNotIn('disjuncts', cats)
+
+    def test_induce_grammar_strings(self):
+        """ String categories without SymbolTable give the same rules as interned ones """
+        links = pd.DataFrame([['was', 'a- & b+', 2], ['a', 'was+', 1], ['b', 'was-', 3], ['b', 'a-', 1]],
+                             columns=['word', 'link', 'count'])
+        cats = {'cluster': [None, 'A', 'B'], 'words': [[], ['a', 'b'], ['was']], 'parent': [0, 0, 0]}
+        rules, log = induce_grammar(fast_add_disjuncts(cats, links))
+
+        symbols = SymbolTable()
+        id_links = symbols.intern_links(links)
+        id_cats = dict(cats, words=[[], [symbols.word_ids['a'], symbols.word_ids['b']], [symbols.word_ids['was']]])
+        id_rules, id_log = induce_grammar(fast_add_disjuncts(id_cats, id_links), symbols)
+
+        self.assertEqual([[], {(2,), (-2,), (-1,)}, {(-1, 1)}], rules['disjuncts'])
+        self.assertEqual(rules['disjuncts'], id_rules['disjuncts'])
+        self.assertEqual(log, id_log)
+
+
+if __name__ == '__main__':
+    unittest.main()
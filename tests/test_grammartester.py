@@ -194,6 +194,47 @@ class GrammarTesterTestCase(unittest.TestCase):
         self.assertEqual("2.46%", pm.parseability_str(pm).strip())
         self.assertEqual("90.91%", pm.completely_unparsed_str(pm).strip())
 
+    # @unittest.skip
+    def test_parseability_multi_file_parallel(self):
+        """ Test parallel corpus file parsing to produce the same results as the sequential one """
+        dict = handle_path_string("tests/test-data/dict/poc-turtle")
+        corp = handle_path_string("tests/test-data/corpora/poc-english-multi")
+        dest = handle_path_string("/var/tmp/test_parseability_multi_file_parallel")
+        self.create_path(dest)
+
+        pr = LGInprocParser()
+
+        gt = GrammarTester(grmr, tmpl, limit, pr)
+        pm1, pq1 = gt.test(dict, corp, dest, None, (opts | BIT_EXISTING_DICT))
+        pm2, pq2 = gt.test(dict, corp, dest, None, (opts | BIT_EXISTING_DICT), corpus_workers=4)
+
+        self.assertEqual(pm1, pm2)
+        self.assertEqual(pq1, pq2)
+        self.assertEqual(88, pm2.sentences)
+        self.assertEqual("2.46%", pm2.parseability_str(pm2).strip())
+
+    # @unittest.skip
+    def test_dict_dir_parallel(self):
+        """ Test parallel dictionary sweep to produce the same results as the sequential one """
+        dict = handle_path_string("tests/test-data/dict-files")
+        corp = handle_path_string("tests/test-data/corpora/poc-english/poc_english.txt")
+        grmr_root = handle_path_string("/var/tmp/test_dict_dir_parallel/dict")
+        dest = handle_path_string("/var/tmp/test_dict_dir_parallel")
+        self.create_path(grmr_root)
+
+        pr = LGInprocParser()
+
+        gt = GrammarTester(grmr_root, tmpl, limit, pr)
+        pm1, pq1 = gt.test(dict, corp, dest, None, opts)
+        pm2, pq2 = gt.test(dict, corp, dest, None, opts, dict_workers=3)
+
+        self.assertEqual(pm1, pm2)
+        self.assertEqual(pq1, pq2)
+        self.assertEqual(5, gt._total_dicts)
+
+        with open(dest + "/poc_english.txt.summary") as summary:
+            self.assertEqual(6, len(summary.readlines()))
+
 
     # @unittest.skip
     def test_parseability_coinsedence(self):
@@ -0,0 +1,131 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from unittest.mock import patch
+import pandas as pd
+
+from src.grammar_learner import hyperwords
+from src.grammar_learner.hyperwords import vectors_frame, save_vectors, load_vectors, pmisvd, epmisvd, \
+    vector_space_dim
+from src.grammar_learner.symbols import SymbolTable
+
+
+class HyperwordsTestCase(unittest.TestCase):
+
+    links = pd.DataFrame([[1, 1, 2], [1, 2, 1], [2, 1, 3], [3, 3, 1], [4, 3, 2], [4, 2, 1]],
+                         columns=['word', 'link', 'count'])
+
+    def test_vectors_frame(self):
+        iw, m = [3, 5, 8], np.arange(6, dtype=float).reshape(3, 2)
+        vdf = vectors_frame(iw, m)
+
+        self.assertEqual(['word', 1, 2], list(vdf))
+        self.assertEqual(iw, vdf['word'].tolist())
+        self.assertEqual(m.tolist(), vdf[[1, 2]].values.tolist())
+
+    def test_save_load_vectors(self):
+        iw, m = ['a', 'b'], np.array([[0.5, -1.0], [0.25, 2.0]])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            response = save_vectors(iw, m, os.path.join(tmp_dir, 'vectors'))
+            self.assertTrue(os.path.isfile(response['vectors_file']))
+            vdf = load_vectors(os.path.join(tmp_dir, 'vectors'))
+
+        self.assertEqual(iw, vdf['word'].tolist())
+        self.assertEqual(m.tolist(), vdf[[1, 2]].values.tolist())
+
+    def test_pmisvd_npy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = tmp_dir + '/'
+            vdf, sv, response = pmisvd(self.links, path, path, 2, save_files='npy')
+            saved = load_vectors(os.path.join(tmp_dir, 'vectors'))
+
+            self.assertEqual(os.path.join(tmp_dir, 'vectors.npy'), response['vectors_file'])
+            self.assertFalse(os.path.isfile(os.path.join(tmp_dir, 'vectors.txt')))
+
+        self.assertEqual([str(x) for x in vdf['word']], saved['word'].tolist())
+        self.assertEqual(vdf[list(vdf)[1:]].values.tolist(), saved[list(saved)[1:]].values.tolist())
+
+    def test_pmisvd_decoded_files(self):
+        """ Saved vectors list words, not SymbolTable ids """
+        links = pd.DataFrame([['a', 'a- & b+', 2], ['a', 'b+', 1], ['b', 'a- & b+', 3], ['c', 'c-', 1],
+                              ['d', 'c-', 2], ['d', 'b+', 1]], columns=['word', 'link', 'count'])
+        symbols = SymbolTable()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = tmp_dir + '/'
+            vdf, sv, response = pmisvd(symbols.intern_links(links), path, path, 2, save_files=True,
+                                       symbols=symbols)
+
+            with open(response['vectors_file']) as file:
+                words = [line.split()[0] for line in file]
+
+            with open(os.path.join(tmp_dir, 'pmi.contexts.vocab')) as file:
+                contexts = file.read()
+
+        self.assertEqual(['a', 'b', 'c', 'd'], words)
+        self.assertEqual(symbols.decode(vdf['word']), words)
+        self.assertIn('a- & b+', contexts)
+
+    @staticmethod
+    def random_links(n_words=30, n_contexts=20, seed=0):
+        rs = np.random.RandomState(seed)
+        counts = rs.poisson(1.0, (n_words, n_contexts)) * rs.randint(1, 5, (n_words, n_contexts))
+        rows, cols = np.nonzero(counts)
+        return pd.DataFrame({'word': ['w' + str(x).zfill(2) for x in rows],
+                             'link': ['c' + str(x).zfill(2) + '+' for x in cols],
+                             'count': counts[rows, cols]})
+
+    @staticmethod
+    def same_vectors(vdf1, vdf2):
+        # Singular vectors are defined up to sign
+        m1, m2 = vdf1[list(vdf1)[1:]].values.astype(float), vdf2[list(vdf2)[1:]].values.astype(float)
+        return vdf1['word'].tolist() == vdf2['word'].tolist() and m1.shape == m2.shape \
+            and np.allclose(np.abs(m1), np.abs(m2), atol=1e-6)
+
+    def test_pmisvd_in_memory(self):
+        """ In-memory PMI/SVD gives the same vectors as the file round-trip """
+        links = self.random_links()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = tmp_dir + '/'
+            vdf, sv, response = pmisvd(links, path, path, 10)
+            file_vdf, file_response = epmisvd(links, path, path, 10)
+
+        self.assertTrue(self.same_vectors(file_vdf, vdf))
+
+    def test_pmisvd_sv_min(self):
+        """ One SVD sliced to sv_min dimension gives the same vectors as two SVDs """
+        links = self.random_links()
+
+        for sv_min in (0.1, 0.3, 0.5):
+            dim = vector_space_dim(links, '', '', 15, sv_min)
+            vdf, sv, response = pmisvd(links, '', '', dim)
+            reused_vdf, reused_sv, response = pmisvd(links, '', '', 15, sv_min=sv_min)
+
+            self.assertEqual(dim, len(list(reused_vdf)) - 1)
+            self.assertTrue(self.same_vectors(vdf, reused_vdf))
+
+    def test_pmisvd_sorted(self):
+        """ Singular values returned out of order are sorted before slicing """
+        links = self.random_links()
+        truncated_svd = hyperwords.truncated_svd
+
+        def shuffled_svd(*args):
+            ut, s, vt = truncated_svd(*args)
+            order = np.random.RandomState(1).permutation(len(s))
+            return ut[order], s[order], vt[order]
+
+        with patch.object(hyperwords, 'truncated_svd', side_effect=shuffled_svd):
+            shuffled_vdf, shuffled_sv, response = pmisvd(links, '', '', 8, sv_min=0.3)
+
+        vdf, sv, response = pmisvd(links, '', '', 8, sv_min=0.3)
+
+        self.assertEqual(sorted(shuffled_sv, reverse=True), shuffled_sv)
+        self.assertEqual(sv, shuffled_sv)
+        self.assertTrue(self.same_vectors(vdf, shuffled_vdf))
+
+
+if __name__ == '__main__':
+    unittest.main()
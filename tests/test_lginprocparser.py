@@ -1,11 +1,14 @@
 import os
+import io
+import tempfile
 import unittest
 
 from src.common.optconst import *
 from src.common.textprogress import TextProgress
 from src.grammar_tester.lginprocparser import LGInprocParser
 from src.grammar_tester import load_parses
-from src.grammar_tester.lgmisc import LGParseError, get_dir_name
+from src.grammar_tester.lgmisc import LGParseError, get_dir_name, create_grammar_dir, GRAMMAR_DIR_SYMLINK, \
+    GRAMMAR_DIR_HARDLINK
 from src.common.tokencount import update_token_counts
 
 lg_post_output = """
@@ -339,6 +342,133 @@ class LGInprocParserTestCase(unittest.TestCase):
 
         self.assertEqual(229, len(sentenses))
 
+    def test_stream_ps_output(self):
+        """ Test streaming postscript parsing to produce the same sentences as batch parsing """
+        with open("tests/test-data/second-linkage-test/GCB-NQ.txt.raw") as file:
+            raw = file.read()
+
+        options = BIT_EXISTING_DICT | BIT_NO_LWALL | BIT_NO_PERIOD | BIT_STRIP
+
+        lg_parser = LGInprocParser()
+
+        for text in [raw, sharp_sign_linkage, explosion_no_linkages, merged_ps_parses]:
+            batch = [(s.text, s.linkages, s.valid) for s in lg_parser._parse_batch_ps_output(text, options)]
+            stream = [(s.text, s.linkages, s.valid) for s in
+                      lg_parser._parse_ps_blocks(lg_parser._iter_ps_blocks(io.StringIO(text)), options)]
+
+            self.assertEqual(batch, stream)
+
+    def test_parse_no_scan_cache(self):
+        """ Test parse() not to write corpus pre-scan cache files into corpus directory """
+        corpus_file_path = "tests/test-data/corpora/poc-turtle/poc-turtle.txt"
+        corpus_dir_files = sorted(os.listdir(os.path.split(corpus_file_path)[0]))
+        options = BIT_EXISTING_DICT | BIT_NO_LWALL | BIT_NO_PERIOD | BIT_STRIP
+
+        pr = LGInprocParser()
+
+        pm1, pq1 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path,
+                            f"{self.tmp_dir}/poc-turtle.txt.ull", None, options)
+        bar = TextProgress(total=12, desc="Overal progress")
+        pm2, pq2 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path,
+                            f"{self.tmp_dir}/poc-turtle.txt.ull", None, options, bar,
+                            sentence_counts={corpus_file_path: pm1.sentences + pm1.skipped_sentences})
+
+        self.assertEqual(pm1.sentences, pm2.sentences)
+        self.assertEqual(corpus_dir_files, sorted(os.listdir(os.path.split(corpus_file_path)[0])))
+
+    def test_parse_stream_output(self):
+        """ Test streaming mode to return the same metrics and output as the batch one """
+        corpus_file_path = "tests/test-data/corpora/poc-turtle/poc-turtle-dot-separated.txt"
+        options = BIT_EXISTING_DICT | BIT_NO_LWALL | BIT_NO_PERIOD | BIT_STRIP
+
+        pr = LGInprocParser()
+
+        batch_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.batch"
+        stream_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.stream"
+
+        pm1, pq1 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, batch_path, None, options)
+        pm2, pq2 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, stream_path, None, options,
+                            stream_output=True)
+
+        self.assertEqual(pm1, pm2)
+        self.assertEqual(pm1.sentences, pm2.sentences)
+
+        with open(batch_path) as batch_file, open(stream_path) as stream_file:
+            self.assertEqual(batch_file.read(), stream_file.read())
+
+    def test_parse_persistent_parser(self):
+        """ Test persistent link-parser process to return the same metrics and output as the regular one """
+        corpus_file_path = "tests/test-data/corpora/poc-turtle/poc-turtle-dot-separated.txt"
+        options = BIT_EXISTING_DICT | BIT_NO_LWALL | BIT_NO_PERIOD | BIT_STRIP
+
+        pr = LGInprocParser()
+
+        regular_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.regular"
+        persistent_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.persistent"
+
+        pm1, pq1 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, regular_path, None, options)
+
+        try:
+            # The second call should use the same link-parser process
+            for _ in range(2):
+                pm2, pq2 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, persistent_path, None,
+                                    options, persistent_parser=True)
+
+                self.assertEqual(pm1, pm2)
+                self.assertEqual(pm1.sentences, pm2.sentences)
+
+                with open(regular_path) as regular_file, open(persistent_path) as persistent_file:
+                    self.assertEqual(regular_file.read(), persistent_file.read())
+
+        finally:
+            pr.close()
+
+    def test_parse_cache(self):
+        """ Test parse cache to return the same metrics and output as the regular parser """
+        corpus_file_path = "tests/test-data/corpora/poc-turtle/poc-turtle-dot-separated.txt"
+        options = BIT_EXISTING_DICT | BIT_NO_LWALL | BIT_NO_PERIOD | BIT_STRIP
+
+        regular_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.regular"
+        cached_path = f"{self.tmp_dir}/{os.path.split(corpus_file_path)[1]}.cached"
+
+        pm1, pq1 = LGInprocParser().parse("tests/test-data/dict/poc-turtle", corpus_file_path, regular_path, None,
+                                          options)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = cache_dir + "/parse-cache.db"
+
+            # The first parser fills the cache, the second one should not start link-parser at all
+            for expected_hits, expected_misses in ((0, pm1.sentences), (pm1.sentences, 0)):
+                pr = LGInprocParser()
+
+                try:
+                    pm2, pq2 = pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, cached_path, None,
+                                        options, parse_cache=cache_path)
+
+                    self.assertEqual(pm1, pm2)
+                    self.assertEqual((expected_hits, expected_misses), pr.cache_stats)
+
+                    if not expected_misses:
+                        self.assertEqual(0, len(pr._proc_pool._processes))
+
+                    with open(regular_path) as regular_file, open(cached_path) as cached_file:
+                        self.assertEqual(regular_file.read(), cached_file.read())
+
+                finally:
+                    pr.close()
+
+            # Different options make different keys
+            pr = LGInprocParser()
+
+            try:
+                pr.parse("tests/test-data/dict/poc-turtle", corpus_file_path, cached_path, None,
+                         options | BIT_CAPS, parse_cache=cache_path)
+
+                self.assertEqual((0, pm1.sentences), pr.cache_stats)
+
+            finally:
+                pr.close()
+
     def test_get_dir_name(self):
         file_path = "/home/user/data/tests/GCB-FULL-GLGT-MWC[2..5]-2019-06-11/grammar/ALE500/MWC:2/abs/dict_500C_2019-06-11_0007.4.0.dict"
         # file_path = "/home/user/data/tests/GCB-FULL-GLGT-MWC-2019-06-11/grammar/ALE500/MWC2/abs/dict_500C_2019-06-11_0007.4.0.dict"
@@ -348,6 +478,45 @@ class LGInprocParserTestCase(unittest.TestCase):
         # self.assertEqual("/home/user/data/tests/GCB-FULL-GLGT-MWC[2..5]-2019-06-11/grammar/ALE500/MWC:2/abs", path)
         self.assertEqual("dict_500C_2019-06-11_0007", name)
 
+    def test_create_grammar_dir_linked(self):
+        template_path = "tests/test-data/dict/poc-turtle"
+        dict_file = "tests/test-data/dict-files/poc-turtle_8C_2018-03-14_0007.4.0.dict"
+        options = BIT_RM_DIR
+
+        with open(dict_file, "r") as file:
+            dict_text = file.read()
+
+        for mode in (GRAMMAR_DIR_SYMLINK, GRAMMAR_DIR_HARDLINK):
+            with tempfile.TemporaryDirectory() as grammar_root:
+                dict_path = create_grammar_dir(dict_file, grammar_root, template_path, options, mode)
+
+                self.assertEqual(grammar_root + "/poc-turtle_8C_2018-03-14_0007", dict_path)
+                self.assertEqual(sorted(os.listdir(template_path)),
+                                 sorted(f for f in os.listdir(dict_path) if f != ".provision-key"))
+
+                # Template files are linked, dictionary file is a copy
+                affix_path = dict_path + "/4.0.affix"
+                self.assertTrue(os.path.islink(affix_path) if mode == GRAMMAR_DIR_SYMLINK
+                                else os.path.samefile(affix_path, template_path + "/4.0.affix"))
+                self.assertFalse(os.path.islink(dict_path + "/4.0.dict"))
+                self.assertFalse(os.path.samefile(dict_path + "/4.0.dict", template_path + "/4.0.dict"))
+
+                with open(dict_path + "/4.0.dict", "r") as file:
+                    self.assertEqual(dict_text, file.read())
+
+                # Directory is reused even though BIT_RM_DIR is set
+                marker_path = dict_path + "/marker"
+                open(marker_path, "w").close()
+                create_grammar_dir(dict_file, grammar_root, template_path, options, mode)
+                self.assertTrue(os.path.isfile(marker_path))
+
+                # Directory is recreated if the dictionary content has changed
+                with open(dict_path + "/.provision-key", "w") as file:
+                    file.write("changed")
+
+                create_grammar_dir(dict_file, grammar_root, template_path, options, mode)
+                self.assertFalse(os.path.isfile(marker_path))
+
 
 if __name__ == '__main__':
     unittest.main()
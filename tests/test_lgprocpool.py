@@ -0,0 +1,27 @@
+import gc
+import pickle
+import weakref
+import unittest
+
+from src.grammar_tester.lgprocpool import LGProcessPool, _open_pools
+
+
+class LGProcessPoolTestCase(unittest.TestCase):
+
+    def test_pool_released(self):
+        """ Pools registered for closing at exit should not be kept alive until interpreter exit """
+        pool = LGProcessPool(10, 2)
+        copy = pickle.loads(pickle.dumps(pool))
+        refs = [weakref.ref(pool), weakref.ref(copy)]
+
+        self.assertIn(pool, _open_pools)
+        self.assertIn(copy, _open_pools)
+
+        del pool, copy
+        gc.collect()
+
+        self.assertEqual([None, None], [ref() for ref in refs])
+
+
+if __name__ == '__main__':
+    unittest.main()
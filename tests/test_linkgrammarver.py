@@ -1,5 +1,10 @@
 import unittest
-from src.grammar_tester.linkgrammarver import handle_version_response, get_lg_dict_version
+import os
+import stat
+import tempfile
+from unittest import mock
+from src.grammar_tester.linkgrammarver import handle_version_response, get_lg_dict_version, get_lg_version, \
+    clear_lg_version_cache
 
 text = 'link-grammar-5.5.1 Compiled with: gcc __VERSION__="7.2.0"  OS: linux-gnu __unix__  ' \
        'Standards: __STDC_VERSION__=201112L Configuration (source code): 	CPPFLAGS= 	' \
@@ -26,6 +31,46 @@ class LGVersionTestCase(unittest.TestCase):
     def test_get_lg_dict_version(self):
         self.assertEqual("5.5.0", get_lg_dict_version("tests/test-data/dict/poc-turtle"))
 
+    def test_get_lg_version_cached(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            counter_path = os.path.join(tmp_dir, "calls")
+            binary_path = os.path.join(tmp_dir, "link-parser")
+            cache_path = os.path.join(tmp_dir, "cache", "lg-version.json")
+
+            # Fake link-parser counting its runs
+            with open(binary_path, "w") as file:
+                file.write("#!/bin/sh\necho x >> '{}'\necho '{}'\n".format(counter_path, text))
+
+            os.chmod(binary_path, os.stat(binary_path).st_mode | stat.S_IEXEC)
+
+            def calls():
+                with open(counter_path) as file:
+                    return len(file.readlines())
+
+            expected = ("5.5.1", "/home/alex/miniconda3/envs/ull55/share/link-grammar")
+
+            with mock.patch.dict(os.environ, {"PATH": tmp_dir + os.pathsep + os.environ.get("PATH", "")}):
+                clear_lg_version_cache()
+
+                try:
+                    self.assertEqual(expected, get_lg_version(cache_path))
+                    self.assertEqual(expected, get_lg_version(cache_path))
+                    self.assertEqual(1, calls())
+
+                    # New process: on-disk cache is used
+                    clear_lg_version_cache()
+                    self.assertEqual(expected, get_lg_version(cache_path))
+                    self.assertEqual(1, calls())
+
+                    # Binary is changed: cache is invalidated
+                    st = os.stat(binary_path)
+                    os.utime(binary_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+                    self.assertEqual(expected, get_lg_version(cache_path))
+                    self.assertEqual(2, calls())
+
+                finally:
+                    clear_lg_version_cache()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.grammar_tester.parsecache import ParseCache
+
+
+class ParseCacheTestCase(unittest.TestCase):
+
+    def test_shared(self):
+        """ Test each stored sentence to be visible to other connections without flush() """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = cache_dir + "/parse-cache.db"
+            writer, reader = ParseCache(cache_path), ParseCache(cache_path)
+            prefix = ParseCache.get_key_prefix("dict", 100, 0)
+
+            try:
+                self.assertIsNone(reader.get(ParseCache.get_key(prefix, "tuna isa fish .\n")))
+
+                for sentence in ("tuna isa fish .", "eagle isa bird ."):
+                    writer.put(ParseCache.get_key(prefix, sentence), [sentence + "\n", "[0]\n"])
+                    reader.put(ParseCache.get_key(prefix, sentence + " ."), [])
+
+                self.assertEqual(["eagle isa bird .\n", "[0]\n"],
+                                 reader.get(ParseCache.get_key(prefix, "eagle isa bird .\n")))
+                self.assertEqual([], writer.get(ParseCache.get_key(prefix, "tuna isa fish . .")))
+                self.assertEqual("wal", reader._get_conn().execute("PRAGMA journal_mode").fetchone()[0])
+
+            finally:
+                writer.close()
+                reader.close()
+
+    @patch.object(ParseCache, "LOCK_TIMEOUT", 0.1)
+    def test_locked(self):
+        """ Test locked database not to raise errors, lines are just not cached """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = cache_dir + "/parse-cache.db"
+            cache = ParseCache(cache_path)
+            key = ParseCache.get_key(ParseCache.get_key_prefix("dict"), "tuna isa fish .")
+
+            try:
+                cache.get(key)
+                locker = sqlite3.connect(cache_path, isolation_level=None)
+                locker.execute("BEGIN EXCLUSIVE")
+
+                try:
+                    cache.put(key, ["tuna isa fish .\n"])
+                    cache.flush()
+                finally:
+                    locker.execute("ROLLBACK")
+                    locker.close()
+
+                self.assertIsNone(cache.get(key))
+                self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+                cache.put(key, ["tuna isa fish .\n"])
+                self.assertEqual(["tuna isa fish .\n"], ParseCache(cache_path).get(key))
+
+            finally:
+                cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import sys
+from decimal import Decimal
 
 from src.common.parsemetrics import *
 
@@ -75,6 +76,31 @@ class TestMetrics(unittest.TestCase):
         self.assertEqual(0.2, pq2.total)
         self.assertEqual(0.1, pq2.quality)
 
+    def test_fast_iadd_decimal(self):
+        """ Fast accumulators should accept Decimal based instances """
+        fpm = FastParseMetrics()
+        pm = ParseMetrics()
+        pm.average_parsed_ratio = Decimal("0.5")
+        pm.sentences = 1
+
+        fpm += pm
+        fpm += pm
+
+        self.assertIsInstance(fpm.average_parsed_ratio, float)
+        self.assertEqual(1.0, fpm.average_parsed_ratio)
+        self.assertEqual(" 50.00%", FastParseMetrics.parseability_str(fpm))
+
+        fpq = FastParseQuality()
+        pq = ParseQuality()
+        pq.total, pq.missing, pq.sentences = Decimal("4"), 1, Decimal("1")
+        pq.quality = pq.recall = pq.precision = Decimal("0.75")
+
+        fpq += pq
+
+        self.assertIsInstance(fpq.total, int)
+        self.assertIsInstance(fpq.recall, float)
+        self.assertEqual("0.7500", FastParseQuality.f1_str(fpq))
+
     @unittest.skip
     def test_pq_div(self):
         """ ParseQuality division by integer test """
@@ -2,6 +2,7 @@ import unittest
 
 from decimal import Decimal
 from src.grammar_tester.parsestat import calc_parse_quality, parse_quality, calc_stat, parse_metrics
+from src.common.parsemetrics import ParseMetrics, ParseQuality, FastParseMetrics, FastParseQuality
 
 # Token indexes
 LWALL = 0; tuna = 1; isa = 2; fish = 3; DOT = 4; RWALL = 5
@@ -135,6 +136,32 @@ class TestStat(unittest.TestCase):
         self.assertEqual(Decimal("0.0"), pm.completely_parsed_ratio)
         self.assertEqual(Decimal("0.0"), pm.completely_unparsed_ratio)
 
+    def test_fast_metrics(self):
+        """ Fast metrics should report the same as Decimal ones """
+        token_lists = [["mom", "liked", "cake", "before", "[.]"], ["mom", "liked", "cake", "before"],
+                       ["[mom]", "[liked]", "[cake]", "[before]"], ["mom", "liked", "[cake]", "[before]"],
+                       ["a", "b", "[c]"]]
+        sets = [(test_set1, ref_set), (test_set2, ref_set), (test_set3, ref_set), (test_set4, ref_set),
+                (test_set5, ref_set5), (set(), ref_set), (test_set1, set())]
+
+        pm, fpm = ParseMetrics(), FastParseMetrics()
+
+        for tokens in token_lists:
+            pm += parse_metrics(tokens)
+            fpm += parse_metrics(tokens, True)
+
+        self.assertIsInstance(fpm.average_parsed_ratio, float)
+        self.assertEqual(ParseMetrics.text(pm), FastParseMetrics.text(fpm))
+
+        pq, fpq = ParseQuality(), FastParseQuality()
+
+        for test_set, reference in sets:
+            pq += parse_quality(test_set, reference)
+            fpq += parse_quality(test_set, reference, True)
+
+        self.assertIsInstance(fpq.recall, float)
+        self.assertEqual(ParseQuality.text(pq), FastParseQuality.text(fpq))
+
 
 if __name__ == '__main__':
     unittest.main()
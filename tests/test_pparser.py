@@ -0,0 +1,56 @@
+import unittest
+import os
+import tempfile
+
+from src.common.ullcorpus import ull2binary
+from src.grammar_learner.read_files import read_parse_lines, read_ull_binary
+from src.grammar_learner.pparser import mst2disjuncts, mst2connectors, files2links, lines2links
+
+
+class PParserTestCase(unittest.TestCase):
+
+    ull_file = "tests/test-data/parses/poc-english-multi-ref/poc_english.txt-04.ull"
+
+    @staticmethod
+    def as_set(df):
+        return set(zip(df['word'], df['link'], df['count']))
+
+    def test_mst2disjuncts_generator(self):
+        with open(self.ull_file) as f:
+            lines = f.readlines()
+
+        for kwargs in [{}, {"left_wall": "LEFT-WALL", "period": True}, {"min_word_count": 2}]:
+            expected = self.as_set(mst2disjuncts(lines, **kwargs))
+            self.assertTrue(len(expected) > 0)
+            self.assertEqual(expected, self.as_set(mst2disjuncts(iter(lines), **kwargs)))
+            self.assertEqual(self.as_set(mst2connectors(lines, **kwargs)),
+                             self.as_set(mst2connectors(iter(lines), **kwargs)))
+
+    def test_mst2disjuncts_pruned_link_in_sentence(self):
+        lines = ["a mom likes cake .\n", "3 likes 4 cake\n", "0 ###LEFT-WALL### 2 mom\n", "4 cake 5 .\n", "\n"]
+
+        # pruned ###LEFT-WALL### link does not split the sentence disjuncts
+        self.assertEqual({("cake", "likes- & .+", 1), ("likes", "cake+", 1), (".", "cake-", 1)},
+                         self.as_set(mst2disjuncts(iter(lines), period=True)))
+
+    def test_binary_counted_on_arrays(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bin_file = ull2binary(self.ull_file, os.path.join(tmp_dir, "parses.ullb"))
+
+            for kwargs in [{"parse_mode": "lower", "context": 2},
+                           {"parse_mode": "given", "context": 1, "left_wall": "LEFT-WALL", "period": True},
+                           {"parse_mode": "casefold", "context": 2, "min_word_count": 2}]:
+                df, response = files2links(input_files=[self.ull_file], **kwargs)
+                bin_df, bin_response = files2links(input_files=[bin_file], **kwargs)
+                self.assertEqual(self.as_set(df), self.as_set(bin_df))
+                self.assertEqual(response, bin_response)
+
+                kwargs.update({"max_sentence_length": 10, "max_unparsed_words": 0})
+                df, response = lines2links(read_parse_lines(self.ull_file, kwargs["parse_mode"]), **kwargs)
+                bin_df, bin_response = lines2links([], [read_ull_binary(bin_file, kwargs["parse_mode"])], **kwargs)
+                self.assertEqual(self.as_set(df), self.as_set(bin_df))
+                self.assertEqual(response, bin_response)
+
+
+if __name__ == '__main__':
+    unittest.main()
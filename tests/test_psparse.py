@@ -1,12 +1,15 @@
 import unittest
 import sys
+import os
+import re
 from decimal import Decimal
 
 from src.grammar_tester.psparse import strip_token, parse_tokens, parse_links, parse_postscript, get_link_set, \
     prepare_tokens, skip_command_response, skip_linkage_header, PS_TIMEOUT_EXPIRED, PS_PANIC_DETECTED, \
-    get_sentence_text, split_ps_parses, trim_garbage, get_linkage_cost
+    get_sentence_text, split_ps_parses, trim_garbage, get_linkage_cost, fast_parse_postscript, fast_parse_tokens
 from src.common.optconst import *
 from src.grammar_tester.parsestat import parse_metrics
+from src.grammar_tester.lgmisc import LGParseError
 
 
 gutenberg_children_bug = \
@@ -984,6 +987,45 @@ class TestPSParse(unittest.TestCase):
         self.assertEqual(27, len(tokens))
         self.assertEqual(0, len(links))
 
+    def test_fast_parse_postscript(self):
+        """ Fast postscript parsing functions should return the same as the reference ones """
+        ps_pattern = re.compile(r"^\[\(.*?\]\n\[.*?\]\n\[0\]$", re.M | re.S)
+        linkages = [value for value in globals().values() if isinstance(value, str) and value.find("[(") >= 0]
+
+        for root, dirs, files in os.walk("tests/test-data"):
+            for file_name in files:
+                if file_name.endswith(".post") or file_name.endswith(".raw"):
+                    with open(os.path.join(root, file_name), "r", encoding="utf-8-sig") as file:
+                        linkages.extend(ps_pattern.findall(file.read()))
+
+        self.assertGreater(len(linkages), 1000)
+
+        for options in (0, BIT_STRIP, BIT_STRIP | BIT_CAPS | BIT_NO_LWALL, BIT_CAPS | BIT_NO_PERIOD):
+            for linkage in linkages:
+                try:
+                    expected = parse_postscript(linkage, options)
+                except LGParseError:
+                    self.assertRaises(LGParseError, fast_parse_postscript, linkage, options)
+                    continue
+
+                self.assertEqual(expected, fast_parse_postscript(linkage, options))
+
+        # Malformed token strings
+        for tokens in ("(a)", "()", "(a)()(b)", "(a)())(b)", "(a)(()(b)", "(LEFT-WALL)(x.n)([y])(RIGHT-WALL)",
+                       "([LEFT-WALL])(.x)(a.b[c])([.])"):
+            self.assertEqual(parse_tokens(tokens, BIT_STRIP), fast_parse_tokens(tokens, BIT_STRIP))
+
+        # Malformed postscript
+        for linkage in ("[(a)][][0]", "[()][[0 1 0 (A)]][0]", "[(a)(b)][[0 1 0 (A)]]", "[(a)(b)]][[0 1 0 (A)]][0]",
+                        "[(a))][[0 1 0 (A)]][0]", "[(a)][[0 1 0 (A)]][0][(b)][[0 1 0 (B)]][0]", "(a)][[0 1 0 (A)]][0]"):
+            try:
+                expected = parse_postscript(linkage, BIT_STRIP)
+            except LGParseError:
+                self.assertRaises(LGParseError, fast_parse_postscript, linkage, BIT_STRIP)
+                continue
+
+            self.assertEqual(expected, fast_parse_postscript(linkage, BIT_STRIP))
+
     def test_get_linkage_cost(self):
         linkage = \
 """
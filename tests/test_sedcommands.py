@@ -1,7 +1,9 @@
+import os
+import tempfile
 import unittest
 from subprocess import PIPE, Popen
 
-from src.common.sedcommands import get_sed_cmd_common_part
+from src.common.sedcommands import get_sed_cmd_common_part, filter_lines, read_filtered_lines
 from src.common.optconst import *
 
 
@@ -46,6 +48,47 @@ class RegexTestCase(unittest.TestCase):
 
         self.assertEqual(20, len(text.split("\n")))
 
+    def test_read_filtered_lines(self):
+        """ In-process filter should produce exactly the same text as sed does """
+        corpora = ["tests/test-data/regex-test/regex-test.txt.ull", "tests/test-data/regex-test/ull-new.txt.ull",
+                   "tests/test-data/corpora/poc-english/poc_english.txt"]
+
+        for corpus in corpora:
+            for options in (0, BIT_INPUT_TO_LCASE, BIT_ULL_IN, BIT_ULL_IN | BIT_INPUT_TO_LCASE):
+
+                with Popen(get_sed_cmd_common_part(options) + [corpus], stdout=PIPE,
+                           env={**os.environ, "LC_ALL": "C.UTF-8"}) as sed_proc:
+                    sed_text = sed_proc.communicate()[0].decode("utf-8")
+
+                self.assertEqual(sed_text, "".join(read_filtered_lines(corpus, options)), f"{corpus}: {options}")
+
+    def test_read_filtered_lines_invalid_utf8(self):
+        """ Invalid UTF-8 bytes should be passed through unchanged as sed does """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corpus = tmp_dir + "/invalid-utf8.txt"
+
+            with open(corpus, "wb") as file:
+                file.write(b"tuna isa fish .\n\n0 ###LEFT-WALL### 1 caf\xe9\ncaf\xe9 [has] fin \xff.\n")
+
+            for options in (0, BIT_INPUT_TO_LCASE, BIT_ULL_IN, BIT_ULL_IN | BIT_INPUT_TO_LCASE):
+                with Popen(get_sed_cmd_common_part(options) + [corpus], stdout=PIPE,
+                           env={**os.environ, "LC_ALL": "C.UTF-8"}) as sed_proc:
+                    sed_bytes = sed_proc.communicate()[0]
+
+                self.assertEqual(sed_bytes, "".join(read_filtered_lines(corpus, options))
+                                 .encode("utf-8", "surrogateescape"), f"{options}")
+
+    def test_filter_lines(self):
+        lines = ["\n", "\r\n", "A [Dad] is [a] [human]\r\n", "0 ###LEFT-WALL### 1 a\n", "1 a 2 dad 0.25\n",
+                 "1 a\t2 [dad]\n", "1918 [,] [{x}] [—]\n", "İSTANBUL"]
+
+        self.assertEqual(["A [Dad] is [a] [human]\r\n", "0 ###LEFT-WALL### 1 a\n", "1 a 2 dad 0.25\n",
+                          "1 a\t2 [dad]\n", "1918 [,] [{x}] [—]\n", "İSTANBUL"],
+                         list(filter_lines(lines, 0)))
+
+        self.assertEqual(["a dad is a human\r\n", "1918 , [{x}] —\n", "istanbul"],
+                         list(filter_lines(lines, BIT_ULL_IN | BIT_INPUT_TO_LCASE)))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scipy.sparse import issparse, csr_matrix
+from sklearn.metrics import calinski_harabaz_score, silhouette_score
+from sklearn.cluster import AgglomerativeClustering
+from sklearn.neighbors import kneighbors_graph
+
+from src.grammar_learner.sparse_word_space import clean_links, co_occurrence_matrix, categorical_distribution
+from src.grammar_learner.symbols import SymbolTable
+from src.grammar_learner.skl_clustering import variance_ratio, optimal_clusters, grid_search, \
+    sparse_ward, skl_clustering
+
+
+class SparseWordSpaceTestCase(unittest.TestCase):
+
+    # [[word_id, feature_id, count]]
+    linx = np.array([[0, 0, 3], [1, 2, 1], [3, 1, 7], [2, 2, 5], [3, 0, 1]])
+
+    def test_clean_links_stop_words(self):
+        """ String stop words are matched with interned word ids """
+        links = pd.DataFrame([['a', 'b+', 3], ['b', 'a-', 3], ['the', 'a+', 5]], columns=['word', 'link', 'count'])
+        symbols = SymbolTable()
+        linx, words, features = clean_links(symbols.intern_links(links), symbols, context=2, stop_words=['the'])
+
+        self.assertEqual(['a', 'b'], sorted(symbols.decode(words)))
+        self.assertEqual(2, len(linx))
+
+    def test_co_occurrence_matrix(self):
+        kwargs = {'min_co-occurrence_count': 2}
+        counts = co_occurrence_matrix(self.linx, **kwargs)
+
+        self.assertTrue(issparse(counts))
+        self.assertEqual(co_occurrence_matrix(self.linx, sparse_matrix=False, **kwargs).tolist(),
+                         counts.toarray().tolist())
+
+        # No int16 overflow
+        self.assertEqual(40000, co_occurrence_matrix(np.array([[0, 0, 40000]]))[0, 0])
+        self.assertEqual(40000, co_occurrence_matrix(np.array([[0, 0, 40000]]), sparse_matrix=False)[0, 0])
+
+    def test_categorical_distribution(self):
+        for threshold in (0.0, 0.1, 0.3):
+            kwargs = {'min_co-occurrence_frequency': threshold}
+            cd = categorical_distribution(co_occurrence_matrix(self.linx), **kwargs)
+            dense_cd = categorical_distribution(co_occurrence_matrix(self.linx, sparse_matrix=False), **kwargs)
+
+            self.assertTrue(issparse(cd))
+            self.assertEqual(dense_cd.tolist(), cd.toarray().tolist())
+
+    def test_variance_ratio(self):
+        cd = np.array([[1, 0, 0], [1, 1, 0], [0, 0, 1], [0, 1, 1], [1, 0, 1]])
+        labels = np.array([0, 0, 1, 1, 2])
+
+        self.assertAlmostEqual(calinski_harabaz_score(cd, labels), variance_ratio(csr_matrix(cd), labels))
+
+
+    def test_optimal_clusters_sample(self):
+        cd = csr_matrix(np.repeat(np.eye(4), 10, axis=0) + np.random.RandomState(0).rand(40, 4) * 0.1)
+        kwargs = {'clustering': ('kmeans', 'k-means++', 10), 'cluster_range': (2, 6, 1, 1),
+                  'clustering_metric': ('silhouette', 'euclidean'), 'silhouette_sample': 12}
+        labels, metrics, centroids = optimal_clusters(cd, **kwargs)
+
+        self.assertEqual(4, len(set(labels)))
+        self.assertEqual(float(silhouette_score(cd, labels)), metrics['silhouette_index'])
+
+
+    def test_optimal_clusters_jobs(self):
+        cd = csr_matrix(np.repeat(np.eye(5), 8, axis=0) + np.random.RandomState(0).rand(40, 5) * 0.6)
+
+        for clustering in (('kmeans', 'k-means++', 1), ('agglomerative', 'ward')):
+            kwargs = {'clustering': clustering, 'cluster_range': (2, 8, 1, 2), 'cluster_seed': 1,
+                      'clustering_metric': ('silhouette', 'euclidean')}
+            labels, metrics, centroids = optimal_clusters(cd, **kwargs)
+            parallel_labels, parallel_metrics, parallel_centroids = optimal_clusters(cd, cluster_jobs=3, **kwargs)
+
+            self.assertEqual(labels.tolist(), parallel_labels.tolist())
+            self.assertEqual(metrics, parallel_metrics)
+
+    def test_grid_search_time(self):
+        cd = csr_matrix(np.repeat(np.eye(4), 10, axis=0))
+        kwargs = {'clustering': ('kmeans', 'k-means++', 1), 'cluster_seed': 0}
+
+        self.assertEqual(6, len(grid_search(cd, [2, 3, 4, 5, 6, 7], **kwargs)))
+        # The first clustering is always done
+        self.assertEqual(1, len(grid_search(cd, [2, 3, 4, 5, 6, 7], cluster_time=0, **kwargs)))
+        self.assertEqual(2, len(grid_search(cd, [2, 3, 4, 5, 6, 7], cluster_time=0, cluster_jobs=2, **kwargs)))
+
+    def test_sparse_ward(self):
+        cd = csr_matrix(np.repeat(np.eye(5), 8, axis=0) + np.random.RandomState(0).rand(40, 5) * 0.6)
+        connectivity = kneighbors_graph(cd, 6, include_self=False)
+
+        for n_clusters in (3, 5, 8):
+            labels = sparse_ward(cd, n_clusters, connectivity)
+            dense_labels = AgglomerativeClustering(n_clusters=n_clusters, connectivity=connectivity)\
+                .fit(cd.toarray()).labels_
+            self.assertEqual(n_clusters, len(set(labels)))
+            # The same partition, labels may be numbered differently
+            self.assertEqual(len(set(zip(labels, dense_labels))), n_clusters)
+
+        # Disconnected neighbour graph is completed
+        self.assertEqual(2, len(set(sparse_ward(cd, 2, csr_matrix((40, 40))))))
+
+        labels, metrics, centroids = skl_clustering(cd, 5, clustering=('agglomerative', 'sparse_ward'))
+        self.assertEqual(5, len(set(labels)))
+
+
+if __name__ == '__main__':
+    unittest.main()
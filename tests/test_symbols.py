@@ -0,0 +1,52 @@
+import unittest
+import pandas as pd
+
+from src.grammar_learner.symbols import SymbolTable
+
+
+class SymbolTableTestCase(unittest.TestCase):
+
+    links = pd.DataFrame([['was', 'a- & b+', 2], ['a', 'was+', 1], ['b', 'was-', 3]],
+                         columns=['word', 'link', 'count'])
+
+    def test_intern_links(self):
+        symbols = SymbolTable()
+        df = symbols.intern_links(self.links)
+
+        # Ids sort the same way as strings
+        self.assertEqual(sorted(self.links['word']), symbols.decode(sorted(df['word'])))
+        self.assertEqual(sorted(self.links['link']), [symbols.terms[x] for x in sorted(df['link'])])
+        self.assertEqual(self.links['count'].tolist(), df['count'].tolist())
+
+        # Disjunct connectors: signed word ids
+        a, b, was = symbols.word_ids['a'], symbols.word_ids['b'], symbols.word_ids['was']
+        self.assertEqual((-a, b), symbols.connectors[symbols.term_ids['a- & b+']])
+        self.assertEqual((was,), symbols.connectors[symbols.term_ids['was+']])
+        self.assertEqual((-was,), symbols.connectors[symbols.term_ids['was-']])
+
+        # Interning again keeps existing ids
+        self.assertEqual(df['word'].tolist(), symbols.intern_links(self.links)['word'].tolist())
+
+    def test_intern_links_sorted(self):
+        """ Words met only in connectors and words of several frames are numbered in one sorted order """
+        grammar_links = pd.DataFrame([['b', 'c- & a+', 1], ['aa', 'b-', 1]], columns=['word', 'link', 'count'])
+        symbols = SymbolTable()
+        df, grammar_df = symbols.intern_links(self.links, grammar_links)
+
+        self.assertEqual(['a', 'aa', 'b', 'c', 'was'], symbols.words[1:])
+        self.assertEqual(sorted(symbols.terms), symbols.terms)
+        self.assertEqual(symbols.decode(grammar_df['word']), grammar_links['word'].tolist())
+        self.assertEqual((-symbols.word_ids['c'], symbols.word_ids['a']),
+                         symbols.connectors[grammar_df['link'][0]])
+
+    def test_decode_words(self):
+        symbols = SymbolTable()
+        df = symbols.intern_links(self.links)
+        cats = {'cluster': ['A', 'B'], 'words': [[], set(df['word'].tolist())]}
+
+        self.assertEqual([set(), {'was', 'a', 'b'}], symbols.decode_words(cats)['words'])
+        self.assertEqual(['A', 'B'], symbols.decode_words(cats)['cluster'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+
+from src.common.ullcorpus import *
+from src.grammar_tester.parsevaluate import load_parses
+
+
+class ULLCorpusTestCase(unittest.TestCase):
+
+    ull_dir = "tests/test-data/parses/poc-english-multi-ref"
+
+    @staticmethod
+    def get_ull_files():
+        return [os.path.join(ULLCorpusTestCase.ull_dir, f) for f in sorted(os.listdir(ULLCorpusTestCase.ull_dir))] \
+               + ["tests/test-data/parses/start-from-digit/start-from-digit.ull"]
+
+    def test_parse_ull_lines(self):
+        corpus = parse_ull_lines(["a dad is  a human .\n", "0 ###LEFT-WALL### 1 a\n", "1 a 2 dad 0.25\n", "\n", "\n",
+                                  "a mom\n", "1 a 2 mom\n"])
+
+        self.assertEqual(2, len(corpus))
+        self.assertEqual("a dad is a human .", corpus.sentence(0))
+        self.assertEqual(["a", "mom"], corpus.sentence_tokens(1))
+        self.assertEqual([[1, 0, 2, 7, -1]], corpus.sentence_links(1).tolist())
+        self.assertEqual(["a dad is a human .\n", "0 ###LEFT-WALL### 1 a\n", "1 a 2 dad 0.25\n", "\n",
+                          "a mom\n", "1 a 2 mom\n", "\n"], list(corpus.lines()))
+        self.assertEqual(["A DAD IS A HUMAN .", "0 ###LEFT-WALL### 1 A", "1 A 2 DAD 0.25", "", "A MOM", "1 A 2 MOM", ""],
+                         list(corpus.lines(str.upper, "")))
+
+    def test_select(self):
+        corpus = parse_ull_lines(["a dad\n", "1 a 2 dad\n", "\n", "a mom is\n", "1 a 2 mom\n", "2 mom 3 is\n", "\n",
+                                  "a son\n", "1 a 2 son\n"]).select([False, True, True])
+
+        self.assertEqual(2, len(corpus))
+        self.assertEqual(["a mom is\n", "1 a 2 mom\n", "2 mom 3 is\n", "\n", "a son\n", "1 a 2 son\n", "\n"],
+                         list(corpus.lines()))
+
+    def test_parse_ull_lines_error(self):
+        with self.assertRaises(ULLFormatError):
+            parse_ull_lines(["a dad\n", "1 a 2\n", "\n"])
+
+    def test_binary_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for ull_file in self.get_ull_files():
+                bin_file = ull2binary(ull_file, os.path.join(tmp_dir, os.path.basename(ull_file) + ULL_BINARY_EXT))
+
+                self.assertTrue(is_ull_binary(bin_file))
+                self.assertFalse(is_ull_binary(ull_file))
+
+                # Binary file parses are the same as text file ones
+                expected = load_parses(ull_file)
+                self.assertEqual(expected, load_ull_binary(bin_file).parses())
+                self.assertEqual(expected, load_ull_binary(bin_file, mmap=False).parses())
+                self.assertEqual(expected, load_parses(bin_file))
+
+                # Text file converted back is parsed the same way
+                text_file = binary2ull(bin_file)
+                self.assertEqual(os.path.join(tmp_dir, os.path.basename(ull_file)), text_file)
+                self.assertEqual(expected, load_parses(text_file))
+
+                with open(ull_file, "r", encoding="utf-8-sig") as file:
+                    expected_lines = [" ".join(line.split()) for line in file]
+
+                with open(text_file, "r") as file:
+                    self.assertEqual([line for line in expected_lines if line],
+                                     [line.rstrip("\n") for line in file if line != "\n"])
+
+    def test_empty_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bin_file = os.path.join(tmp_dir, "empty.ullb")
+            save_ull_binary(parse_ull_lines([]), bin_file)
+            corpus = load_ull_binary(bin_file)
+
+            self.assertEqual(0, len(corpus))
+            self.assertEqual([], list(corpus.lines()))
+
+
+if __name__ == '__main__':
+    unittest.main()